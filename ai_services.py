@@ -1,35 +1,90 @@
-import openai
+import hashlib
 import json
+import os
+import re
 import speech_recognition as sr
-import pyttsx3
-import threading
 import time
-from typing import Dict, List, Optional
-from config import OPENAI_API_KEY, AI_PERSONALITIES, SCORING_CRITERIA
+from concurrent.futures import Future, wait
+from typing import Dict, Iterator, List, Optional
+from config import OPENAI_MODEL, AI_PERSONALITIES, SCORING_CRITERIA, REPORT_CACHE_DIR, SPEECH_STREAM_CONFIG
+from conversation_history import ConversationHistory
+from openai_client import get_openai_client
+from response_cache import ResponseCache, get_response_cache
+from shared_resources import get_noise_profile, get_report_cache, get_tts_cache
+from speech_stream import (MicrophoneSource, PushAudioSource, StreamingTranscriber, get_recognizer_backend,
+                           make_vad)
+from speech_worker import Utterance, get_speech_worker
+
+# Bump when a prompt changes so cached responses to the old prompt are not reused
+SCORING_PROMPT_VERSION = 1
+FOLLOW_UP_PROMPT_VERSION = 1
+REPORT_PROMPT_VERSION = 1
+
+class SentenceAccumulator:
+    """Collects streamed tokens and releases them one complete sentence at a time"""
+    
+    SENTENCE_END = re.compile(r'(?<=[.!?])[")\]]*\s+')
+    # Words whose trailing period does not end a sentence ("Dr. Smith", "e.g. billing")
+    ABBREVIATIONS = {"mr", "mrs", "ms", "dr", "prof", "sr", "jr", "st", "vs", "e.g", "i.e", "approx"}
+    
+    def __init__(self, min_length: int = 12):
+        self.min_length = min_length
+        self.buffer = ""
+    
+    def _is_abbreviation(self, text: str) -> bool:
+        """Whether text ends in an abbreviation or an initial rather than a full stop"""
+        words = text.rstrip(')]"').split()
+        if not words or not words[-1].endswith("."):
+            return False
+        word = words[-1][:-1].lstrip('("[')
+        return word.lower() in self.ABBREVIATIONS or (len(word) == 1 and word.isupper())
+    
+    def feed(self, token: str) -> List[str]:
+        """Add a token and return any sentences it completed"""
+        self.buffer += token
+        sentences = []
+        start = 0
+        for match in self.SENTENCE_END.finditer(self.buffer):
+            if self._is_abbreviation(self.buffer[start:match.start()]):
+                continue
+            sentence = self.buffer[start:match.end()].strip()
+            # Very short fragments ("Hi.", "e.g.") are kept with the next sentence
+            if len(sentence) >= self.min_length:
+                sentences.append(sentence)
+                start = match.end()
+        self.buffer = self.buffer[start:]
+        return sentences
+    
+    def flush(self) -> Optional[str]:
+        """Return whatever text is left once the stream has ended"""
+        remainder = self.buffer.strip()
+        self.buffer = ""
+        return remainder or None
 
 class AIInterviewer:
     def __init__(self, personality: str = "Friendly"):
-        self.client = openai.OpenAI(api_key=OPENAI_API_KEY)
+        self.client = get_openai_client()
+        self.response_cache = get_response_cache()
         self.personality = AI_PERSONALITIES.get(personality, AI_PERSONALITIES["Friendly"])
-        self.conversation_history = []
-        self.tts_engine = pyttsx3.init()
+        self.conversation_history = ConversationHistory(self.client)
+        self.latency_log = []
+        self.speech = get_speech_worker()
         self.setup_tts()
         
     def setup_tts(self):
-        """Configure text-to-speech settings"""
-        voices = self.tts_engine.getProperty('voices')
-        if voices:
-            # Try to set a female voice if available
-            for voice in voices:
-                if 'female' in voice.name.lower() or 'woman' in voice.name.lower():
-                    self.tts_engine.setProperty('voice', voice.id)
-                    break
-        
-        self.tts_engine.setProperty('rate', 150)  # Speech rate
-        self.tts_engine.setProperty('volume', 0.8)  # Volume level
+        """Use the process-wide pre-synthesized audio cache on the shared speech worker"""
+        self.tts_cache = get_tts_cache()
+    
+    def question_audio(self, text: str) -> Optional[str]:
+        """Audio file for text: pre-synthesized if cached, otherwise rendered now and cached"""
+        return self.tts_cache.get_or_synthesize(text)
     
     def generate_response(self, user_input: str, role: str, context: Dict) -> str:
         """Generate AI response based on user input and context"""
+        return self.client.run_sync(self.generate_response_async(user_input, role, context))
+    
+    def _build_messages(self, user_input: str, role: str, context: Dict) -> List[Dict]:
+        """Build the chat messages for a response to the candidate"""
         system_prompt = f"""
         {self.personality['prompt']}
         
@@ -44,15 +99,19 @@ class AIInterviewer:
         - Question number: {context.get('current_question', 1)}
         """
         
-        messages = [
+        return [
             {"role": "system", "content": system_prompt}
-        ] + self.conversation_history + [
+        ] + self.conversation_history.messages() + [
             {"role": "user", "content": user_input}
         ]
+    
+    async def generate_response_async(self, user_input: str, role: str, context: Dict) -> str:
+        """Awaitable variant of generate_response"""
+        messages = self._build_messages(user_input, role, context)
         
         try:
-            response = self.client.chat.completions.create(
-                model="gpt-3.5-turbo",
+            response = await self.client.chat_completion(
+                model=OPENAI_MODEL,
                 messages=messages,
                 max_tokens=150,
                 temperature=0.7
@@ -61,28 +120,103 @@ class AIInterviewer:
             ai_response = response.choices[0].message.content.strip()
             
             # Add to conversation history
-            self.conversation_history.append({"role": "user", "content": user_input})
-            self.conversation_history.append({"role": "assistant", "content": ai_response})
+            self.conversation_history.add_turn(user_input, ai_response)
             
             return ai_response
             
         except Exception as e:
             return f"I apologize, but I'm having trouble processing that. Could you please repeat your answer?"
     
-    def speak_text(self, text: str):
-        """Convert text to speech"""
-        def speak():
-            self.tts_engine.say(text)
-            self.tts_engine.runAndWait()
+    def generate_response_stream(self, user_input: str, role: str, context: Dict) -> Iterator[str]:
+        """Generate the AI response as a stream of tokens
+        
+        The full response is added to the conversation history once the
+        stream completes.
+        """
+        messages = self._build_messages(user_input, role, context)
+        tokens = []
+        
+        try:
+            for token in self.client.chat_completion_stream_sync(
+                model=OPENAI_MODEL,
+                messages=messages,
+                max_tokens=150,
+                temperature=0.7
+            ):
+                tokens.append(token)
+                yield token
+        except Exception as e:
+            if tokens:
+                return
+            yield "I apologize, but I'm having trouble processing that. Could you please repeat your answer?"
+            return
+        
+        ai_response = "".join(tokens).strip()
+        self.conversation_history.add_turn(user_input, ai_response)
+    
+    def speak_response_streaming(self, user_input: str, role: str, context: Dict,
+                                 on_token=None) -> Dict:
+        """Generate a response and speak it sentence by sentence as it streams in
+        
+        Each sentence goes to the speech worker as soon as it is complete, so
+        speech starts while the rest of the response is still generating.
+        Returns the response text and latency metrics in seconds: time to
+        first token, time to first audio and total time until speech ends.
+        """
+        start = time.perf_counter()
+        metrics = {"first_token": None, "first_audio": None, "generation": None, "total": None}
+        utterances = []
         
-        # Run TTS in a separate thread to avoid blocking
-        thread = threading.Thread(target=speak)
-        thread.daemon = True
-        thread.start()
-        return thread
+        accumulator = SentenceAccumulator()
+        tokens = []
+        for token in self.generate_response_stream(user_input, role, context):
+            if metrics["first_token"] is None:
+                metrics["first_token"] = time.perf_counter() - start
+            tokens.append(token)
+            if on_token:
+                on_token(token)
+            for sentence in accumulator.feed(token):
+                utterances.append(self.speech.speak(sentence))
+        
+        remainder = accumulator.flush()
+        if remainder:
+            utterances.append(self.speech.speak(remainder))
+        metrics["generation"] = time.perf_counter() - start
+        for utterance in utterances:
+            utterance.wait()
+        metrics["total"] = time.perf_counter() - start
+        
+        spoken = [u.started_at for u in utterances if u.started_at is not None]
+        if spoken:
+            metrics["first_audio"] = min(spoken) - start
+        
+        self.latency_log.append(metrics)
+        return {"text": "".join(tokens).strip(), "metrics": metrics}
+    
+    def speak_text(self, text: str, interrupt: bool = True) -> Utterance:
+        """Convert text to speech on the shared speech worker
+        
+        By default anything still being spoken is cancelled first, so
+        repeated clicks don't queue up. Returns the queued Utterance.
+        """
+        return self.speech.speak(text, interrupt=interrupt)
+    
+    def stop_speaking(self):
+        """Interrupt the current utterance and drop queued speech"""
+        self.speech.cancel_all()
     
     def generate_follow_up_question(self, answer: str, role: str, question: str) -> str:
         """Generate a follow-up question based on the candidate's answer"""
+        return self.client.run_sync(self.generate_follow_up_question_async(answer, role, question))
+    
+    async def generate_follow_up_question_async(self, answer: str, role: str, question: str) -> str:
+        """Awaitable variant of generate_follow_up_question"""
+        cache_key = ResponseCache.make_key("follow_up", OPENAI_MODEL, FOLLOW_UP_PROMPT_VERSION,
+                                           role, question, answer)
+        cached = await self.response_cache.get_async(cache_key)
+        if cached is not None:
+            return cached
+        
         prompt = f"""
         Based on this interview context:
         - Role: {role}
@@ -98,52 +232,125 @@ class AIInterviewer:
         """
         
         try:
-            response = self.client.chat.completions.create(
-                model="gpt-3.5-turbo",
+            response = await self.client.chat_completion(
+                model=OPENAI_MODEL,
                 messages=[{"role": "user", "content": prompt}],
                 max_tokens=80,
                 temperature=0.6
             )
-            return response.choices[0].message.content.strip()
+            follow_up = response.choices[0].message.content.strip()
         except:
             return "Thank you for that answer."
+        
+        await self.response_cache.put_async(cache_key, follow_up, kind="follow_up")
+        return follow_up
 
 class SpeechProcessor:
-    def __init__(self):
+    def __init__(self, backend: Optional[str] = None, local_microphone: bool = True):
         self.recognizer = sr.Recognizer()
-        self.microphone = sr.Microphone()
+        self.microphone = None
+        
+        # With browser audio over WebRTC the server's microphone is never opened
+        if local_microphone:
+            self.microphone = sr.Microphone(sample_rate=SPEECH_STREAM_CONFIG["sample_rate"])
+            
+            # Adjust for ambient noise (measured once per process and shared)
+            get_noise_profile().apply(self.recognizer, self.microphone)
         
-        # Adjust for ambient noise
-        with self.microphone as source:
-            self.recognizer.adjust_for_ambient_noise(source)
+        self.backend = get_recognizer_backend(backend or SPEECH_STREAM_CONFIG["recognizer"], self.recognizer)
+    
+    def start_streaming(self, source=None, **config) -> StreamingTranscriber:
+        """Start capturing and transcribing speech in the background
+        
+        source defaults to the microphone; a WavFileSource or the browser's
+        PushAudioSource can be passed instead. Browser audio is not what the
+        server microphone was calibrated on, so its energy threshold is
+        measured from the first moments of the incoming track. Segments are
+        transcribed while recording continues, so iter_transcript() on the
+        result yields the answer as it is spoken.
+        """
+        if source is None:
+            if self.microphone is None:
+                raise RuntimeError("no local microphone; pass an audio source")
+            source = MicrophoneSource(self.microphone)
+        threshold = None if isinstance(source, PushAudioSource) else self.recognizer.energy_threshold
+        vad = make_vad(SPEECH_STREAM_CONFIG["vad"], source.sample_rate, threshold)
+        return StreamingTranscriber(source, self.backend, vad, config).start()
     
     def listen_for_speech(self, timeout: int = 10) -> Optional[str]:
         """Listen for speech and convert to text"""
-        try:
-            with self.microphone as source:
-                print("Listening...")
-                # Listen for audio input
-                audio = self.recognizer.listen(source, timeout=timeout, phrase_time_limit=30)
-                
-            print("Processing speech...")
-            # Convert speech to text
-            text = self.recognizer.recognize_google(audio)
-            return text
-            
-        except sr.WaitTimeoutError:
-            return None
-        except sr.UnknownValueError:
+        print("Listening...")
+        transcriber = self.start_streaming(start_timeout_s=timeout)
+        return transcriber.wait() or None
+
+class ReportCache:
+    """Final reports keyed by interview content, in memory and on disk
+    
+    The key is a digest of the model, the report prompt version, the
+    candidate, role and every score, so a report is reused for as long as
+    the interview it describes is unchanged, and a finished interview
+    reopened later is served from disk.
+    """
+    
+    def __init__(self, cache_dir: Optional[str] = REPORT_CACHE_DIR):
+        self.cache_dir = cache_dir
+        self.reports: Dict[str, str] = {}
+    
+    @staticmethod
+    def key(all_scores: List[Dict], candidate_name: str, role: str) -> str:
+        payload = json.dumps([OPENAI_MODEL, REPORT_PROMPT_VERSION, candidate_name, role, all_scores],
+                             sort_keys=True, default=str)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+    
+    def _path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, f"{key}.json")
+    
+    def get(self, key: str) -> Optional[str]:
+        """Return the cached report for key, or None"""
+        if key in self.reports:
+            return self.reports[key]
+        if not self.cache_dir:
             return None
-        except sr.RequestError as e:
-            print(f"Speech recognition error: {e}")
+        try:
+            with open(self._path(key), "r", encoding="utf-8") as f:
+                report = json.load(f)["report"]
+        except (OSError, ValueError, KeyError, TypeError):
             return None
+        self.reports[key] = report
+        return report
+    
+    def put(self, key: str, report: str):
+        """Store a report in memory and, if a cache directory is set, on disk"""
+        self.reports[key] = report
+        if not self.cache_dir:
+            return
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            tmp_path = f"{self._path(key)}.{os.getpid()}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump({"report": report, "created_at": time.time()}, f)
+            os.replace(tmp_path, self._path(key))
+        except OSError as e:
+            print(f"Warning: could not cache final report: {e}")
 
 class AnswerScorer:
-    def __init__(self):
-        self.client = openai.OpenAI(api_key=OPENAI_API_KEY)
+    def __init__(self, report_cache: Optional[ReportCache] = None):
+        self.client = get_openai_client()
+        self.response_cache = get_response_cache()
+        self.report_cache = report_cache or get_report_cache()
     
     def score_answer(self, question: str, answer: str, role: str) -> Dict:
         """Score an answer based on multiple criteria"""
+        return self.client.run_sync(self.score_answer_async(question, answer, role))
+    
+    async def score_answer_async(self, question: str, answer: str, role: str) -> Dict:
+        """Awaitable variant of score_answer"""
+        cache_key = ResponseCache.make_key("score", OPENAI_MODEL, SCORING_PROMPT_VERSION,
+                                           role, question, answer)
+        cached = await self.response_cache.get_async(cache_key)
+        if cached is not None:
+            return cached
+        
         scoring_prompt = f"""
         Evaluate this interview answer for a {role} position:
         
@@ -160,52 +367,75 @@ class AnswerScorer:
         5. Problem-solving - How well does the answer show problem-solving skills?
         
         Return a JSON object with this structure:
-        {
-            "scores": {
+        {{
+            "scores": {{
                 "relevance": score,
                 "depth": score,
                 "communication": score,
                 "experience": score,
                 "problem_solving": score
-            },
-            "feedback": {
+            }},
+            "feedback": {{
                 "relevance": "brief feedback",
                 "depth": "brief feedback", 
                 "communication": "brief feedback",
                 "experience": "brief feedback",
                 "problem_solving": "brief feedback"
-            },
+            }},
             "overall_score": average_score,
             "summary": "Overall assessment in 2-3 sentences"
-        }
+        }}
         """
         
         try:
-            response = self.client.chat.completions.create(
-                model="gpt-3.5-turbo",
+            response = await self.client.chat_completion(
+                model=OPENAI_MODEL,
                 messages=[{"role": "user", "content": scoring_prompt}],
                 max_tokens=500,
                 temperature=0.3
             )
             
             result = json.loads(response.choices[0].message.content)
-            return result
             
         except Exception as e:
-            # Fallback scoring if API fails
-            return {
-                "scores": {criterion: 5 for criterion in SCORING_CRITERIA.keys()},
-                "feedback": {criterion: "Unable to evaluate due to technical issues" 
-                           for criterion in SCORING_CRITERIA.keys()},
-                "overall_score": 5.0,
-                "summary": "Technical issues prevented detailed scoring. Please try again."
-            }
+            return self.fallback_score()
+        
+        await self.response_cache.put_async(cache_key, result, kind="score")
+        return result
+    
+    def score_answer_background(self, question: str, answer: str, role: str) -> Future:
+        """Start scoring an answer on the shared client loop and return a Future for the result"""
+        return self.client.submit(self.score_answer_async(question, answer, role))
+    
+    @staticmethod
+    def fallback_score() -> Dict:
+        """Fallback scoring if API fails"""
+        return {
+            "scores": {criterion: 5 for criterion in SCORING_CRITERIA.keys()},
+            "feedback": {criterion: "Unable to evaluate due to technical issues" 
+                       for criterion in SCORING_CRITERIA.keys()},
+            "overall_score": 5.0,
+            "summary": "Technical issues prevented detailed scoring. Please try again."
+        }
     
     def generate_final_report(self, all_scores: List[Dict], candidate_name: str, role: str) -> str:
-        """Generate a comprehensive final interview report"""
+        """Generate a comprehensive final interview report
+        
+        Reports are cached by interview content, so the model is only called
+        once per distinct set of scores.
+        """
+        return self.client.run_sync(self.generate_final_report_async(all_scores, candidate_name, role))
+    
+    async def generate_final_report_async(self, all_scores: List[Dict], candidate_name: str, role: str) -> str:
+        """Awaitable variant of generate_final_report"""
         if not all_scores:
             return "No answers were scored."
         
+        cache_key = self.report_cache.key(all_scores, candidate_name, role)
+        cached = self.report_cache.get(cache_key)
+        if cached is not None:
+            return cached
+        
         # Calculate averages
         criteria = list(all_scores[0]["scores"].keys())
         avg_scores = {}
@@ -236,12 +466,57 @@ class AnswerScorer:
         """
         
         try:
-            response = self.client.chat.completions.create(
-                model="gpt-3.5-turbo",
+            response = await self.client.chat_completion(
+                model=OPENAI_MODEL,
                 messages=[{"role": "user", "content": report_prompt}],
                 max_tokens=800,
                 temperature=0.4
             )
-            return response.choices[0].message.content
+            report = response.choices[0].message.content
         except:
-            return f"Interview completed for {candidate_name}. Overall score: {overall_avg:.1f}/10"
\ No newline at end of file
+            # Not cached, so the next request tries the model again
+            return f"Interview completed for {candidate_name}. Overall score: {overall_avg:.1f}/10"
+        
+        self.report_cache.put(cache_key, report)
+        return report
+
+class ScoringQueue:
+    """Per-session queue of answers being scored in the background
+    
+    Answers are scored concurrently on the shared OpenAI client loop while
+    the interview moves on. Each pending answer keeps its slot in the
+    session's scores list (as None) until collect() fills it in.
+    """
+    
+    def __init__(self, scorer: AnswerScorer):
+        self.scorer = scorer
+        self.pending: Dict[int, Future] = {}
+    
+    def submit(self, index: int, question: str, answer: str, role: str):
+        """Queue an answer for scoring; its score will go to scores[index]"""
+        self.pending[index] = self.scorer.score_answer_background(question, answer, role)
+    
+    @property
+    def outstanding(self) -> int:
+        """Number of answers still being scored"""
+        return len(self.pending)
+    
+    def collect(self, scores: List[Optional[Dict]]) -> int:
+        """Move finished scores into the scores list and return how many were filled"""
+        filled = 0
+        for index, future in list(self.pending.items()):
+            if not future.done():
+                continue
+            try:
+                scores[index] = future.result()
+            except Exception:
+                scores[index] = self.scorer.fallback_score()
+            del self.pending[index]
+            filled += 1
+        return filled
+    
+    def wait_all(self, scores: List[Optional[Dict]], timeout: Optional[float] = None) -> int:
+        """Block until outstanding scores finish (or timeout), then collect them"""
+        if self.pending:
+            wait(list(self.pending.values()), timeout=timeout)
+        return self.collect(scores)
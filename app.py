@@ -1,4 +1,5 @@
 import streamlit as st
+import base64
 import time
 import json
 import os
@@ -7,9 +8,13 @@ import pandas as pd
 import numpy as np
 
 # Import custom modules
-from config import INTERVIEW_ROLES, AI_PERSONALITIES
-from ai_services import AIInterviewer, SpeechProcessor, AnswerScorer
+from config import INTERVIEW_ROLES, AI_PERSONALITIES, SCORING_CRITERIA, VIDEO_CONFIG
+from ai_services import AIInterviewer, SpeechProcessor, AnswerScorer, ScoringQueue
 from video_recorder import VideoRecorder, FaceDetector
+from face_timeline import FaceAnalysisWorker
+from media_pipeline import MediaPipeline, WEBRTC_AVAILABLE
+from tts_cache import prebuild_in_background
+from shared_resources import get_shared, get_tts_cache
 
 # Page configuration
 st.set_page_config(
@@ -77,11 +82,15 @@ def initialize_session_state():
         'interview_started': False,
         'video_recorder': None,
         'face_detector': None,
+        'face_analysis': None,
+        'media_pipeline': None,
         'ai_interviewer': None,
         'speech_processor': None,
         'answer_scorer': None,
+        'scoring_queue': None,
         'current_question_text': '',
         'current_answer': '',
+        'follow_up': None,
         'interview_complete': False
     }
     
@@ -89,6 +98,24 @@ def initialize_session_state():
         if key not in st.session_state:
             st.session_state[key] = value
 
+def release_session_media():
+    """Stop this session's face analysis, camera capture and replay encoder"""
+    face_analysis = st.session_state.get('face_analysis')
+    if face_analysis:
+        face_analysis.stop()
+    recorder = st.session_state.get('video_recorder')
+    if recorder:
+        recorder.release_camera()
+        if recorder.replay is not None:
+            recorder.replay.close()
+
+def reset_session():
+    """Start over with a fresh session, releasing the old session's media first"""
+    release_session_media()
+    for key in list(st.session_state.keys()):
+        del st.session_state[key]
+    initialize_session_state()
+
 def setup_page():
     """Initial setup page for candidate information and role selection"""
     st.markdown("<h1 class='main-header'>🤖 AI Interview System</h1>", unsafe_allow_html=True)
@@ -159,13 +186,25 @@ def interview_page():
         st.session_state.page = 'setup'
         st.rerun()
     
-    # Initialize AI services
+    # Initialize AI services (per-session state only; clients, classifier, audio
+    # cache and noise calibration are shared across sessions by shared_resources)
     if not st.session_state.ai_interviewer:
         st.session_state.ai_interviewer = AIInterviewer(st.session_state.ai_personality)
-        st.session_state.speech_processor = SpeechProcessor()
+        start_tts_prebuild()
+        st.session_state.speech_processor = SpeechProcessor(local_microphone=not WEBRTC_AVAILABLE)
         st.session_state.answer_scorer = AnswerScorer()
-        st.session_state.video_recorder = VideoRecorder()
+        st.session_state.scoring_queue = ScoringQueue(st.session_state.answer_scorer)
+        # With WebRTC the browser's camera and microphone feed the recorder and
+        # speech capture; otherwise the server camera is polled on each rerun
+        st.session_state.video_recorder = VideoRecorder(source="webrtc" if WEBRTC_AVAILABLE else "camera")
         st.session_state.face_detector = FaceDetector()
+        if WEBRTC_AVAILABLE:
+            st.session_state.media_pipeline = MediaPipeline(st.session_state.video_recorder,
+                                                            st.session_state.face_detector)
+        st.session_state.face_analysis = FaceAnalysisWorker(st.session_state.video_recorder)
+    
+    # Pick up any answers that finished scoring in the background
+    st.session_state.scoring_queue.collect(st.session_state.scores)
     
     # Header
     st.markdown(f"<h1 class='main-header'>Interview: {st.session_state.selected_role}</h1>", unsafe_allow_html=True)
@@ -186,6 +225,7 @@ def interview_page():
             if st.button("📷 Start Recording", type="primary"):
                 if st.session_state.video_recorder.start_recording():
                     st.session_state.interview_started = True
+                    st.session_state.face_analysis.start()
                     st.success("Recording started!")
                 else:
                     st.error("Failed to start recording. Please check your camera.")
@@ -193,20 +233,41 @@ def interview_page():
         with col1b:
             if st.button("⏹️ Stop Recording"):
                 if st.session_state.video_recorder:
+                    st.session_state.face_analysis.stop()
                     frames_recorded = st.session_state.video_recorder.stop_recording()
-                    st.info(f"Recording stopped. {frames_recorded} frames recorded.")
+                    stats = st.session_state.video_recorder.recording_stats()
+                    st.info(f"Recording stopped. {frames_recorded} frames recorded"
+                            + (f" ({stats['dropped']} dropped)." if stats['dropped'] else ".")
+                            + (f" Camera delivered {stats['measured_fps']:.1f} fps; timing corrected to "
+                               f"{VIDEO_CONFIG['fps']} fps." if stats['measured_fps'] else ""))
+        
+        # Live camera feed: a real-time WebRTC stream, or one polled frame per rerun
+        if st.session_state.media_pipeline:
+            with video_placeholder.container():
+                st.session_state.media_pipeline.streamer()
+        elif st.session_state.video_recorder and st.session_state.interview_started:
+            # The capture sequence number lets the tracker tell a new frame from a rerun
+            seq, buffer = st.session_state.video_recorder.wait_for_frame(timeout=0)
+            if buffer is not None:
+                try:
+                    # Apply face detection
+                    if st.session_state.face_detector:
+                        frame_with_faces = st.session_state.face_detector.draw_face_rectangles(buffer.array, seq)
+                    else:
+                        frame_with_faces = buffer.array
+                    
+                    video_placeholder.image(frame_with_faces, channels="BGR", use_column_width=True)
+                finally:
+                    buffer.release()
         
-        # Live camera feed
+        # Live capture metrics
         if st.session_state.video_recorder and st.session_state.interview_started:
-            frame = st.session_state.video_recorder.get_current_frame()
-            if frame is not None:
-                # Apply face detection
-                if st.session_state.face_detector:
-                    frame_with_faces = st.session_state.face_detector.draw_face_rectangles(frame)
-                else:
-                    frame_with_faces = frame
-                
-                video_placeholder.image(frame_with_faces, channels="BGR", use_column_width=True)
+            recorder = st.session_state.video_recorder
+            capture = recorder.capture_stats()
+            if capture['fps']:
+                st.caption(f"📈 {capture['fps']:.1f}/{VIDEO_CONFIG['fps']} fps · jitter {capture['jitter_ms']:.1f} ms · "
+                           f"{recorder.frames_dropped + recorder.frames_skipped} dropped · "
+                           f"{recorder.frames_duplicated} repeated")
         
         # AI Voice Interaction
         st.markdown("<h3 class='section-header'>🎤 AI Voice Interaction</h3>", unsafe_allow_html=True)
@@ -219,7 +280,11 @@ def interview_page():
             with col1c:
                 if st.button("🔊 Ask Question (Voice)", type="secondary"):
                     if st.session_state.ai_interviewer:
-                        st.session_state.ai_interviewer.speak_text(current_question)
+                        audio_path = st.session_state.ai_interviewer.question_audio(current_question)
+                        if audio_path:
+                            autoplay_audio(audio_path)
+                        else:
+                            st.session_state.ai_interviewer.speak_text(current_question)
                         st.session_state.current_question_text = current_question
                         st.success("AI is asking the question...")
             
@@ -227,12 +292,51 @@ def interview_page():
                 if st.button("🎤 Listen for Answer"):
                     if st.session_state.speech_processor:
                         with st.spinner("Listening for your answer..."):
-                            speech_text = st.session_state.speech_processor.listen_for_speech(timeout=30)
+                            # Show the answer as each spoken segment is transcribed
+                            live_transcript = st.empty()
+                            pipeline = st.session_state.media_pipeline
+                            transcriber = st.session_state.speech_processor.start_streaming(
+                                source=pipeline.audio_source if pipeline else None, start_timeout_s=30)
+                            for partial_text in transcriber.iter_transcript():
+                                live_transcript.info(f"🎙️ {partial_text}")
+                            speech_text = transcriber.transcript()
+                            live_transcript.empty()
                             if speech_text:
                                 st.session_state.current_answer = speech_text
                                 st.success(f"Captured: {speech_text[:100]}...")
                             else:
                                 st.warning("No speech detected. Please try again or use text input.")
+            
+            # The interviewer reacts to the answer, speaking each sentence as soon as it streams in
+            if st.button("💬 Follow-up (Voice)"):
+                if not st.session_state.current_answer.strip():
+                    st.warning("Answer the question first, by voice or in the text box.")
+                elif st.session_state.ai_interviewer:
+                    live_reply = st.empty()
+                    streamed = []
+                    
+                    def show_token(token):
+                        streamed.append(token)
+                        live_reply.info(f"🤖 {''.join(streamed)}")
+                    
+                    with st.spinner("Interviewer is responding..."):
+                        st.session_state.follow_up = st.session_state.ai_interviewer.speak_response_streaming(
+                            st.session_state.current_answer,
+                            st.session_state.selected_role,
+                            {'name': st.session_state.candidate_name,
+                             'current_question': st.session_state.current_question_index + 1},
+                            on_token=show_token
+                        )
+                    live_reply.empty()
+            
+            if st.session_state.follow_up:
+                metrics = st.session_state.follow_up['metrics']
+                st.info(f"🤖 {st.session_state.follow_up['text']}")
+                if metrics['first_audio'] is not None:
+                    st.caption(f"⏱️ First audio after {metrics['first_audio']:.2f}s "
+                               f"(first token {metrics['first_token']:.2f}s, spoken in {metrics['total']:.1f}s)")
+                else:
+                    st.caption("⏱️ No audio output available; response shown as text only")
     
     with col2:
         st.markdown("<h3 class='section-header'>❓ Interview Questions</h3>", unsafe_allow_html=True)
@@ -266,21 +370,21 @@ def interview_page():
             with col2a:
                 if st.button("✅ Submit Answer", type="primary", use_container_width=True):
                     if st.session_state.current_answer.strip():
-                        # Score the answer
-                        with st.spinner("AI is evaluating your answer..."):
-                            score = st.session_state.answer_scorer.score_answer(
-                                current_question, 
-                                st.session_state.current_answer,
-                                st.session_state.selected_role
-                            )
-                        
-                        # Store answer and score
+                        # Store the answer and score it in the background;
+                        # its score slot stays None until scoring finishes
                         st.session_state.answers.append(st.session_state.current_answer)
-                        st.session_state.scores.append(score)
+                        st.session_state.scores.append(None)
+                        st.session_state.scoring_queue.submit(
+                            st.session_state.current_question_index,
+                            current_question, 
+                            st.session_state.current_answer,
+                            st.session_state.selected_role
+                        )
                         
                         # Move to next question
                         st.session_state.current_question_index += 1
                         st.session_state.current_answer = ""
+                        st.session_state.follow_up = None
                         
                         # Check if interview is complete
                         if st.session_state.current_question_index >= len(st.session_state.questions):
@@ -295,12 +399,13 @@ def interview_page():
                 if st.button("⏭️ Skip Question", use_container_width=True):
                     st.session_state.answers.append("Skipped")
                     st.session_state.scores.append({
-                        "scores": {criterion: 0 for criterion in ["relevance", "depth", "communication", "experience", "problem_solving"]},
+                        "scores": {criterion: 0 for criterion in SCORING_CRITERIA},
                         "overall_score": 0,
                         "summary": "Question was skipped"
                     })
                     st.session_state.current_question_index += 1
                     st.session_state.current_answer = ""
+                    st.session_state.follow_up = None
                     
                     if st.session_state.current_question_index >= len(st.session_state.questions):
                         st.session_state.interview_complete = True
@@ -320,25 +425,109 @@ def interview_page():
             for i, (q, a, s) in enumerate(zip(st.session_state.questions[:len(st.session_state.answers)], 
                                             st.session_state.answers, 
                                             st.session_state.scores)):
-                with st.expander(f"Question {i+1} (Score: {s['overall_score']:.1f}/10)"):
+                score_label = "Scoring..." if s is None else f"Score: {s['overall_score']:.1f}/10"
+                with st.expander(f"Question {i+1} ({score_label})"):
                     st.write(f"**Q:** {q}")
                     st.write(f"**A:** {a}")
 
+@st.cache_data(show_spinner=False)
+def summarize_scores(scores):
+    """Overall average and per-criterion averages, memoized by scores content"""
+    avg_score = sum(score['overall_score'] for score in scores) / len(scores)
+    criteria_scores = {}
+    for criterion in SCORING_CRITERIA:
+        criterion_scores = [score['scores'][criterion] for score in scores]
+        criteria_scores[criterion] = {
+            'average': sum(criterion_scores) / len(criterion_scores),
+            'scores': criterion_scores
+        }
+    return avg_score, criteria_scores
+
+def autoplay_audio(path):
+    """Play an audio file in the browser as soon as it is rendered"""
+    with open(path, 'rb') as f:
+        data = base64.b64encode(f.read()).decode()
+    st.markdown(f'<audio autoplay controls src="data:audio/wav;base64,{data}"></audio>', unsafe_allow_html=True)
+
+def start_tts_prebuild():
+    """Render the question bank into the shared TTS cache once per server process"""
+    return get_shared('tts_prebuild', lambda: prebuild_in_background(get_tts_cache()))
+
+def format_seconds(seconds):
+    return f"{int(seconds // 60)}:{int(seconds % 60):02d}"
+
+def show_face_timeline(timeline, summary):
+    """Face presence section of the results page, drawn from the recorded timeline"""
+    import matplotlib.pyplot as plt
+    from face_timeline import T, FACES
+    
+    st.markdown("### 👤 Camera Presence")
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        st.metric("Face Visible", f"{summary['presence_ratio'] * 100:.0f}%")
+    with col2:
+        st.metric("Times Out of Frame", summary['absences'],
+                  help=f"Longest: {summary['longest_absence_s']:.1f}s")
+    with col3:
+        st.metric("Multiple Faces", summary['multi_face_events'])
+    
+    samples = timeline.samples()
+    fig, ax = plt.subplots(figsize=(10, 2))
+    ax.step(samples[:, T], samples[:, FACES], where='post')
+    ax.set_xlabel('Seconds')
+    ax.set_ylabel('Faces')
+    ax.set_ylim(-0.2, max(2, samples[:, FACES].max()) + 0.2)
+    plt.tight_layout()
+    st.pyplot(fig)
+    
+    with st.expander("Presence timeline"):
+        for interval in timeline.intervals():
+            label = "Face visible" if interval['present'] else "No face"
+            st.write(f"• {format_seconds(interval['start'])} – {format_seconds(interval['end'])}: {label}")
+        for event in timeline.multi_face_events():
+            st.write(f"• {format_seconds(event['start'])} – {format_seconds(event['end'])}: "
+                     f"{event['max_faces']} faces in frame")
+        if summary['avg_position']:
+            st.write(f"Average face position: {summary['avg_position']['x']:.0%} across, "
+                     f"{summary['avg_position']['y']:.0%} down; average width {summary['avg_size']:.0%} of the frame")
+
+def show_replay(replay):
+    """Scrub through the recent recording; only the frame on screen is decoded"""
+    st.markdown("### 🎬 Instant Replay")
+    first, last = replay.time_range()
+    if last > first:
+        t = st.slider("Position (seconds)", min_value=float(first), max_value=float(last),
+                      value=float(first), step=0.5)
+    else:
+        t = first
+    frame = replay.frame_at(t)
+    if frame is not None:
+        st.image(frame, channels="BGR", caption=format_seconds(t), use_column_width=True)
+
 def results_page():
     """Results page showing comprehensive interview analysis and scores"""
     st.markdown("<h1 class='main-header'>📊 Interview Results</h1>", unsafe_allow_html=True)
     
+    # Wait only for answers that are still being scored
+    scoring_queue = st.session_state.scoring_queue
+    if scoring_queue and scoring_queue.outstanding:
+        with st.spinner(f"Finishing evaluation of {scoring_queue.outstanding} answer(s)..."):
+            scoring_queue.wait_all(st.session_state.scores)
+    
+    # The presence timeline was built during the interview; just stop adding to it
+    face_analysis = st.session_state.face_analysis
+    if face_analysis:
+        face_analysis.stop()
+    face_summary = face_analysis.timeline.summary() if face_analysis and face_analysis.timeline.size else None
+    
     if not st.session_state.scores:
         st.error("No interview data found. Please complete the interview first.")
         if st.button("Start New Interview"):
-            # Reset session state
-            for key in list(st.session_state.keys()):
-                del st.session_state[key]
-            initialize_session_state()
+            reset_session()
             st.rerun()
         return
     
-    # Generate final report
+    # Generate final report (cached by interview content, so reruns don't call the model)
     if st.session_state.answer_scorer:
         final_report = st.session_state.answer_scorer.generate_final_report(
             st.session_state.scores,
@@ -348,11 +537,12 @@ def results_page():
     else:
         final_report = "Report generation unavailable."
     
+    avg_score, criteria_scores = summarize_scores(st.session_state.scores)
+    
     # Overall statistics
     col1, col2, col3 = st.columns(3)
     
     with col1:
-        avg_score = sum(score['overall_score'] for score in st.session_state.scores) / len(st.session_state.scores)
         st.metric("Overall Score", f"{avg_score:.1f}/10")
     
     with col2:
@@ -369,15 +559,6 @@ def results_page():
     with col1:
         st.markdown("### 📋 Detailed Score Breakdown")
         
-        # Create score breakdown table
-        criteria_scores = {}
-        for criterion in ["relevance", "depth", "communication", "experience", "problem_solving"]:
-            scores = [score['scores'][criterion] for score in st.session_state.scores]
-            criteria_scores[criterion] = {
-                'average': sum(scores) / len(scores),
-                'scores': scores
-            }
-        
         # Display as chart
         import matplotlib.pyplot as plt
         fig, ax = plt.subplots(figsize=(10, 6))
@@ -441,6 +622,7 @@ def results_page():
                 'answers': st.session_state.answers,
                 'scores': st.session_state.scores,
                 'final_report': final_report,
+                'face_presence': face_summary,
                 'timestamp': datetime.now().isoformat()
             }
             
@@ -453,12 +635,18 @@ def results_page():
         
         # Start new interview
         if st.button("🔄 New Interview", use_container_width=True):
-            # Reset session state
-            for key in list(st.session_state.keys()):
-                del st.session_state[key]
-            initialize_session_state()
+            reset_session()
             st.rerun()
     
+    # Instant replay from the compressed in-memory copy of the recording
+    recorder = st.session_state.video_recorder
+    if recorder and recorder.replay and recorder.replay.frame_count:
+        show_replay(recorder.replay)
+    
+    # Face presence over the interview
+    if face_summary:
+        show_face_timeline(face_analysis.timeline, face_summary)
+    
     # Final AI report
     st.markdown("### 🤖 AI Assessment Report")
     st.markdown(final_report)
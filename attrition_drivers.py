@@ -0,0 +1,282 @@
+"""
+HR Attrition Driver Analysis
+============================
+
+Ranks every column of the processed HR dataset by how strongly it relates to
+IsAttrition:
+
+- Point-biserial correlation (Pearson r against the binary target) for
+  numeric columns and for every category value as a 0/1 indicator
+- Attrition rate and lift (rate / overall rate) for every category value and
+  every numeric bin
+- Mutual information (bits) for every column, using quantile bins for
+  continuous numeric columns
+
+Numeric correlations are computed with blocked matrix products; all
+categorical and binned statistics come from a single bincount per block of
+columns, so the data is scanned once. Results are cached on disk by dataset
+digest, so repeated runs over unchanged data just read the ranked tables.
+"""
+
+import hashlib
+import json
+import os
+
+import numpy as np
+import pandas as pd
+from pandas.api.types import is_bool_dtype, is_datetime64_any_dtype, is_numeric_dtype
+
+from data_quality import HR_SCHEMA
+
+DRIVER_ANALYSIS_VERSION = 1
+DRIVER_CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '.driver_cache')
+TARGET_COLUMN = 'IsAttrition'
+EXCLUDED_COLUMNS = ('Attrition', 'IsAttrition', 'EmployeeID')
+MAX_CATEGORIES = 50
+MAX_DISCRETE_VALUES = 10
+NUMERIC_BINS = 10
+MIN_SUPPORT = 20
+BLOCK_COLUMNS = 32
+
+
+def dataset_digest(df, source_digests=None, validated=None, processing_version=None):
+    """Return a digest identifying the dataset the drivers are computed from.
+
+    When the content digests of the raw source files are known (from the
+    dataset manifest) they are used directly, together with whether rows
+    failing validation were dropped, the validation schema and the version
+    of the processing that derived the frame from the files; otherwise the
+    frame is hashed. Columns are taken in sorted order, so the digest does
+    not depend on their layout.
+    """
+    df = df[sorted(df.columns, key=str)]
+    digest = hashlib.sha256()
+    digest.update(f"v{DRIVER_ANALYSIS_VERSION}".encode())
+    digest.update('\x1f'.join(map(str, df.columns)).encode())
+    digest.update(f"validated={validated}".encode())
+    digest.update(f"processing={processing_version}".encode())
+    digest.update(json.dumps(HR_SCHEMA, sort_keys=True).encode())
+    if source_digests:
+        for source in sorted(source_digests):
+            digest.update(source.encode())
+    else:
+        digest.update(str(len(df)).encode())
+        digest.update(pd.util.hash_pandas_object(df, index=False).to_numpy().tobytes())
+    return digest.hexdigest()
+
+
+def _format_number(value):
+    if float(value).is_integer():
+        return str(int(value))
+    return f"{value:.4g}"
+
+
+def _bin_numeric(values):
+    """Return integer codes and labels for a numeric column; NaN gets its own code"""
+    finite = ~np.isnan(values)
+    unique = np.unique(values[finite])
+
+    if len(unique) <= MAX_DISCRETE_VALUES:
+        codes = np.searchsorted(unique, values)
+        labels = [_format_number(v) for v in unique]
+    else:
+        edges = np.unique(np.quantile(values[finite], np.linspace(0, 1, NUMERIC_BINS + 1)))
+        codes = np.searchsorted(edges[1:-1], values, side='right')
+        labels = [f"{_format_number(lo)} to {_format_number(hi)}" for lo, hi in zip(edges[:-1], edges[1:])]
+
+    if not finite.all():
+        codes = np.where(finite, codes, len(labels))
+        labels.append('Missing')
+    return codes.astype(np.int64), labels
+
+
+def _encode_columns(df):
+    """Split columns into numeric value vectors and (codes, labels) encodings"""
+    numeric = []
+    encoded = []
+    for col in df.columns:
+        if col in EXCLUDED_COLUMNS:
+            continue
+        series = df[col]
+        if is_datetime64_any_dtype(series):
+            continue
+
+        if is_bool_dtype(series) or is_numeric_dtype(series):
+            values = series.to_numpy(dtype=np.float64, na_value=np.nan)
+            if np.isnan(values).all():
+                continue
+            numeric.append((col, values))
+            codes, labels = _bin_numeric(values)
+            encoded.append((col, 'numeric', codes, labels))
+        else:
+            codes, uniques = pd.factorize(series)
+            if len(uniques) == 0 or len(uniques) > MAX_CATEGORIES:
+                continue
+            labels = [str(u) for u in uniques]
+            if (codes < 0).any():
+                codes = np.where(codes < 0, len(labels), codes)
+                labels.append('Missing')
+            encoded.append((col, 'categorical', codes.astype(np.int64), labels))
+
+    return numeric, encoded
+
+
+def _numeric_correlations(numeric, y):
+    """Point-biserial correlation of each numeric column with y, in column blocks"""
+    n = len(y)
+    yc = y - y.mean()
+    sy = np.sqrt((yc ** 2).mean())
+    result = {}
+
+    for start in range(0, len(numeric), BLOCK_COLUMNS):
+        block = numeric[start:start + BLOCK_COLUMNS]
+        X = np.column_stack([values for _, values in block])
+        means = np.nanmean(X, axis=0)
+        X = np.where(np.isnan(X), means, X) - means
+        sx = np.sqrt((X ** 2).mean(axis=0))
+        with np.errstate(divide='ignore', invalid='ignore'):
+            r = (X.T @ yc) / n / (sx * sy)
+        for (col, _), value in zip(block, r):
+            result[col] = float(value) if np.isfinite(value) else 0.0
+
+    return result
+
+
+def _value_statistics(encoded, y_int):
+    """Contingency-derived statistics for every column value, one bincount per block"""
+    n = len(y_int)
+    attrition_total = int(y_int.sum())
+    base_rate = attrition_total / n
+    sy = np.sqrt(base_rate * (1 - base_rate))
+    py = np.array([1 - base_rate, base_rate])
+
+    value_rows = []
+    mutual_info = {}
+
+    for start in range(0, len(encoded), BLOCK_COLUMNS):
+        block = encoded[start:start + BLOCK_COLUMNS]
+        sizes = np.array([len(labels) for _, _, _, labels in block])
+        offsets = np.concatenate([[0], np.cumsum(sizes)[:-1]])
+
+        codes = np.column_stack([c for _, _, c, _ in block]) + offsets
+        index = (codes * 2 + y_int[:, None]).ravel()
+        counts = np.bincount(index, minlength=sizes.sum() * 2).reshape(-1, 2)
+
+        count = counts.sum(axis=1)
+        attrited = counts[:, 1]
+        with np.errstate(divide='ignore', invalid='ignore'):
+            rate = np.where(count > 0, attrited / count, 0.0)
+            lift = rate / base_rate if base_rate > 0 else np.zeros_like(rate)
+            share = count / n
+            rest_rate = np.where(n - count > 0, (attrition_total - attrited) / (n - count), 0.0)
+            r = (rate - rest_rate) * np.sqrt(share * (1 - share)) / sy if sy > 0 else np.zeros_like(rate)
+
+            pxy = counts / n
+            terms = np.where(pxy > 0, pxy * np.log2(pxy / (share[:, None] * py[None, :])), 0.0)
+        mi = np.add.reduceat(terms.sum(axis=1), offsets)
+
+        for (col, kind, _, labels), offset, column_mi in zip(block, offsets, mi):
+            mutual_info[col] = max(float(column_mi), 0.0)
+            for i, label in enumerate(labels):
+                j = offset + i
+                if count[j] == 0:
+                    continue
+                value_rows.append({
+                    'Feature': col,
+                    'Type': kind,
+                    'Value': label,
+                    'Count': int(count[j]),
+                    'AttritionCount': int(attrited[j]),
+                    'AttritionRate': round(float(rate[j]) * 100, 2),
+                    'Lift': round(float(lift[j]), 3),
+                    'PointBiserialR': round(float(np.nan_to_num(r[j])), 4),
+                })
+
+    return value_rows, mutual_info
+
+
+def compute_attrition_drivers(df):
+    """Compute the ranked driver table and per-value table for a processed dataset.
+
+    Returns (drivers, driver_values) DataFrames. drivers has one row per
+    column, ranked by mutual information with IsAttrition.
+    """
+    y = df[TARGET_COLUMN].to_numpy(dtype=np.float64)
+    y_int = y.astype(np.int64)
+
+    numeric, encoded = _encode_columns(df)
+    correlations = _numeric_correlations(numeric, y)
+    value_rows, mutual_info = _value_statistics(encoded, y_int)
+
+    driver_values = pd.DataFrame(value_rows, columns=[
+        'Feature', 'Type', 'Value', 'Count', 'AttritionCount',
+        'AttritionRate', 'Lift', 'PointBiserialR'
+    ])
+
+    driver_rows = []
+    for col, kind, _, _ in encoded:
+        values = driver_values[driver_values['Feature'] == col]
+        supported = values[values['Count'] >= MIN_SUPPORT]
+        if supported.empty:
+            supported = values
+        top = supported.loc[supported['Lift'].idxmax()]
+
+        if kind == 'numeric':
+            correlation = correlations[col]
+        else:
+            strongest = values.loc[values['PointBiserialR'].abs().idxmax()]
+            correlation = float(strongest['PointBiserialR'])
+
+        driver_rows.append({
+            'Feature': col,
+            'Type': kind,
+            'PointBiserialR': round(correlation, 4),
+            'AbsCorrelation': round(abs(correlation), 4),
+            'MutualInformation': round(mutual_info[col], 5),
+            'TopValue': top['Value'],
+            'TopValueAttritionRate': top['AttritionRate'],
+            'TopValueLift': top['Lift'],
+        })
+
+    drivers = pd.DataFrame(driver_rows)
+    if not drivers.empty:
+        drivers = drivers.sort_values(['MutualInformation', 'AbsCorrelation'], ascending=False)
+        drivers.insert(0, 'Rank', range(1, len(drivers) + 1))
+        driver_values = driver_values.sort_values(['Feature', 'Lift'], ascending=[True, False])
+
+    return drivers.reset_index(drop=True), driver_values.reset_index(drop=True)
+
+
+def _write_csv(df, path):
+    """Write a CSV through a temporary file so readers never see a partial table"""
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    df.to_csv(tmp_path, index=False)
+    os.replace(tmp_path, path)
+
+
+def load_attrition_drivers(df, source_digests=None, validated=None, processing_version=None,
+                           cache_dir=DRIVER_CACHE_DIR):
+    """Return (drivers, driver_values, cached), computing and caching on a miss"""
+    key = dataset_digest(df, source_digests, validated, processing_version)
+    drivers_path = os.path.join(cache_dir, f"{key}.drivers.csv")
+    values_path = os.path.join(cache_dir, f"{key}.values.csv")
+
+    if os.path.exists(drivers_path) and os.path.exists(values_path):
+        try:
+            drivers = pd.read_csv(drivers_path, dtype={'TopValue': str})
+            driver_values = pd.read_csv(values_path, dtype={'Value': str})
+            return drivers, driver_values, True
+        except (OSError, ValueError):
+            pass
+
+    drivers, driver_values = compute_attrition_drivers(df)
+
+    try:
+        os.makedirs(cache_dir, exist_ok=True)
+        # Values first: a drivers table on disk means its values table is complete
+        _write_csv(driver_values, values_path)
+        _write_csv(drivers, drivers_path)
+    except OSError as e:
+        print(f"Warning: could not cache driver analysis: {e}")
+
+    return drivers, driver_values, False
@@ -0,0 +1,211 @@
+#!/usr/bin/env python3
+"""
+HR Attrition Batch Analysis Runner
+==================================
+
+Runs HRAttritionAnalyzer over many business-unit datasets concurrently in a
+bounded process pool. Each unit writes its Power BI files into its own output
+directory, and a consolidated cross-unit summary is built from the per-unit
+KPI aggregates once all runs have finished.
+
+The batch manifest is a CSV or JSON file with one entry per unit:
+
+    unit,train_path,test_path,archive_path
+    Sales EMEA,data/sales_emea/train.csv,data/sales_emea/test.csv,
+    Finance,train.csv,test.csv,data/finance.zip
+
+archive_path is optional; when set, train_path and test_path name members of
+that archive. Relative paths are resolved against the manifest's directory.
+
+Usage:
+    python batch_analysis.py units.csv --output-dir batch_output --workers 8
+"""
+
+import argparse
+import contextlib
+import json
+import os
+import re
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import pandas as pd
+
+BATCH_SUMMARY_NAME = 'HR_Batch_Summary'
+
+
+def load_batch_manifest(manifest_path):
+    """Load the list of units from a CSV or JSON batch manifest"""
+    if manifest_path.lower().endswith('.json'):
+        with open(manifest_path, 'r') as f:
+            units = json.load(f)
+        if isinstance(units, dict):
+            units = units.get('units', [])
+    else:
+        units = pd.read_csv(manifest_path, dtype=str).fillna('').to_dict('records')
+
+    base_dir = os.path.dirname(os.path.abspath(manifest_path))
+    specs = []
+    for unit in units:
+        name = str(unit.get('unit', '')).strip()
+        if not name:
+            raise ValueError(f"Manifest entry without a unit name: {unit}")
+
+        archive_path = unit.get('archive_path') or None
+        if archive_path:
+            archive_path = os.path.join(base_dir, archive_path)
+            train_path = unit.get('train_path') or 'train.csv'
+            test_path = unit.get('test_path') or 'test.csv'
+        else:
+            train_path = os.path.join(base_dir, unit.get('train_path') or 'train.csv')
+            test_path = os.path.join(base_dir, unit.get('test_path') or 'test.csv')
+
+        specs.append({
+            'unit': name,
+            'train_path': train_path,
+            'test_path': test_path,
+            'archive_path': archive_path,
+        })
+
+    names = [spec['unit'] for spec in specs]
+    duplicates = sorted({name for name in names if names.count(name) > 1})
+    if duplicates:
+        raise ValueError(f"Duplicate unit names in manifest: {duplicates}")
+
+    return specs
+
+
+def unit_output_dir(output_root, unit):
+    """Return a filesystem-safe output directory for a unit"""
+    slug = re.sub(r'[^A-Za-z0-9._-]+', '_', unit).strip('_') or 'unit'
+    return os.path.join(output_root, slug)
+
+
+def run_unit(spec, output_root):
+    """Run the full analysis for one unit and return its KPI aggregates.
+
+    Executed inside a worker process. All console output of the run goes to
+    analysis.log in the unit's output directory, which also holds the unit's
+    dataset manifest and driver cache: units running at the same time never
+    read-modify-write a shared file, even when their data sits in one folder.
+    """
+    from dataset_io import MANIFEST_NAME
+    from hr_attrition_analysis import HRAttritionAnalyzer
+
+    output_dir = unit_output_dir(output_root, spec['unit'])
+    os.makedirs(output_dir, exist_ok=True)
+
+    result = {'Unit': spec['unit'], 'Status': 'ok', 'Error': '', 'OutputDir': output_dir}
+    start = time.perf_counter()
+
+    with open(os.path.join(output_dir, 'analysis.log'), 'w') as log:
+        with contextlib.redirect_stdout(log):
+            try:
+                analyzer = HRAttritionAnalyzer(output_dir=output_dir,
+                                               manifest_path=os.path.join(output_dir, MANIFEST_NAME),
+                                               driver_cache_dir=os.path.join(output_dir, '.driver_cache'))
+                if not analyzer.load_datasets(spec['train_path'], spec['test_path'],
+                                              archive_path=spec['archive_path']):
+                    raise FileNotFoundError("datasets could not be loaded")
+
+                analyzer.combine_datasets()
+                analyzer.process_data_for_powerbi()
+                if not analyzer.create_powerbi_datasets():
+                    raise RuntimeError("Power BI datasets could not be written")
+                analyzer.analyze_attrition_drivers()
+                analyzer.generate_insights_report()
+
+                for metric, value in zip(analyzer.summary_stats['Metric'], analyzer.summary_stats['Value']):
+                    result[metric] = value
+            except Exception as e:
+                print(f"Error: {e}")
+                result['Status'] = 'failed'
+                result['Error'] = str(e)
+
+    result['Seconds'] = round(time.perf_counter() - start, 2)
+    return result
+
+
+def build_batch_summary(results):
+    """Build the consolidated cross-unit summary table from per-unit results"""
+    summary = pd.DataFrame(results)
+    if summary.empty:
+        return summary
+
+    summary = summary.sort_values('Unit').reset_index(drop=True)
+    completed = summary[summary['Status'] == 'ok']
+    if not completed.empty and 'Total Employees' in completed:
+        totals = completed['Total Employees'].astype(float)
+        weights = totals / totals.sum()
+        overall = {
+            'Unit': 'ALL UNITS',
+            'Status': f"{len(completed)}/{len(summary)} ok",
+            'Error': '',
+            'OutputDir': '',
+            'Total Employees': int(totals.sum()),
+            'Attrition Count': int(completed['Attrition Count'].sum()),
+            'Attrition Rate (%)': round(completed['Attrition Count'].sum() / totals.sum() * 100, 1),
+            'Average Tenure (Years)': round((completed['Average Tenure (Years)'] * weights).sum(), 1),
+            'Average Job Satisfaction': round((completed['Average Job Satisfaction'] * weights).sum(), 1),
+            'Seconds': summary['Seconds'].sum(),
+        }
+        summary = pd.concat([summary, pd.DataFrame([overall])], ignore_index=True)
+
+    return summary
+
+
+def run_batch(manifest_path, output_root='batch_output', max_workers=None):
+    """Run every unit in the manifest in a bounded process pool"""
+    specs = load_batch_manifest(manifest_path)
+    if not specs:
+        print("No units found in manifest")
+        return None
+
+    if max_workers is None:
+        max_workers = os.cpu_count() or 1
+    max_workers = max(1, min(max_workers, len(specs)))
+
+    print(f"🚀 Running {len(specs)} units with {max_workers} workers...")
+    os.makedirs(output_root, exist_ok=True)
+    start = time.perf_counter()
+
+    results = []
+    with ProcessPoolExecutor(max_workers=max_workers) as pool:
+        futures = {pool.submit(run_unit, spec, output_root): spec for spec in specs}
+        for future in as_completed(futures):
+            spec = futures[future]
+            try:
+                result = future.result()
+            except Exception as e:
+                result = {'Unit': spec['unit'], 'Status': 'failed', 'Error': str(e),
+                          'OutputDir': unit_output_dir(output_root, spec['unit'])}
+            results.append(result)
+
+            marker = "✅" if result['Status'] == 'ok' else "❌"
+            print(f"{marker} {result['Unit']} ({len(results)}/{len(specs)})"
+                  + (f": {result['Error']}" if result['Error'] else ""))
+
+    summary = build_batch_summary(results)
+    summary_path = os.path.join(output_root, BATCH_SUMMARY_NAME)
+    summary.to_csv(summary_path + '.csv', index=False)
+    summary.to_excel(summary_path + '.xlsx', index=False)
+
+    failed = (summary['Status'] == 'failed').sum()
+    print(f"\n🎉 Batch completed in {time.perf_counter() - start:.1f}s ({failed} failed)")
+    print(f"📁 Consolidated summary: {summary_path}.csv / .xlsx")
+
+    return summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the HR attrition analysis for many business units")
+    parser.add_argument('manifest', help="CSV or JSON batch manifest")
+    parser.add_argument('--output-dir', default='batch_output', help="Root directory for per-unit outputs")
+    parser.add_argument('--workers', type=int, default=None, help="Maximum worker processes")
+    args = parser.parse_args()
+
+    run_batch(args.manifest, output_root=args.output_dir, max_workers=args.workers)
+
+
+if __name__ == "__main__":
+    main()
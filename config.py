@@ -3,6 +3,36 @@ from typing import Dict, List
 
 # OpenAI Configuration
 OPENAI_API_KEY = os.getenv("OPENAI_API_KEY", "your-openai-api-key-here")
+OPENAI_MODEL = os.getenv("OPENAI_MODEL", "gpt-3.5-turbo")
+
+# Shared OpenAI client: HTTP connection pool and request concurrency limits
+OPENAI_CLIENT_CONFIG = {
+    "max_connections": int(os.getenv("OPENAI_MAX_CONNECTIONS", "20")),
+    "max_keepalive_connections": int(os.getenv("OPENAI_MAX_KEEPALIVE", "10")),
+    "keepalive_expiry": 60.0,
+    "max_concurrent_requests": int(os.getenv("OPENAI_MAX_CONCURRENCY", "8")),
+    "timeout": 30.0,
+    "max_retries": 2
+}
+
+# Interview history sent with each response: recent turns verbatim, older turns summarized
+HISTORY_CONFIG = {
+    "recent_turns": int(os.getenv("HISTORY_RECENT_TURNS", "6")),
+    "token_budget": int(os.getenv("HISTORY_TOKEN_BUDGET", "1500")),
+    "summary_max_tokens": 200,
+    "summary_retry_seconds": 5  # wait before retrying a failed summary, doubled up to 60 s
+}
+
+# Cached scoring and follow-up responses: in-memory LRU plus a SQLite file
+RESPONSE_CACHE_CONFIG = {
+    "path": os.getenv("RESPONSE_CACHE_PATH", ".response_cache/responses.sqlite3"),
+    "memory_entries": int(os.getenv("RESPONSE_CACHE_MEMORY_ENTRIES", "512")),
+    "max_entries": int(os.getenv("RESPONSE_CACHE_MAX_ENTRIES", "50000")),
+    "ttl_seconds": float(os.getenv("RESPONSE_CACHE_TTL_DAYS", "30")) * 86400
+}
+
+# Final interview reports are cached here by interview content
+REPORT_CACHE_DIR = os.getenv("REPORT_CACHE_DIR", ".report_cache")
 
 # Available Roles for Interview
 INTERVIEW_ROLES = {
@@ -83,6 +113,14 @@ SCORING_CRITERIA = {
     "problem_solving": "How well does the candidate demonstrate problem-solving skills?"
 }
 
+# Text-to-speech voice and pre-synthesized audio cache
+TTS_CONFIG = {
+    "rate": 150,
+    "volume": 0.8,
+    "voice_hints": ["female", "woman"],
+    "cache_dir": os.getenv("TTS_CACHE_DIR", ".tts_cache")
+}
+
 # Audio Settings
 AUDIO_CONFIG = {
     "sample_rate": 16000,
@@ -90,9 +128,88 @@ AUDIO_CONFIG = {
     "chunk_size": 1024
 }
 
+# Streaming speech capture: VAD segmentation and recognizer backend
+SPEECH_STREAM_CONFIG = {
+    "recognizer": os.getenv("SPEECH_RECOGNIZER", "google"),  # google, sphinx (offline) or whisper (offline)
+    "vad": os.getenv("SPEECH_VAD", "energy"),  # energy or webrtc
+    "vad_aggressiveness": 2,
+    "vad_calibration_s": 1.0,  # ambient noise measured at the start of browser audio (energy VAD)
+    "sample_rate": 16000,
+    "frame_ms": 30,
+    "ring_seconds": 10,
+    "preroll_ms": 300,
+    "hangover_ms": 600,
+    "min_speech_ms": 150,
+    "max_segment_s": 15,
+    "end_silence_s": 2.5,
+    "start_timeout_s": 10,
+    "max_duration_s": 120
+}
+
+# Microphone ambient-noise calibration, shared by all sessions and redone when stale
+NOISE_PROFILE_CONFIG = {
+    "duration_s": 1.0,
+    "max_age_s": 600
+}
+
 # Video Settings  
 VIDEO_CONFIG = {
     "width": 640,
     "height": 480,
     "fps": 30
-}
\ No newline at end of file
+}
+
+# Interview recording: frames are encoded to disk while recording
+RECORDING_CONFIG = {
+    "directory": os.getenv("RECORDING_DIR", "recordings"),
+    "codec": "mp4v",
+    "queue_frames": 60,  # about 55 MB of 640x480 frames waiting for the encoder
+    "max_fill_seconds": 1.0,  # longest source stall filled with repeated frames; longer ones become gaps
+    "segment_seconds": 300
+}
+
+# Face tracking: downscaled detection every few frames, tracking in between
+FACE_TRACKING_CONFIG = {
+    "enabled": True,
+    "detect_scale": 0.5,  # detection runs on frames scaled by this factor
+    "detect_every": 5,  # full detection every N analyzed frames
+    "roi_margin": 0.5,  # search margin around a tracked face, as a fraction of its size
+    "max_misses": 3,  # frames a face is carried forward without being re-detected
+    "min_face_size": 60  # smallest face to detect, in full-resolution pixels
+}
+
+# Background face-presence timeline built while recording
+FACE_TIMELINE_CONFIG = {
+    "sample_fps": 2.0,  # frames analyzed per second
+    "min_gap_s": 1.0  # shorter absences between two presences are treated as detection flicker
+}
+
+# Offline post-processing of finished recordings (python postprocess.py)
+POSTPROCESS_CONFIG = {
+    "workers": int(os.getenv("POSTPROCESS_WORKERS", "0")),  # 0 uses every core
+    "chunk_seconds": 60,  # length of the time slices decoded in parallel
+    "analysis_fps": 10,  # frames per second run through face analysis
+    "thumbnail_seconds": 30,
+    "thumbnail_width": 160,
+    "archive_scale": 0.5,  # archive copy resolution relative to the recording
+    "archive_fps": 15,
+    "poll_seconds": 10,  # how often --watch looks for new recordings
+    "retry_seconds": 60,  # wait before retrying a failed recording, doubled after each failure
+    "max_attempts": 5  # failures after which a recording is left alone until the next start
+}
+
+# Compressed in-memory copy of the recording for instant replay on the results page
+REPLAY_CONFIG = {
+    "enabled": os.getenv("REPLAY_ENABLED", "true").lower() == "true",
+    "budget_mb": float(os.getenv("REPLAY_BUDGET_MB", "64")),  # oldest frames are evicted beyond this
+    "fps": 15,
+    "format": ".jpg",  # .jpg or .png (lossless, about 3x larger)
+    "quality": 80,
+    "queue_frames": 8  # frames waiting for the replay encoder before new ones are skipped
+}
+
+# Browser camera and microphone over WebRTC (streamlit-webrtc); falls back to the server camera
+WEBRTC_CONFIG = {
+    "enabled": os.getenv("MEDIA_WEBRTC", "true").lower() == "true",
+    "ice_servers": [{"urls": [os.getenv("WEBRTC_STUN_URL", "stun:stun.l.google.com:19302")]}]
+}
@@ -0,0 +1,159 @@
+import asyncio
+import threading
+from concurrent.futures import Future
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple
+
+from config import HISTORY_CONFIG, OPENAI_MODEL
+
+try:
+    import tiktoken
+except ImportError:
+    tiktoken = None
+
+
+@lru_cache(maxsize=None)
+def _encoding_for(model: str):
+    if tiktoken is None:
+        return None
+    try:
+        return tiktoken.encoding_for_model(model)
+    except KeyError:
+        return tiktoken.get_encoding("cl100k_base")
+
+
+def count_tokens(text: str, model: str = OPENAI_MODEL) -> int:
+    """Count tokens locally with tiktoken, or estimate ~4 characters per token without it"""
+    encoding = _encoding_for(model)
+    if encoding is None:
+        return (len(text) + 3) // 4
+    return len(encoding.encode(text))
+
+
+def count_message_tokens(messages: List[Dict], model: str = OPENAI_MODEL) -> int:
+    """Token count of chat messages, including the per-message framing overhead"""
+    return sum(count_tokens(message["content"], model) + 4 for message in messages) + 2
+
+
+class ConversationHistory:
+    """Token-budgeted interview history
+
+    The last recent_turns turns are kept verbatim. Older turns are folded
+    into a rolling summary by a background request on the shared OpenAI
+    client, so generate_response never waits for summarization. messages()
+    always fits within token_budget: if the summary is still being written,
+    the oldest turns that do not fit are left out. A failed summary is
+    retried after summary_retry_seconds, backing off while it keeps failing.
+    """
+
+    def __init__(self, client, model: str = OPENAI_MODEL, config: Optional[dict] = None):
+        self.client = client
+        self.model = model
+        self.config = dict(HISTORY_CONFIG, **(config or {}))
+        self.summary = ""
+        self.turns: List[Tuple[str, str]] = []
+        self._folding: Optional[Future] = None
+        self._fold_failures = 0
+        self._generation = 0
+        self._lock = threading.RLock()
+
+    def add_turn(self, user_input: str, response: str):
+        """Record one exchange and fold older turns into the summary if needed"""
+        with self._lock:
+            self.turns.append((user_input, response))
+            self._maybe_fold()
+
+    def _maybe_fold(self, delay: float = 0.0):
+        """Start a background summary of the turns beyond recent_turns (lock held)"""
+        if self._folding is not None:
+            return
+        fold_count = len(self.turns) - self.config["recent_turns"]
+        if fold_count <= 0:
+            return
+
+        older = self.turns[:fold_count]
+        generation = self._generation
+        self._folding = self.client.submit(self._summarize(self.summary, older, delay))
+        self._folding.add_done_callback(lambda future: self._fold_done(future, fold_count, generation))
+
+    def _fold_done(self, future: Future, fold_count: int, generation: int):
+        with self._lock:
+            if generation != self._generation:
+                return  # history was cleared while the summary was being written
+            self._folding = None
+            if future.cancelled():
+                return  # the client is shutting down
+            try:
+                self.summary = future.result()
+            except Exception as e:
+                # Keep the turns; messages() trims them to the budget until the retry succeeds
+                self._fold_failures += 1
+                delay = min(self.config["summary_retry_seconds"] * 2 ** (self._fold_failures - 1), 60)
+                print(f"History summarization failed, retrying in {delay:.0f}s: {e}")
+                self._maybe_fold(delay)
+                return
+            self._fold_failures = 0
+            del self.turns[:fold_count]
+            self._maybe_fold()
+
+    async def _summarize(self, summary: str, turns: List[Tuple[str, str]], delay: float = 0.0) -> str:
+        """Merge turns into the running summary, after waiting delay seconds"""
+        if delay:
+            await asyncio.sleep(delay)
+        transcript = "\n".join(f"Candidate: {user}\nInterviewer: {assistant}" for user, assistant in turns)
+        prompt = f"""
+        Update the running summary of a job interview with the new exchanges below.
+        Keep facts about the candidate's experience, skills and answers, and the
+        topics already covered. Stay under {self.config['summary_max_tokens']} tokens.
+
+        Current summary:
+        {summary or "(none yet)"}
+
+        New exchanges:
+        {transcript}
+        """
+
+        response = await self.client.chat_completion(
+            model=self.model,
+            messages=[{"role": "user", "content": prompt}],
+            max_tokens=self.config["summary_max_tokens"],
+            temperature=0.2
+        )
+        return response.choices[0].message.content.strip()
+
+    def messages(self) -> List[Dict]:
+        """History as chat messages: the summary, then as many recent turns as fit the budget"""
+        with self._lock:
+            summary = self.summary
+            turns = list(self.turns)
+
+        prefix = []
+        if summary:
+            prefix = [{"role": "system", "content": f"Summary of the interview so far: {summary}"}]
+        turn_messages = [
+            [{"role": "user", "content": user}, {"role": "assistant", "content": assistant}]
+            for user, assistant in turns
+        ]
+
+        budget = self.config["token_budget"] - count_message_tokens(prefix, self.model)
+        kept = []
+        for pair in reversed(turn_messages):
+            cost = count_message_tokens(pair, self.model) - 2
+            if cost > budget:
+                break
+            budget -= cost
+            kept.insert(0, pair)
+
+        return prefix + [message for pair in kept for message in pair]
+
+    def token_count(self) -> int:
+        """Tokens the history currently adds to a request"""
+        return count_message_tokens(self.messages(), self.model)
+
+    def clear(self):
+        with self._lock:
+            self.summary = ""
+            self.turns = []
+            self._folding = None
+            self._fold_failures = 0
+            self._generation += 1
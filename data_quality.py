@@ -0,0 +1,240 @@
+"""
+HR Attrition Data Quality Checks
+================================
+
+Validates raw train/test rows against a declarative column schema before they
+reach process_data_for_powerbi. Every chunk is checked with vectorized masks:
+
+- Numeric columns must parse as numbers and fall inside [min, max]
+- Enumerated columns must only contain their allowed values
+- Required columns must not be null; null rates above max_null_rate fail
+- Cross-column constraints (e.g. YearsInCurrentRole <= YearsAtCompany)
+
+Rows that break any check are removed from the chunk and appended to a
+quarantine CSV together with the names of the checks they failed. The
+validator accumulates counts across chunks and produces a quality summary.
+
+Category columns are best parsed with the dtypes from parse_dtypes(): the
+parser then hands over integer codes plus a handful of distinct values, so
+null and enumeration checks never touch per-row Python strings. The columns
+are converted back to plain values before the chunk is returned.
+"""
+
+import os
+import time
+
+import numpy as np
+import pandas as pd
+from pandas.api.types import is_numeric_dtype
+
+# Column schema: kind is 'numeric', 'category' (few distinct values) or 'text'.
+# Columns missing from a dataset are skipped and reported in the summary.
+HR_SCHEMA = {
+    'EmployeeID': {'kind': 'text', 'required': True},
+    'Age': {'kind': 'numeric', 'min': 16, 'max': 100, 'required': True},
+    'Gender': {'kind': 'category', 'max_null_rate': 0.05},
+    'Department': {'kind': 'category', 'required': True},
+    'JobRole': {'kind': 'category', 'max_null_rate': 0.05},
+    'MaritalStatus': {'kind': 'category', 'allowed': ['Single', 'Married', 'Divorced'], 'max_null_rate': 0.05},
+    'YearsAtCompany': {'kind': 'numeric', 'min': 0, 'max': 60, 'required': True},
+    'YearsInCurrentRole': {'kind': 'numeric', 'min': 0, 'max': 60, 'max_null_rate': 0.05},
+    'YearsWithCurrManager': {'kind': 'numeric', 'min': 0, 'max': 60, 'max_null_rate': 0.05},
+    'MonthlyIncome': {'kind': 'numeric', 'min': 0, 'max': 1000000, 'required': True},
+    'JobSatisfaction': {'kind': 'numeric', 'min': 1, 'max': 4, 'required': True},
+    'EnvironmentSatisfaction': {'kind': 'numeric', 'min': 1, 'max': 4, 'required': True},
+    'RelationshipSatisfaction': {'kind': 'numeric', 'min': 1, 'max': 4, 'max_null_rate': 0.05},
+    'WorkLifeBalance': {'kind': 'numeric', 'min': 1, 'max': 4, 'required': True},
+    'PerformanceRating': {'kind': 'numeric', 'min': 1, 'max': 4, 'required': True},
+    'DistanceFromHome': {'kind': 'numeric', 'min': 0, 'max': 500, 'required': True},
+    'BusinessTravel': {'kind': 'category', 'allowed': ['Non-Travel', 'Travel_Rarely', 'Travel_Frequently'],
+                       'required': True},
+    'OverTime': {'kind': 'category', 'allowed': ['Yes', 'No'], 'required': True},
+    'TrainingTimesLastYear': {'kind': 'numeric', 'min': 0, 'max': 50, 'required': True},
+    'StockOptionLevel': {'kind': 'numeric', 'min': 0, 'max': 3, 'required': True},
+    'NumCompaniesWorked': {'kind': 'numeric', 'min': 0, 'max': 50, 'max_null_rate': 0.05},
+    'Attrition': {'kind': 'category', 'allowed': ['Yes', 'No'], 'required': True},
+}
+
+# Cross-column constraints: (check name, columns, function returning a mask of violations)
+HR_CROSS_CHECKS = [
+    ('YearsInCurrentRole <= YearsAtCompany', ('YearsInCurrentRole', 'YearsAtCompany'),
+     lambda df: df['YearsInCurrentRole'] > df['YearsAtCompany']),
+    ('YearsWithCurrManager <= YearsAtCompany', ('YearsWithCurrManager', 'YearsAtCompany'),
+     lambda df: df['YearsWithCurrManager'] > df['YearsAtCompany']),
+    ('YearsAtCompany <= Age', ('YearsAtCompany', 'Age'),
+     lambda df: df['YearsAtCompany'] > df['Age']),
+]
+
+
+def _null_mask(data):
+    """Null mask for a column's values, or None if the dtype cannot hold nulls.
+
+    NaN is the only object the CSV parser uses for missing strings, so
+    object columns use the much cheaper x != x test instead of isna.
+    """
+    if data.dtype == object or data.dtype.kind == 'f':
+        return data != data
+    if data.dtype.kind in 'iub':
+        return None
+    return pd.isna(data)
+
+
+class DataQualityValidator:
+    """Chunk-wise schema validator with a quarantine side file"""
+
+    def __init__(self, schema=None, cross_checks=None, quarantine_path='HR_Quarantined_Rows.csv'):
+        self.schema = HR_SCHEMA if schema is None else schema
+        self.cross_checks = HR_CROSS_CHECKS if cross_checks is None else cross_checks
+        self.quarantine_path = quarantine_path
+        self.rows_checked = 0
+        self.rows_quarantined = 0
+        self.check_counts = {}
+        self.null_counts = {}
+        self.missing_columns = set()
+        self.seconds = 0.0
+        self._quarantine_started = False
+
+    def parse_dtypes(self):
+        """Return read_csv dtypes that parse category columns as categoricals"""
+        return {col: 'category' for col, rules in self.schema.items() if rules['kind'] == 'category'}
+
+    def _record(self, name, mask, masks):
+        count = 0 if mask is None else int(np.count_nonzero(mask))
+        self.check_counts[name] = self.check_counts.get(name, 0) + count
+        if count:
+            masks.append((name, mask))
+
+    def validate_chunk(self, chunk, source=''):
+        """Validate one chunk, quarantine failing rows and return the clean rows"""
+        start = time.perf_counter()
+        masks = []
+
+        for col, rules in self.schema.items():
+            if col not in chunk.columns:
+                self.missing_columns.add(col)
+                continue
+
+            values = chunk[col]
+            if isinstance(values.dtype, pd.CategoricalDtype):
+                self._check_categorical(chunk, col, rules, masks)
+                continue
+
+            data = values.to_numpy()
+            nulls = _null_mask(data)
+            null_count = 0 if nulls is None else int(np.count_nonzero(nulls))
+            self.null_counts[col] = self.null_counts.get(col, 0) + null_count
+            if rules.get('required'):
+                self._record(f"{col} not null", nulls, masks)
+
+            if rules['kind'] == 'numeric':
+                if not is_numeric_dtype(values):
+                    numbers = pd.to_numeric(values, errors='coerce')
+                    not_numeric = numbers.isna().to_numpy()
+                    if nulls is not None:
+                        # to_numpy() may hand back a read-only view, so don't update it in place
+                        not_numeric = not_numeric & ~nulls
+                    self._record(f"{col} numeric", not_numeric, masks)
+                    chunk[col] = numbers
+                    data = numbers.to_numpy()
+                if 'min' in rules:
+                    self._record(f"{col} >= {rules['min']}", data < rules['min'], masks)
+                if 'max' in rules:
+                    self._record(f"{col} <= {rules['max']}", data > rules['max'], masks)
+            elif 'allowed' in rules:
+                # Check the distinct values first; build a row mask only if some are unexpected
+                unexpected = [value for value in pd.unique(data)
+                              if value == value and value not in rules['allowed']]
+                self._record(f"{col} in allowed values",
+                             values.isin(unexpected).to_numpy() if unexpected else None, masks)
+
+        for name, columns, check in self.cross_checks:
+            if all(col in chunk.columns for col in columns):
+                self._record(name, check(chunk).to_numpy(dtype=bool), masks)
+
+        self.rows_checked += len(chunk)
+        if not masks:
+            self.seconds += time.perf_counter() - start
+            return chunk
+
+        bad = np.logical_or.reduce([mask for _, mask in masks])
+        bad_index = np.flatnonzero(bad)
+        reasons = ['; '.join(name for name, mask in masks if mask[i]) for i in bad_index]
+        self._quarantine(chunk.iloc[bad_index].assign(QuarantineSource=source, QuarantineReason=reasons))
+        self.rows_quarantined += len(bad_index)
+
+        self.seconds += time.perf_counter() - start
+        return chunk[~bad]
+
+    def _check_categorical(self, chunk, col, rules, masks):
+        """Null and enumeration checks on a categorical column's codes, then
+        restore the column to the values a plain parse would have produced"""
+        values = chunk[col]
+        codes = values.cat.codes.to_numpy()
+        categories = values.cat.categories
+
+        nulls = codes < 0
+        self.null_counts[col] = self.null_counts.get(col, 0) + int(np.count_nonzero(nulls))
+        if rules.get('required'):
+            self._record(f"{col} not null", nulls, masks)
+
+        if 'allowed' in rules:
+            unexpected = np.flatnonzero(~categories.isin(rules['allowed']))
+            self._record(f"{col} in allowed values",
+                         np.isin(codes, unexpected) if len(unexpected) else None, masks)
+
+        numbers = pd.to_numeric(categories, errors='coerce')
+        if len(categories) and not numbers.isna().any():
+            values = values.cat.rename_categories(numbers)
+        chunk[col] = values.to_numpy()
+
+    def _quarantine(self, rows):
+        """Append failing rows to the quarantine file, replacing it on first use"""
+        directory = os.path.dirname(self.quarantine_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        mode = 'a' if self._quarantine_started else 'w'
+        rows.to_csv(self.quarantine_path, mode=mode, header=not self._quarantine_started, index=False)
+        self._quarantine_started = True
+
+    def summary(self):
+        """Return the quality summary as a DataFrame, one row per check"""
+        rows = []
+        checked = max(self.rows_checked, 1)
+
+        for name, count in self.check_counts.items():
+            rows.append({
+                'Check': name,
+                'Violations': count,
+                'Rate (%)': round(count / checked * 100, 3),
+                'Status': 'PASS' if count == 0 else 'FAIL',
+            })
+
+        for col, rules in self.schema.items():
+            if 'max_null_rate' not in rules or col not in self.null_counts:
+                continue
+            rate = self.null_counts[col] / checked
+            rows.append({
+                'Check': f"{col} null rate <= {rules['max_null_rate']:.0%}",
+                'Violations': self.null_counts[col],
+                'Rate (%)': round(rate * 100, 3),
+                'Status': 'PASS' if rate <= rules['max_null_rate'] else 'FAIL',
+            })
+
+        for col in sorted(self.missing_columns):
+            rows.append({'Check': f"{col} present", 'Violations': 0, 'Rate (%)': 0.0, 'Status': 'SKIPPED'})
+
+        return pd.DataFrame(rows, columns=['Check', 'Violations', 'Rate (%)', 'Status'])
+
+    def report(self):
+        """Print a short quality report"""
+        summary = self.summary()
+        failed = summary[summary['Status'] == 'FAIL']
+
+        print(f"Data quality: {self.rows_checked:,} rows checked, {self.rows_quarantined:,} quarantined "
+              f"({self.seconds:.2f}s)")
+        if not failed.empty:
+            print(failed.to_string(index=False))
+        if self.rows_quarantined:
+            print(f"Quarantined rows written to {self.quarantine_path}")
+        if self.missing_columns:
+            print(f"Columns not in dataset (checks skipped): {', '.join(sorted(self.missing_columns))}")
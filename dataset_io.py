@@ -0,0 +1,272 @@
+"""
+HR Attrition Dataset I/O Helpers
+================================
+
+Lightweight helpers shared by the downloader and the analysis script for
+verifying the raw train/test CSV files without parsing them in full, and for
+reading them in chunks either from disk or straight out of the downloaded
+archive without an extraction step.
+
+Verification results (row count, columns, attrition rate and a SHA-256
+content digest) are recorded in a small JSON manifest that lives next to the
+data files, or at an explicit path for callers that must not share it. A file
+whose size and modification time still match its manifest entry is treated as
+unchanged and is not read again.
+"""
+
+import hashlib
+import json
+import mmap
+import os
+import tarfile
+import zipfile
+from contextlib import contextmanager
+from datetime import datetime
+
+import pandas as pd
+
+MANIFEST_NAME = 'dataset_manifest.json'
+DIGEST_CHUNK_SIZE = 1024 * 1024
+SCAN_BLOCK_SIZE = 16 * 1024 * 1024
+DATASET_ARCHIVE = 'employee-attrition-dataset.zip'
+CSV_CHUNK_ROWS = 50000
+
+
+def file_digest(path, chunk_size=DIGEST_CHUNK_SIZE):
+    """Return the SHA-256 hex digest of a file, read in fixed-size chunks"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(chunk_size), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def count_csv_rows(path):
+    """Count data rows in a CSV file with a memory-mapped newline scan.
+
+    The header line is not counted and a final line without a trailing
+    newline is. Quoted fields containing embedded newlines are counted as
+    extra rows, which does not happen in the Kaggle attrition extracts.
+    """
+    if os.path.getsize(path) == 0:
+        return 0
+
+    with open(path, 'rb') as f:
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            lines = 0
+            for offset in range(0, len(mm), SCAN_BLOCK_SIZE):
+                lines += mm[offset:offset + SCAN_BLOCK_SIZE].count(b'\n')
+            if mm[-1:] != b'\n':
+                lines += 1
+
+    return max(lines - 1, 0)
+
+
+def manifest_path_for(path):
+    """Return the manifest file that covers the given data file"""
+    return os.path.join(os.path.dirname(os.path.abspath(path)), MANIFEST_NAME)
+
+
+def manifest_key(path, manifest_path):
+    """Return the key of a data file in a manifest.
+
+    A directory's own manifest keys its files by name; a manifest kept
+    elsewhere keys them by absolute path, since they may live in any folder.
+    """
+    path = os.path.abspath(path)
+    if os.path.dirname(path) == os.path.dirname(os.path.abspath(manifest_path)):
+        return os.path.basename(path)
+    return path
+
+
+def load_manifest(manifest_path):
+    """Load a manifest file, returning an empty manifest if it is missing or corrupt"""
+    try:
+        with open(manifest_path, 'r') as f:
+            manifest = json.load(f)
+        if isinstance(manifest, dict) and isinstance(manifest.get('files'), dict):
+            return manifest
+    except (OSError, ValueError):
+        pass
+    return {'files': {}}
+
+
+def save_manifest(manifest, manifest_path):
+    """Atomically write a manifest file"""
+    tmp_path = f"{manifest_path}.{os.getpid()}.tmp"
+    with open(tmp_path, 'w') as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+    os.replace(tmp_path, manifest_path)
+
+
+def _file_signature(path):
+    stat = os.stat(path)
+    return {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns}
+
+
+def get_manifest_entry(path, manifest, key=None):
+    """Return the manifest entry for a file if it is still current, else None"""
+    entry = manifest['files'].get(os.path.basename(path) if key is None else key)
+    if entry is None:
+        return None
+
+    signature = _file_signature(path)
+    if entry.get('size') != signature['size'] or entry.get('mtime_ns') != signature['mtime_ns']:
+        return None
+    return entry
+
+
+def inspect_csv_file(path):
+    """Build a manifest entry for a CSV file using only the header and Attrition column"""
+    signature = _file_signature(path)
+    columns = list(pd.read_csv(path, nrows=0).columns)
+
+    entry = {
+        'size': signature['size'],
+        'mtime_ns': signature['mtime_ns'],
+        'rows': count_csv_rows(path),
+        'columns': columns,
+        'attrition_rate': None,
+        'sha256': file_digest(path),
+        'verified_at': datetime.now().isoformat(timespec='seconds'),
+    }
+
+    if 'Attrition' in columns:
+        attrition = pd.read_csv(path, usecols=['Attrition'])['Attrition']
+        if len(attrition):
+            entry['attrition_rate'] = round(float((attrition == 'Yes').mean() * 100), 4)
+
+    return entry
+
+
+def verify_csv_files(paths, force=False, manifest_path=None):
+    """Verify CSV files against their manifests, inspecting only changed files.
+
+    Returns a dict mapping each path to a tuple of (manifest entry, cached)
+    where ``cached`` is True when the entry was reused without reading the
+    file. Raises FileNotFoundError if any path does not exist. With
+    manifest_path, all files are recorded in that one manifest instead of
+    the ones next to them.
+    """
+    results = {}
+    manifests = {}
+    dirty = set()
+
+    for path in paths:
+        if not os.path.exists(path):
+            raise FileNotFoundError(f"No such file: '{path}'")
+
+        path_manifest = manifest_path or manifest_path_for(path)
+        if path_manifest not in manifests:
+            manifests[path_manifest] = load_manifest(path_manifest)
+        manifest = manifests[path_manifest]
+        key = manifest_key(path, path_manifest)
+
+        entry = None if force else get_manifest_entry(path, manifest, key)
+        if entry is not None:
+            results[path] = (entry, True)
+            continue
+
+        entry = inspect_csv_file(path)
+        manifest['files'][key] = entry
+        dirty.add(path_manifest)
+        results[path] = (entry, False)
+
+    for path_manifest in dirty:
+        try:
+            save_manifest(manifests[path_manifest], path_manifest)
+        except OSError as e:
+            print(f"Warning: could not write manifest {path_manifest}: {e}")
+
+    return results
+
+
+def verify_archive(archive_path, force=False, manifest_path=None):
+    """Verify a dataset archive against its manifest without decompressing it.
+
+    Returns a tuple of (manifest entry, cached). The entry lists the archive
+    members with their uncompressed sizes and the digest of the archive file.
+    """
+    manifest_path = manifest_path or manifest_path_for(archive_path)
+    manifest = load_manifest(manifest_path)
+    key = manifest_key(archive_path, manifest_path)
+
+    entry = None if force else get_manifest_entry(archive_path, manifest, key)
+    if entry is not None:
+        return entry, True
+
+    signature = _file_signature(archive_path)
+    entry = {
+        'size': signature['size'],
+        'mtime_ns': signature['mtime_ns'],
+        'members': list_archive_members(archive_path),
+        'sha256': file_digest(archive_path),
+        'verified_at': datetime.now().isoformat(timespec='seconds'),
+    }
+    manifest['files'][key] = entry
+    try:
+        save_manifest(manifest, manifest_path)
+    except OSError as e:
+        print(f"Warning: could not write manifest {manifest_path}: {e}")
+
+    return entry, False
+
+
+def list_archive_members(archive_path):
+    """Return a dict of member name to uncompressed size for a zip or tar archive"""
+    if zipfile.is_zipfile(archive_path):
+        with zipfile.ZipFile(archive_path) as zf:
+            return {info.filename: info.file_size for info in zf.infolist() if not info.is_dir()}
+
+    if tarfile.is_tarfile(archive_path):
+        with tarfile.open(archive_path, 'r:*') as tf:
+            return {member.name: member.size for member in tf.getmembers() if member.isfile()}
+
+    raise ValueError(f"Unsupported archive format: '{archive_path}'")
+
+
+def _match_member(names, member_name):
+    """Find an archive member by exact name, falling back to its base name"""
+    if member_name in names:
+        return member_name
+    for name in names:
+        if os.path.basename(name) == os.path.basename(member_name):
+            return name
+    raise KeyError(f"'{member_name}' not found in archive")
+
+
+@contextmanager
+def open_archive_member(archive_path, member_name):
+    """Open a member of a zip or tar archive as a streaming binary file object.
+
+    The member is decompressed on the fly as it is read; nothing is extracted
+    to disk. Members in subdirectories are matched by base name.
+    """
+    if zipfile.is_zipfile(archive_path):
+        with zipfile.ZipFile(archive_path) as zf:
+            name = _match_member(zf.namelist(), member_name)
+            with zf.open(name) as fh:
+                yield fh
+        return
+
+    if tarfile.is_tarfile(archive_path):
+        with tarfile.open(archive_path, 'r:*') as tf:
+            name = _match_member([m.name for m in tf.getmembers() if m.isfile()], member_name)
+            with tf.extractfile(name) as fh:
+                yield fh
+        return
+
+    raise ValueError(f"Unsupported archive format: '{archive_path}'")
+
+
+def iter_csv_chunks(path, archive_path=None, chunksize=CSV_CHUNK_ROWS, dtype=None):
+    """Yield DataFrame chunks of a CSV file, read from disk or from inside an archive"""
+    if archive_path is None:
+        with pd.read_csv(path, chunksize=chunksize, dtype=dtype) as reader:
+            yield from reader
+        return
+
+    with open_archive_member(archive_path, path) as fh:
+        with pd.read_csv(fh, chunksize=chunksize, dtype=dtype) as reader:
+            yield from reader
+
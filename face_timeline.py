@@ -0,0 +1,215 @@
+"""
+Face-presence timeline of an interview.
+
+A FaceAnalysisWorker samples the live camera a few times per second on its
+own thread and appends each result to a FaceTimeline, a small numpy array
+that grows in chunks (an hour of interview is about 170 KB). Presence
+intervals, multiple-face events and averages are derived from the array
+on demand, so the results page never has to touch the recorded video.
+"""
+
+import threading
+import time
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from config import FACE_TIMELINE_CONFIG
+from video_recorder import FaceDetector, VideoRecorder
+
+# Columns of FaceTimeline.samples(); the box is that of the largest face
+T, FACES, X, Y, WIDTH, HEIGHT = range(6)
+
+
+class FaceTimeline:
+    """Per-sample face count and largest-face box, one float32 row per sample"""
+
+    def __init__(self, capacity: int = 1024):
+        self._data = np.zeros((capacity, 6), np.float32)
+        self.size = 0
+        self.frame_size = None  # (width, height) of the sampled frames
+        self._lock = threading.Lock()
+
+    def append(self, t: float, analysis: Dict, frame_shape):
+        """Record the face analysis of a frame sampled t seconds into the interview"""
+        faces = analysis.get("face_positions", [])
+        row = [t, analysis["faces_detected"], np.nan, np.nan, np.nan, np.nan]
+        if faces:
+            largest = max(faces, key=lambda face: face["width"] * face["height"])
+            row[X:] = largest["x"], largest["y"], largest["width"], largest["height"]
+
+        with self._lock:
+            if self.size == len(self._data):
+                grown = np.zeros((len(self._data) * 2, 6), np.float32)
+                grown[:self.size] = self._data
+                self._data = grown
+            self._data[self.size] = row
+            self.size += 1
+            self.frame_size = (frame_shape[1], frame_shape[0])
+
+    def samples(self) -> np.ndarray:
+        """Copy of the recorded rows (columns T, FACES, X, Y, WIDTH, HEIGHT)"""
+        with self._lock:
+            return self._data[:self.size].copy()
+
+    @staticmethod
+    def _runs(t: np.ndarray, values: np.ndarray):
+        """(start, end, first index) of each run of equal values; a run ends at the next sample"""
+        change = np.flatnonzero(values[1:] != values[:-1]) + 1
+        starts = np.concatenate(([0], change))
+        ends = np.concatenate((change, [len(values) - 1]))
+        return [(float(t[s]), float(t[e]), s) for s, e in zip(starts, ends)]
+
+    def intervals(self, min_gap_s: Optional[float] = None) -> List[Dict]:
+        """Face present/absent intervals
+
+        Absences shorter than min_gap_s between two present intervals are
+        detection flicker and are merged into them.
+        """
+        min_gap_s = FACE_TIMELINE_CONFIG["min_gap_s"] if min_gap_s is None else min_gap_s
+        data = self.samples()
+        if not len(data):
+            return []
+
+        present = data[:, FACES] > 0
+        runs = self._runs(data[:, T], present)
+        intervals = []
+        for i, (start, end, first) in enumerate(runs):
+            is_present = bool(present[first])
+            if not is_present and end - start < min_gap_s and 0 < i < len(runs) - 1:
+                is_present = True
+            if intervals and intervals[-1]["present"] == is_present:
+                intervals[-1]["end"] = end
+            else:
+                intervals.append({"start": start, "end": end, "present": is_present})
+        return intervals
+
+    def multi_face_events(self) -> List[Dict]:
+        """Intervals in which more than one face was in the frame"""
+        data = self.samples()
+        if not len(data):
+            return []
+
+        events = []
+        multiple = data[:, FACES] > 1
+        for start, end, first in self._runs(data[:, T], multiple):
+            if multiple[first]:
+                run = (data[:, T] >= start) & (data[:, T] <= end) & multiple
+                events.append({"start": start, "end": end, "max_faces": int(data[run, FACES].max())})
+        return events
+
+    def summary(self) -> Dict:
+        """Interview-level presence figures; positions and sizes are fractions of the frame"""
+        data = self.samples()
+        intervals = self.intervals()
+        duration = float(data[-1, T] - data[0, T]) if len(data) else 0.0
+        absences = [i["end"] - i["start"] for i in intervals if not i["present"]]
+        if duration:
+            presence_ratio = sum(i["end"] - i["start"] for i in intervals if i["present"]) / duration
+        else:
+            presence_ratio = float(bool(intervals) and intervals[0]["present"])
+
+        result = {
+            "samples": len(data),
+            "duration_s": round(duration, 1),
+            "presence_ratio": round(presence_ratio, 3),
+            "absences": len(absences),
+            "longest_absence_s": round(max(absences), 1) if absences else 0.0,
+            "multi_face_events": len(self.multi_face_events()),
+            "avg_position": None,
+            "avg_size": None,
+        }
+
+        seen = data[data[:, FACES] > 0]
+        if len(seen) and self.frame_size:
+            width, height = self.frame_size
+            result["avg_position"] = {
+                "x": round(float(np.mean(seen[:, X] + seen[:, WIDTH] / 2)) / width, 3),
+                "y": round(float(np.mean(seen[:, Y] + seen[:, HEIGHT] / 2)) / height, 3),
+            }
+            result["avg_size"] = round(float(np.mean(seen[:, WIDTH])) / width, 3)
+        return result
+
+
+class FaceAnalysisWorker:
+    """Samples a VideoRecorder's frames on a background thread into a FaceTimeline
+
+    Frames come from the recorder's latest-frame slot via wait_for_frame, so
+    capture never waits for analysis; when analysis is slow the samples just
+    get further apart. The worker has its own FaceDetector, so its state is
+    independent of the one drawing the live overlay.
+    """
+
+    def __init__(self, recorder: VideoRecorder, detector: Optional[FaceDetector] = None,
+                 sample_fps: Optional[float] = None, timeline: Optional[FaceTimeline] = None):
+        self.recorder = recorder
+        self.detector = detector or FaceDetector(tracking=False)
+        self.interval = 1.0 / (sample_fps or FACE_TIMELINE_CONFIG["sample_fps"])
+        self.timeline = timeline or FaceTimeline()
+        self.started_at = None
+        self.analysis_time_total = 0.0
+        self.analysis_time_max = 0.0
+        self._stop = threading.Event()
+        self._thread = None
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self) -> bool:
+        """Start sampling; False if no face detector is available"""
+        if self.detector.face_cascade is None:
+            return False
+        if not self.running:
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="face-analysis")
+            self._thread.daemon = True
+            self._thread.start()
+        return True
+
+    def stop(self):
+        """Stop sampling; the timeline keeps what was recorded"""
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout=2)
+            self._thread = None
+
+    def _run(self):
+        seq = 0
+        next_sample = time.perf_counter()
+        while not self._stop.is_set():
+            delay = next_sample - time.perf_counter()
+            if delay > 0 and self._stop.wait(delay):
+                break
+
+            new_seq, buffer = self.recorder.wait_for_frame(seq, timeout=1.0)
+            if buffer is None or new_seq == seq:
+                if buffer is not None:
+                    buffer.release()
+                continue
+            seq = new_seq
+            next_sample = max(next_sample + self.interval, time.perf_counter())
+
+            try:
+                started = time.perf_counter()
+                captured_at = buffer.captured_at or started
+                if self.started_at is None:
+                    self.started_at = captured_at
+                analysis = self.detector.analyze(buffer.array, seq)
+                self.timeline.append(captured_at - self.started_at, analysis, buffer.array.shape)
+
+                elapsed = time.perf_counter() - started
+                self.analysis_time_total += elapsed
+                self.analysis_time_max = max(self.analysis_time_max, elapsed)
+            except Exception as e:
+                print(f"Face analysis failed: {e}")
+            finally:
+                buffer.release()
+
+    def stats(self) -> Dict:
+        samples = max(self.timeline.size, 1)
+        return {
+            "samples": self.timeline.size,
+            "avg_analysis_ms": round(self.analysis_time_total / samples * 1000, 2),
+            "max_analysis_ms": round(self.analysis_time_max * 1000, 2),
+        }
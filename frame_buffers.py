@@ -0,0 +1,116 @@
+import threading
+from collections import deque
+from typing import Optional, Tuple
+
+import numpy as np
+
+
+class FrameBuffer:
+    """A pooled image array with a reference count
+
+    Whoever acquires a buffer holds one reference. Every additional holder
+    (the latest-frame slot, the encoder queue, a display call) calls
+    retain() and later release(); the array goes back to the pool only
+    when the last holder releases it.
+    """
+
+    __slots__ = ('array', 'pool', 'refs', 'captured_at')
+
+    def __init__(self, array: np.ndarray, pool: Optional["FrameBufferPool"]):
+        self.array = array
+        self.pool = pool
+        self.refs = 0
+        self.captured_at = None
+
+    def retain(self) -> "FrameBuffer":
+        if self.pool is not None:
+            with self.pool.lock:
+                self.refs += 1
+        return self
+
+    def release(self):
+        if self.pool is not None:
+            self.pool._release(self)
+
+
+class FrameBufferPool:
+    """Recycles image arrays of one shape instead of allocating one per frame
+
+    The pool grows on demand up to max_buffers. Past that, acquire() hands
+    out unpooled one-off arrays, so a stalled consumer costs memory churn
+    rather than dropped frames. Released buffers are reused oldest first.
+    """
+
+    def __init__(self, shape: Tuple[int, ...], dtype=np.uint8, max_buffers: int = 16):
+        self.shape = tuple(shape)
+        self.dtype = dtype
+        self.max_buffers = max_buffers
+        self.lock = threading.Lock()
+        self._free = deque()
+        self.pooled = 0
+        self.allocations = 0
+        self.reuses = 0
+        self.overflows = 0
+
+    def acquire(self, shape: Optional[Tuple[int, ...]] = None) -> FrameBuffer:
+        """Return a buffer holding one reference, reusing a free array when possible"""
+        with self.lock:
+            if shape is not None and tuple(shape) != self.shape:
+                self._reshape(tuple(shape))
+            if self._free:
+                buffer = self._free.popleft()
+                self.reuses += 1
+            else:
+                self.allocations += 1
+                pooled = self.pooled < self.max_buffers
+                if pooled:
+                    self.pooled += 1
+                else:
+                    self.overflows += 1
+                buffer = FrameBuffer(np.empty(self.shape, self.dtype), self if pooled else None)
+            buffer.refs = 1
+            buffer.captured_at = None
+            return buffer
+
+    def adopt(self, array: np.ndarray) -> FrameBuffer:
+        """Take over an array allocated elsewhere (e.g. when the camera changed size)"""
+        with self.lock:
+            if array.shape != self.shape:
+                self._reshape(array.shape)
+            self.allocations += 1
+            pooled = self.pooled < self.max_buffers
+            if pooled:
+                self.pooled += 1
+            else:
+                self.overflows += 1
+            buffer = FrameBuffer(array, self if pooled else None)
+            buffer.refs = 1
+            return buffer
+
+    def _reshape(self, shape: Tuple[int, ...]):
+        """Switch to a new shape; buffers of the old shape are dropped as they come back"""
+        self.shape = shape
+        self.pooled -= len(self._free)
+        self._free.clear()
+
+    def _release(self, buffer: FrameBuffer):
+        with self.lock:
+            buffer.refs -= 1
+            if buffer.refs > 0:
+                return
+            if buffer.array.shape != self.shape:
+                self.pooled -= 1
+                buffer.pool = None
+                return
+            buffer.array.flags.writeable = True
+            self._free.append(buffer)
+
+    def stats(self) -> dict:
+        with self.lock:
+            return {
+                "buffers": self.pooled,
+                "free": len(self._free),
+                "allocations": self.allocations,
+                "reuses": self.reuses,
+                "overflows": self.overflows,
+            }
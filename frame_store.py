@@ -0,0 +1,177 @@
+import bisect
+import queue
+import threading
+from typing import Dict, List, Optional
+
+import cv2
+import numpy as np
+
+from config import REPLAY_CONFIG
+from frame_buffers import FrameBuffer
+
+
+class CompressedFrameStore:
+    """In-memory JPEG/PNG copy of the recent recording for instant replay
+
+    The capture loop hands frames over with add(), which only retains the
+    pooled buffer and queues it; a worker thread encodes them. When the
+    encoded frames exceed budget_bytes the oldest are evicted, so the store
+    always holds the most recent stretch of the interview. Frames are
+    decoded only when frame_at() asks for them. Frames queued before a
+    clear() are never added to the cleared store.
+    """
+
+    def __init__(self, budget_bytes: Optional[int] = None, fps: Optional[float] = None,
+                 image_format: Optional[str] = None, quality: Optional[int] = None):
+        self.budget_bytes = budget_bytes or int(REPLAY_CONFIG["budget_mb"] * 1024 * 1024)
+        self.min_interval = 1.0 / (fps or REPLAY_CONFIG["fps"])
+        self.image_format = image_format or REPLAY_CONFIG["format"]
+        quality = quality or REPLAY_CONFIG["quality"]
+        if self.image_format == ".png":
+            self.encode_params = [cv2.IMWRITE_PNG_COMPRESSION, 3]
+        else:
+            self.encode_params = [cv2.IMWRITE_JPEG_QUALITY, quality]
+
+        self._lock = threading.Lock()
+        self._times: List[float] = []
+        self._frames: List[bytes] = []
+        self._bytes = 0
+        self._raw_frame_bytes = 0
+        self._started_at = None
+        self._next_due = None
+        self._decoded = (None, None)  # (index into the store, decoded frame)
+        self._generation = 0  # bumped by clear(); frames queued before it are discarded
+
+        self.frames_encoded = 0
+        self.frames_evicted = 0
+        self.frames_dropped = 0
+
+        self._queue = queue.Queue(maxsize=REPLAY_CONFIG["queue_frames"])
+        self._thread = threading.Thread(target=self._encode_frames, name="replay-encoder")
+        self._thread.daemon = True
+        self._thread.start()
+
+    def add(self, buffer: FrameBuffer):
+        """Queue a captured frame for encoding; never blocks the caller"""
+        captured_at = buffer.captured_at
+        if self._next_due is not None and captured_at < self._next_due:
+            return
+        # Keep frames on a fixed schedule, without bursting to catch up after a gap
+        due = captured_at if self._next_due is None else self._next_due
+        self._next_due = max(due, captured_at - self.min_interval) + self.min_interval
+        try:
+            self._queue.put_nowait((self._generation, buffer.retain()))
+        except queue.Full:
+            buffer.release()
+            self.frames_dropped += 1
+
+    def _encode_frames(self):
+        while True:
+            item = self._queue.get()
+            if item is None:
+                break
+            generation, buffer = item
+            try:
+                ok, encoded = cv2.imencode(self.image_format, buffer.array, self.encode_params)
+                if not ok:
+                    raise RuntimeError("encoder returned no data")
+                self._append(generation, buffer.captured_at, encoded.tobytes(), buffer.array.nbytes)
+            except Exception as e:
+                self.frames_dropped += 1
+                print(f"Replay encoding error: {e}")
+            finally:
+                buffer.release()
+
+    def _append(self, generation: int, captured_at: float, data: bytes, raw_bytes: int):
+        with self._lock:
+            if generation != self._generation:
+                return
+            if self._started_at is None:
+                self._started_at = captured_at
+            self._times.append(captured_at - self._started_at)
+            self._frames.append(data)
+            self._bytes += len(data)
+            self._raw_frame_bytes = raw_bytes
+            self.frames_encoded += 1
+
+            evict = 0
+            while self._bytes > self.budget_bytes and evict < len(self._frames) - 1:
+                self._bytes -= len(self._frames[evict])
+                evict += 1
+            if evict:
+                del self._times[:evict]
+                del self._frames[:evict]
+                self.frames_evicted += evict
+                self._decoded = (None, None)
+
+    @property
+    def frame_count(self) -> int:
+        return len(self._frames)
+
+    def time_range(self):
+        """(first, last) stored timestamp in seconds since the recording started"""
+        with self._lock:
+            if not self._times:
+                return 0.0, 0.0
+            return self._times[0], self._times[-1]
+
+    def frame_at(self, t: float) -> Optional[np.ndarray]:
+        """The stored frame shown at t seconds (the last one captured at or before t)"""
+        with self._lock:
+            if not self._frames:
+                return None
+            index = max(bisect.bisect_right(self._times, t) - 1, 0)
+            cached_index, cached = self._decoded
+            if cached_index == index:
+                return cached
+            data = self._frames[index]
+
+        frame = cv2.imdecode(np.frombuffer(data, np.uint8), cv2.IMREAD_COLOR)
+        if frame is not None:
+            frame.flags.writeable = False
+        with self._lock:
+            self._decoded = (index, frame)
+        return frame
+
+    def clear(self):
+        """Drop everything stored, e.g. when a new recording starts"""
+        with self._lock:
+            self._times.clear()
+            self._frames.clear()
+            self._bytes = 0
+            self._started_at = None
+            self._next_due = None
+            self._decoded = (None, None)
+            self._generation += 1
+
+        # Hand the stale frames back to the pool now rather than after encoding them
+        while True:
+            try:
+                item = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if item is None:
+                self._queue.put(None)
+                break
+            item[1].release()
+
+    def close(self):
+        """Stop the encoder thread once the queued frames are encoded"""
+        self._queue.put(None)
+        self._thread.join(timeout=2)
+
+    def stats(self) -> Dict:
+        with self._lock:
+            frames = len(self._frames)
+            first, last = (self._times[0], self._times[-1]) if frames else (0.0, 0.0)
+            raw = frames * self._raw_frame_bytes
+            return {
+                "frames": frames,
+                "seconds": round(last - first, 1),
+                "bytes": self._bytes,
+                "raw_bytes": raw,
+                "compression_ratio": round(raw / self._bytes, 1) if self._bytes else None,
+                "encoded": self.frames_encoded,
+                "evicted": self.frames_evicted,
+                "dropped": self.frames_dropped,
+            }
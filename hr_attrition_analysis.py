@@ -10,6 +10,7 @@ Author: AI Assistant
 Date: 2025
 """
 
+import os
 import pandas as pd
 import numpy as np
 import matplotlib.pyplot as plt
@@ -18,19 +19,65 @@ from datetime import datetime, timedelta
 import warnings
 warnings.filterwarnings('ignore')
 
+from attrition_drivers import DRIVER_CACHE_DIR, load_attrition_drivers
+from data_quality import DataQualityValidator
+from powerbi_partitions import PARTITION_ROOT, write_partitions
+from dataset_io import DATASET_ARCHIVE, iter_csv_chunks, verify_archive, verify_csv_files
+
+# Bump when process_data_for_powerbi changes what it derives from the raw files,
+# so driver tables cached under the files' digests are recomputed
+PROCESSING_VERSION = 1
+
 class HRAttritionAnalyzer:
-    def __init__(self):
+    def __init__(self, output_dir='.', manifest_path=None, driver_cache_dir=DRIVER_CACHE_DIR):
+        self.output_dir = output_dir
+        self.manifest_path = manifest_path
+        self.driver_cache_dir = driver_cache_dir
         self.train_data = None
         self.test_data = None
         self.combined_data = None
         self.processed_data = None
-        
-    def load_datasets(self, train_path='train.csv', test_path='test.csv'):
-        """Load the train and test datasets"""
+        self.dataset_manifest = {}
+        self.validated = None
+        self.summary_stats = None
+        self.drivers = None
+        self.driver_values = None
+        self.quality_summary = None
+    
+    def output_path(self, filename):
+        """Return the path of an output file inside this analyzer's output directory"""
+        return os.path.join(self.output_dir, filename)
+        
+    def load_datasets(self, train_path='train.csv', test_path='test.csv', archive_path=None, validate=True):
+        """Load the train and test datasets
+        
+        When archive_path is given, train_path and test_path name members of
+        that zip/tar archive and are streamed out of it in chunks without
+        being extracted to disk. With validate=True each chunk is checked
+        against the data quality schema and failing rows are quarantined.
+        """
+        # Only set once the files are actually loaded, so sample data never claims their digests
+        self.dataset_manifest = {}
+        self.validated = None
         try:
             print("Loading datasets...")
-            self.train_data = pd.read_csv(train_path)
-            self.test_data = pd.read_csv(test_path)
+            
+            # Verify against the manifest; unchanged files are not re-scanned
+            if archive_path is not None:
+                entry, cached = verify_archive(archive_path, manifest_path=self.manifest_path)
+                manifest = {archive_path: entry}
+                print(f"Reading directly from archive: {archive_path}")
+            else:
+                verified = verify_csv_files([train_path, test_path], manifest_path=self.manifest_path)
+                manifest = {path: entry for path, (entry, _) in verified.items()}
+                cached = all(cached for _, cached in verified.values())
+            if cached:
+                print("Dataset files unchanged since last verification")
+            
+            if validate:
+                self._load_validated(train_path, test_path, archive_path)
+            else:
+                self.train_data, self.test_data = self._read_datasets(train_path, test_path, archive_path)
             
             # Add source column to identify origin
             self.train_data['DataSource'] = 'Train'
@@ -39,12 +86,40 @@ class HRAttritionAnalyzer:
             print(f"Train data shape: {self.train_data.shape}")
             print(f"Test data shape: {self.test_data.shape}")
             
+            self.dataset_manifest = manifest
+            self.validated = validate
             return True
-        except FileNotFoundError as e:
+        except (FileNotFoundError, KeyError, ValueError) as e:
             print(f"Error loading files: {e}")
             print("Please ensure train.csv and test.csv are in the current directory")
             return False
     
+    def _read_datasets(self, train_path, test_path, archive_path, validator=None):
+        """Read both datasets chunk by chunk, passing each chunk through the validator if given"""
+        dtypes = validator.parse_dtypes() if validator is not None else None
+        loaded = []
+        for path, source in [(train_path, 'Train'), (test_path, 'Test')]:
+            chunks = iter_csv_chunks(path, archive_path=archive_path, dtype=dtypes)
+            if validator is not None:
+                chunks = (validator.validate_chunk(chunk, source=source) for chunk in chunks)
+            chunks = list(chunks)
+            loaded.append(pd.concat(chunks, ignore_index=True) if chunks else pd.DataFrame())
+        return loaded
+    
+    def _load_validated(self, train_path, test_path, archive_path):
+        """Read both datasets chunk by chunk through the data quality validator"""
+        quarantine_path = self.output_path('HR_Quarantined_Rows.csv')
+        if os.path.exists(quarantine_path):
+            os.remove(quarantine_path)
+        validator = DataQualityValidator(quarantine_path=quarantine_path)
+        
+        self.train_data, self.test_data = self._read_datasets(train_path, test_path, archive_path, validator)
+        
+        validator.report()
+        self.quality_summary = validator.summary()
+        os.makedirs(self.output_dir, exist_ok=True)
+        self.quality_summary.to_csv(self.output_path('HR_Data_Quality_Summary.csv'), index=False)
+    
     def combine_datasets(self):
         """Combine train and test datasets"""
         if self.train_data is None or self.test_data is None:
@@ -52,16 +127,15 @@ class HRAttritionAnalyzer:
             return False
             
         # Align columns between datasets
-        train_cols = set(self.train_data.columns)
         test_cols = set(self.test_data.columns)
         
-        # Find common columns
-        common_cols = train_cols.intersection(test_cols)
+        # Find common columns, in train file order so every run lays them out the same
+        common_cols = [col for col in self.train_data.columns if col in test_cols]
         
         # Create combined dataset with common columns
         self.combined_data = pd.concat([
-            self.train_data[list(common_cols)],
-            self.test_data[list(common_cols)]
+            self.train_data[common_cols],
+            self.test_data[common_cols]
         ], ignore_index=True)
         
         print(f"Combined data shape: {self.combined_data.shape}")
@@ -322,8 +396,13 @@ class HRAttritionAnalyzer:
         
         return True
     
-    def create_powerbi_datasets(self):
-        """Create specific datasets for Power BI pages"""
+    def create_powerbi_datasets(self, partition_format='csv'):
+        """Create specific datasets for Power BI pages
+        
+        Besides the monolithic files, the main dashboard data is written as
+        HireYear/Department partitions in which only changed partitions are
+        rewritten (partition_format is 'csv' or 'parquet').
+        """
         if self.processed_data is None:
             print("Please process data first")
             return False
@@ -353,24 +432,34 @@ class HRAttritionAnalyzer:
                      round(avg_tenure, 1), round(avg_satisfaction, 1)]
         })
         
+        self.summary_stats = summary_stats
+        
         # Save datasets
         try:
-            dashboard_data.to_excel('HR_Dashboard_Main_Data.xlsx', index=False)
-            attrition_data.to_excel('HR_Attrition_Analysis.xlsx', index=False)
-            retention_data.to_excel('HR_Retention_Analysis.xlsx', index=False)
-            summary_stats.to_excel('HR_Summary_KPIs.xlsx', index=False)
+            os.makedirs(self.output_dir, exist_ok=True)
+            
+            dashboard_data.to_excel(self.output_path('HR_Dashboard_Main_Data.xlsx'), index=False)
+            attrition_data.to_excel(self.output_path('HR_Attrition_Analysis.xlsx'), index=False)
+            retention_data.to_excel(self.output_path('HR_Retention_Analysis.xlsx'), index=False)
+            summary_stats.to_excel(self.output_path('HR_Summary_KPIs.xlsx'), index=False)
             
             # Also save as CSV for compatibility
-            dashboard_data.to_csv('HR_Dashboard_Main_Data.csv', index=False)
-            attrition_data.to_csv('HR_Attrition_Analysis.csv', index=False)
-            retention_data.to_csv('HR_Retention_Analysis.csv', index=False)
-            summary_stats.to_csv('HR_Summary_KPIs.csv', index=False)
+            dashboard_data.to_csv(self.output_path('HR_Dashboard_Main_Data.csv'), index=False)
+            attrition_data.to_csv(self.output_path('HR_Attrition_Analysis.csv'), index=False)
+            retention_data.to_csv(self.output_path('HR_Retention_Analysis.csv'), index=False)
+            summary_stats.to_csv(self.output_path('HR_Summary_KPIs.csv'), index=False)
+            
+            # Partitioned copy for incremental refresh
+            partitions = write_partitions(dashboard_data, root=self.output_path(PARTITION_ROOT),
+                                          fmt=partition_format)
             
             print("✅ Power BI datasets created successfully!")
             print(f"   - Main Dashboard Data: {len(dashboard_data)} records")
             print(f"   - Attrition Analysis: {len(attrition_data)} records")
             print(f"   - Retention Analysis: {len(retention_data)} records")
             print(f"   - Summary KPIs: {len(summary_stats)} metrics")
+            print(f"   - Dashboard partitions: {len(partitions['written'])} written, "
+                  f"{len(partitions['unchanged'])} unchanged, {len(partitions['removed'])} removed")
             
         except Exception as e:
             print(f"Error saving files: {e}")
@@ -378,6 +467,34 @@ class HRAttritionAnalyzer:
             
         return True
     
+    def analyze_attrition_drivers(self):
+        """Rank every column as an attrition driver and save the driver tables"""
+        if self.processed_data is None:
+            print("Please process data first")
+            return False
+        
+        print("Analyzing attrition drivers...")
+        
+        # Raw file digests identify the dataset; sample data is hashed instead
+        source_digests = [entry['sha256'] for entry in self.dataset_manifest.values()]
+        self.drivers, self.driver_values, cached = load_attrition_drivers(
+            self.processed_data, source_digests=source_digests, validated=self.validated,
+            processing_version=PROCESSING_VERSION, cache_dir=self.driver_cache_dir
+        )
+        if cached:
+            print("Driver analysis loaded from cache")
+        
+        try:
+            os.makedirs(self.output_dir, exist_ok=True)
+            self.drivers.to_csv(self.output_path('HR_Attrition_Drivers.csv'), index=False)
+            self.driver_values.to_csv(self.output_path('HR_Attrition_Driver_Values.csv'), index=False)
+            print(f"✅ Driver analysis saved: {len(self.drivers)} features, {len(self.driver_values)} values")
+        except Exception as e:
+            print(f"Error saving driver analysis: {e}")
+            return False
+        
+        return True
+    
     def generate_insights_report(self):
         """Generate key insights for dashboard creation"""
         if self.processed_data is None:
@@ -437,6 +554,13 @@ class HRAttritionAnalyzer:
         for factor, rate in sorted(risk_factors.items(), key=lambda x: x[1], reverse=True):
             print(f"{factor}: {rate:.1f}% attrition rate")
         
+        # Full driver ranking, if computed
+        if self.drivers is not None and not self.drivers.empty:
+            print(f"\n🔍 TOP ATTRITION DRIVERS (by mutual information):")
+            top_drivers = self.drivers.head(10)[['Rank', 'Feature', 'PointBiserialR', 'MutualInformation',
+                                                 'TopValue', 'TopValueLift']]
+            print(top_drivers.to_string(index=False))
+        
         # Retention factors
         print(f"\n✅ RETENTION FACTORS:")
         retained = df[df['Attrition'] == 'No']
@@ -453,7 +577,8 @@ class HRAttritionAnalyzer:
         print("6. Include trend analysis by hire date and department")
         
         # Save insights to file
-        with open('HR_Attrition_Insights.txt', 'w') as f:
+        os.makedirs(self.output_dir, exist_ok=True)
+        with open(self.output_path('HR_Attrition_Insights.txt'), 'w') as f:
             f.write("HR ATTRITION INSIGHTS REPORT\n")
             f.write("="*60 + "\n")
             f.write(f"Generated on: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n\n")
@@ -462,15 +587,22 @@ class HRAttritionAnalyzer:
             f.write(f"- Overall Attrition Rate: {(df['Attrition'] == 'Yes').mean() * 100:.1f}%\n")
             f.write(f"- Highest Risk Department: {dept_attrition.index[0]} ({dept_attrition.iloc[0]['Attrition_Rate_%']:.1f}%)\n")
             f.write(f"- Most Critical Age Group: {age_attrition.index[0]} ({age_attrition.iloc[0]['Attrition_Rate_%']:.1f}%)\n")
+            if self.drivers is not None and not self.drivers.empty:
+                top = self.drivers.iloc[0]
+                f.write(f"- Strongest Attrition Driver: {top['Feature']} (highest lift: {top['TopValue']}, {top['TopValueLift']:.2f}x)\n")
         
         return True
     
-    def run_full_analysis(self):
+    def run_full_analysis(self, archive_path=None):
         """Run the complete analysis pipeline"""
         print("🚀 Starting HR Attrition Analysis...")
         
+        # Read straight from the downloaded archive when the CSVs were not extracted
+        if archive_path is None and not os.path.exists('train.csv') and os.path.exists(DATASET_ARCHIVE):
+            archive_path = DATASET_ARCHIVE
+        
         # Try to load actual datasets first
-        if not self.load_datasets():
+        if not self.load_datasets(archive_path=archive_path):
             print("📝 Creating sample data for demonstration...")
             self.create_sample_data()
         else:
@@ -482,6 +614,9 @@ class HRAttritionAnalyzer:
         # Create Power BI datasets
         self.create_powerbi_datasets()
         
+        # Rank attrition drivers
+        self.analyze_attrition_drivers()
+        
         # Generate insights
         self.generate_insights_report()
         
@@ -491,6 +626,10 @@ class HRAttritionAnalyzer:
         print("   - HR_Attrition_Analysis.xlsx") 
         print("   - HR_Retention_Analysis.xlsx")
         print("   - HR_Summary_KPIs.xlsx")
+        print(f"   - {PARTITION_ROOT}/ (HireYear/Department partitions + _partitions.json)")
+        print("   - HR_Attrition_Drivers.csv")
+        print("   - HR_Attrition_Driver_Values.csv")
+        print("   - HR_Data_Quality_Summary.csv (and HR_Quarantined_Rows.csv if any rows failed)")
         print("   - HR_Attrition_Insights.txt")
 
 if __name__ == "__main__":
@@ -12,11 +12,12 @@ Date: 2025
 """
 
 import os
-import pandas as pd
 import requests
 from urllib.parse import urlparse
 import zipfile
 
+from dataset_io import DATASET_ARCHIVE, verify_archive, verify_csv_files
+
 def setup_instructions():
     """Print setup instructions for Kaggle API"""
     print("🔧 KAGGLE API SETUP INSTRUCTIONS")
@@ -67,10 +68,9 @@ pip install kaggle
 
 # Download dataset
 kaggle datasets download -d stealthtechnologies/employee-attrition-dataset
-
-# Extract files
-unzip employee-attrition-dataset.zip
 ```
+The analysis script reads train.csv and test.csv directly from
+employee-attrition-dataset.zip, so extracting it is optional.
 
 ### Method 3: Alternative Public Datasets
 If the main dataset is not available, you can use these alternatives:
@@ -112,8 +112,13 @@ Once you have the files:
     
     print("📖 Manual download guide created: Manual_Download_Guide.md")
 
-def download_with_kaggle_api():
-    """Attempt to download using Kaggle API"""
+def download_with_kaggle_api(path='.'):
+    """Attempt to download using Kaggle API
+    
+    The archive is kept as downloaded rather than unzipped; the analysis
+    streams train.csv/test.csv straight out of it. Returns the archive path,
+    or None if the download failed.
+    """
     try:
         import kaggle
         print("🔄 Attempting to download with Kaggle API...")
@@ -121,24 +126,62 @@ def download_with_kaggle_api():
         # Download the dataset
         kaggle.api.dataset_download_files(
             'stealthtechnologies/employee-attrition-dataset',
-            path='.',
-            unzip=True
+            path=path,
+            unzip=False
         )
         
+        archive_path = os.path.join(path, DATASET_ARCHIVE)
+        if not verify_dataset_archive(archive_path):
+            return None
+        
         print("✅ Dataset downloaded successfully!")
-        return True
+        return archive_path
         
     except ImportError:
         print("❌ Kaggle package not installed. Run: pip install kaggle")
-        return False
+        return None
     except Exception as e:
         print(f"❌ Download failed: {str(e)}")
         print("💡 Try manual download method")
+        return None
+
+def verify_dataset_archive(archive_path=DATASET_ARCHIVE, required_files=None):
+    """Verify that a dataset archive contains the required files, without extracting it"""
+    if required_files is None:
+        required_files = ['train.csv', 'test.csv']
+    
+    if not os.path.exists(archive_path):
+        print(f"❌ Archive not found: {archive_path}")
+        return False
+    
+    try:
+        entry, cached = verify_archive(archive_path)
+    except Exception as e:
+        print(f"❌ Error reading archive: {str(e)}")
         return False
+    
+    member_names = {os.path.basename(name): size for name, size in entry['members'].items()}
+    missing_files = [file for file in required_files if file not in member_names]
+    if missing_files:
+        print(f"❌ Archive {archive_path} is missing: {missing_files}")
+        return False
+    
+    status = " (unchanged, from manifest)" if cached else ""
+    print(f"✅ Archive {archive_path} contains all required files{status}")
+    for file in required_files:
+        print(f"📦 {file}: {member_names[file] / (1024 * 1024):.1f} MB uncompressed")
+    
+    return True
+
+def verify_dataset_files(required_files=None, force=False):
+    """Verify that the required files exist and summarize their contents.
 
-def verify_dataset_files():
-    """Verify that the required files exist"""
-    required_files = ['train.csv', 'test.csv']
+    Only the header and the Attrition column are parsed; row counts come from
+    a memory-mapped newline scan. Results are recorded in dataset_manifest.json
+    so unchanged files are not re-read on later runs unless force=True.
+    """
+    if required_files is None:
+        required_files = ['train.csv', 'test.csv']
     missing_files = []
     
     for file in required_files:
@@ -154,16 +197,18 @@ def verify_dataset_files():
         
         # Check file contents
         try:
-            train_df = pd.read_csv('train.csv')
-            test_df = pd.read_csv('test.csv')
+            results = verify_csv_files(required_files, force=force)
             
-            print(f"📊 Train dataset: {train_df.shape[0]} rows, {train_df.shape[1]} columns")
-            print(f"📊 Test dataset: {test_df.shape[0]} rows, {test_df.shape[1]} columns")
+            for file in required_files:
+                entry, cached = results[file]
+                name = os.path.splitext(os.path.basename(file))[0].title()
+                status = " (unchanged, from manifest)" if cached else ""
+                print(f"📊 {name} dataset: {entry['rows']} rows, {len(entry['columns'])} columns{status}")
             
             # Check for Attrition column
-            if 'Attrition' in train_df.columns:
-                attrition_rate = (train_df['Attrition'] == 'Yes').mean() * 100
-                print(f"📈 Training set attrition rate: {attrition_rate:.1f}%")
+            train_entry = results[required_files[0]][0]
+            if train_entry['attrition_rate'] is not None:
+                print(f"📈 Training set attrition rate: {train_entry['attrition_rate']:.1f}%")
             
             return True
             
@@ -231,10 +276,18 @@ def main():
         print("▶️  You can now run: python hr_attrition_analysis.py")
         return
     
+    # A previously downloaded archive is read directly, no extraction needed
+    if os.path.exists(DATASET_ARCHIVE) and verify_dataset_archive(DATASET_ARCHIVE):
+        print("📁 Dataset archive already available!")
+        print("▶️  You can now run: python hr_attrition_analysis.py")
+        return
+    
     print("\n🔍 Dataset files not found. Checking download options...")
     
     # Try Kaggle API download
-    if not download_with_kaggle_api():
+    if download_with_kaggle_api():
+        print("▶️  You can now run: python hr_attrition_analysis.py")
+    else:
         print("\n📖 Creating download guides...")
         setup_instructions()
         create_manual_download_guide()
@@ -0,0 +1,110 @@
+"""
+Real-time browser media for the interview page.
+
+With streamlit-webrtc the candidate's camera and microphone stream to the
+server over WebRTC. Each frame goes through a callback on the media thread
+at its native rate, independent of Streamlit reruns, and the processed
+video goes back to the browser as a WebRTC track instead of an image per
+rerun:
+
+    video  -> recording tap (VideoRecorder.push_frame: disk, replay, timeline)
+           -> face overlay (FaceDetector in tracking mode) -> browser
+    audio  -> audio tap (PushAudioSource) -> StreamingTranscriber
+
+Without streamlit-webrtc and av installed the app falls back to polling
+the server camera on each rerun.
+"""
+
+import time
+from typing import Dict, Optional
+
+import numpy as np
+
+from config import VIDEO_CONFIG, WEBRTC_CONFIG
+from speech_stream import PushAudioSource
+from video_recorder import FaceDetector, VideoRecorder
+
+try:
+    import av
+    from streamlit_webrtc import WebRtcMode, webrtc_streamer
+except ImportError:
+    av = None
+    webrtc_streamer = None
+
+WEBRTC_AVAILABLE = webrtc_streamer is not None and WEBRTC_CONFIG["enabled"]
+
+
+def audio_frame_to_mono(frame) -> np.ndarray:
+    """Samples of an av.AudioFrame as a mono int16-scaled float array"""
+    samples = frame.to_ndarray()
+    channels = len(frame.layout.channels)
+    if frame.format.is_planar:
+        samples = samples.T
+    else:
+        samples = samples.reshape(-1, channels)
+    if samples.dtype.kind == 'f':
+        samples = samples * 32767
+    return samples.mean(axis=1) if channels > 1 else samples[:, 0].astype(np.float32)
+
+
+class MediaPipeline:
+    """Per-session processor behind the WebRTC callbacks
+
+    The callbacks run on streamlit-webrtc's worker thread, so they only touch
+    objects owned by this pipeline, never st.session_state.
+    """
+
+    def __init__(self, recorder: VideoRecorder, detector: Optional[FaceDetector] = None,
+                 audio_source: Optional[PushAudioSource] = None):
+        self.recorder = recorder
+        self.detector = detector or FaceDetector()
+        self.audio_source = audio_source or PushAudioSource()
+        self.video_frames = 0
+        self.audio_frames = 0
+        self.video_time_total = 0.0
+        self.video_time_max = 0.0
+
+    def video_frame_callback(self, frame):
+        started = time.perf_counter()
+        image = frame.to_ndarray(format="bgr24")
+
+        # Record the clean frame, then draw the overlay only for the live view
+        self.recorder.push_frame(image)
+        image = self.detector.draw_face_rectangles(image)
+
+        elapsed = time.perf_counter() - started
+        self.video_frames += 1
+        self.video_time_total += elapsed
+        self.video_time_max = max(self.video_time_max, elapsed)
+        return av.VideoFrame.from_ndarray(image, format="bgr24")
+
+    def audio_frame_callback(self, frame):
+        self.audio_source.push(audio_frame_to_mono(frame), frame.sample_rate)
+        self.audio_frames += 1
+        return frame
+
+    def stats(self) -> Dict:
+        return {
+            "video_frames": self.video_frames,
+            "audio_frames": self.audio_frames,
+            "avg_video_callback_ms": round(self.video_time_total / max(self.video_frames, 1) * 1000, 2),
+            "max_video_callback_ms": round(self.video_time_max * 1000, 2),
+        }
+
+    def streamer(self, key: str = "interview-media"):
+        """Render the WebRTC component wired to this pipeline"""
+        return webrtc_streamer(
+            key=key,
+            mode=WebRtcMode.SENDRECV,
+            rtc_configuration={"iceServers": WEBRTC_CONFIG["ice_servers"]},
+            media_stream_constraints={
+                "video": {"width": VIDEO_CONFIG["width"], "height": VIDEO_CONFIG["height"],
+                          "frameRate": VIDEO_CONFIG["fps"]},
+                "audio": True,
+            },
+            video_frame_callback=self.video_frame_callback,
+            audio_frame_callback=self.audio_frame_callback,
+            # The candidate's own audio comes back on the receiving track; don't play it
+            audio_html_attrs={"autoPlay": True, "muted": True},
+            async_processing=True,
+        )
@@ -0,0 +1,146 @@
+import asyncio
+import queue
+import threading
+from concurrent.futures import Future
+from typing import Any, AsyncIterator, Callable, Coroutine, Iterator, Optional
+
+import httpx
+import openai
+
+from config import OPENAI_API_KEY, OPENAI_CLIENT_CONFIG
+
+
+class SharedOpenAIClient:
+    """Process-wide async OpenAI client.
+
+    A single AsyncOpenAI client with a pooled keep-alive HTTP transport lives
+    on a dedicated event loop thread, so every Streamlit session reuses the
+    same connections and TLS sessions. A semaphore caps the number of
+    in-flight requests. Coroutines can be awaited from any event loop, and
+    synchronous callers block on run_sync().
+    """
+
+    def __init__(self, config: Optional[dict] = None):
+        self.config = dict(OPENAI_CLIENT_CONFIG, **(config or {}))
+        self._loop = asyncio.new_event_loop()
+        self._ready = threading.Event()
+        self._thread = threading.Thread(target=self._run_loop, name="openai-client-loop")
+        self._thread.daemon = True
+        self._thread.start()
+        self._ready.wait()
+
+        self.client, self._semaphore = self.run_sync(self._create_client())
+
+    def _run_loop(self):
+        asyncio.set_event_loop(self._loop)
+        self._loop.call_soon(self._ready.set)
+        self._loop.run_forever()
+
+    async def _create_client(self):
+        """Create the HTTP pool and client on the client loop they are bound to"""
+        http_client = httpx.AsyncClient(
+            limits=httpx.Limits(
+                max_connections=self.config["max_connections"],
+                max_keepalive_connections=self.config["max_keepalive_connections"],
+                keepalive_expiry=self.config["keepalive_expiry"]
+            ),
+            timeout=self.config["timeout"]
+        )
+        client = openai.AsyncOpenAI(
+            api_key=OPENAI_API_KEY,
+            http_client=http_client,
+            max_retries=self.config["max_retries"]
+        )
+        return client, asyncio.Semaphore(self.config["max_concurrent_requests"])
+
+    async def _on_loop(self, coro: Coroutine) -> Any:
+        """Await a coroutine on the client loop, from whichever loop we are on"""
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+
+        if running is self._loop:
+            return await coro
+        return await asyncio.wrap_future(asyncio.run_coroutine_threadsafe(coro, self._loop))
+
+    def submit(self, coro: Coroutine) -> Future:
+        """Schedule a coroutine on the client loop without waiting for it"""
+        return asyncio.run_coroutine_threadsafe(coro, self._loop)
+
+    def run_sync(self, coro: Coroutine, timeout: Optional[float] = None) -> Any:
+        """Run a coroutine on the client loop and block until it finishes"""
+        return self.submit(coro).result(timeout)
+
+    async def _chat_completion(self, **kwargs):
+        async with self._semaphore:
+            return await self.client.chat.completions.create(**kwargs)
+
+    async def chat_completion(self, **kwargs):
+        """Awaitable chat completion through the shared pool and concurrency limit"""
+        return await self._on_loop(self._chat_completion(**kwargs))
+
+    def chat_completion_sync(self, **kwargs):
+        """Blocking chat completion through the shared pool and concurrency limit"""
+        return self.run_sync(self._chat_completion(**kwargs))
+
+    async def _pump_stream(self, push: Callable[[Any], None], kwargs: dict):
+        """Stream a completion on the client loop, pushing each content delta.
+
+        Always pushes _STREAM_END last, preceded by the exception if one occurred.
+        """
+        try:
+            async with self._semaphore:
+                stream = await self.client.chat.completions.create(stream=True, **kwargs)
+                async for chunk in stream:
+                    if chunk.choices and chunk.choices[0].delta.content:
+                        push(chunk.choices[0].delta.content)
+        except Exception as e:
+            push(e)
+        finally:
+            push(_STREAM_END)
+
+    async def chat_completion_stream(self, **kwargs) -> AsyncIterator[str]:
+        """Async iterator over the content deltas of a streamed chat completion"""
+        consumer_loop = asyncio.get_running_loop()
+        deltas = asyncio.Queue()
+        push = lambda item: consumer_loop.call_soon_threadsafe(deltas.put_nowait, item)
+        asyncio.run_coroutine_threadsafe(self._pump_stream(push, kwargs), self._loop)
+
+        while True:
+            item = await deltas.get()
+            if item is _STREAM_END:
+                return
+            if isinstance(item, Exception):
+                raise item
+            yield item
+
+    def chat_completion_stream_sync(self, **kwargs) -> Iterator[str]:
+        """Blocking iterator over the content deltas of a streamed chat completion"""
+        deltas = queue.Queue()
+        asyncio.run_coroutine_threadsafe(self._pump_stream(deltas.put, kwargs), self._loop)
+
+        while True:
+            item = deltas.get()
+            if item is _STREAM_END:
+                return
+            if isinstance(item, Exception):
+                raise item
+            yield item
+
+
+_STREAM_END = object()
+
+
+_shared_client = None
+_shared_client_lock = threading.Lock()
+
+
+def get_openai_client() -> SharedOpenAIClient:
+    """Return the process-wide shared OpenAI client, creating it on first use"""
+    global _shared_client
+    if _shared_client is None:
+        with _shared_client_lock:
+            if _shared_client is None:
+                _shared_client = SharedOpenAIClient()
+    return _shared_client
@@ -0,0 +1,407 @@
+#!/usr/bin/env python3
+"""
+Offline post-processing of finished interview recordings.
+
+VideoRecorder.stop_recording() writes <base>.json next to the segment
+files; every such manifest without a finished <base>.analysis/results.json
+is a pending job. Each recording is split into time chunks that a process
+pool decodes in parallel, producing for every chunk:
+
+- face analytics samples (FaceDetector in tracking mode)
+- thumbnails every few seconds
+- a downscaled, lower frame rate part of the archive copy
+
+Each chunk's results are written to part_NNNN.json as soon as it finishes,
+so an interrupted run picks up where it stopped. When all chunks are done
+the parts are merged into results.json (face timeline summary, thumbnails,
+throughput) and archive.mp4. Samples and thumbnails are timed by the
+recorder's capture timestamps, so they line up with the interview even where
+the recording repeated frames or cut a stall. Nothing here runs inside the
+Streamlit app.
+
+A manifest that cannot be read, or that does not describe a recording, is
+renamed to <base>.json.invalid. A recording that fails is retried after
+retry_seconds, doubling with every failure, and left alone after
+max_attempts until the processor is restarted.
+
+    python postprocess.py                 # process everything pending once
+    python postprocess.py --watch         # keep picking up new recordings
+"""
+
+import argparse
+import glob
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Dict, List, Optional, Tuple
+
+import cv2
+import numpy as np
+
+from config import POSTPROCESS_CONFIG, RECORDING_CONFIG
+
+
+def _read_json(path: str) -> Dict:
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def _write_json(path: str, data: Dict):
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(data, f)
+    os.replace(tmp_path, path)
+
+
+def output_dir_for(manifest_path: str) -> str:
+    return f"{os.path.splitext(manifest_path)[0]}.analysis"
+
+
+def read_manifest(manifest_path: str) -> Dict:
+    """Load a recording manifest; ValueError if it is unreadable or not a recording"""
+    try:
+        manifest = _read_json(manifest_path)
+    except ValueError as e:
+        raise ValueError(f"unreadable manifest: {e}") from e
+    if not isinstance(manifest, dict) or not manifest.get("fps") or not manifest.get("segments"):
+        raise ValueError("not a recording manifest (fps and segments are required)")
+    return manifest
+
+
+def frame_capture_times(manifest_path: str, manifest: Dict) -> Optional[np.ndarray]:
+    """Capture time of the source frame shown at every frame of the recording.
+
+    The recorder saves the capture offset of each source frame it wrote, not
+    of the repeats filling empty slots. Replaying its slot placement over
+    those offsets, with the slots cut as gaps, puts every written frame back
+    at its position in the file; a repeat carries the time of the frame it
+    repeats. None if the manifest has no readable timestamps.
+    """
+    if not manifest.get("timestamps"):
+        return None
+    try:
+        offsets = np.load(os.path.join(os.path.dirname(manifest_path), manifest["timestamps"]))
+    except (OSError, ValueError):
+        return None
+    if not len(offsets):
+        return None
+
+    interval = 1.0 / manifest["fps"]
+    gaps = [(round(gap["t"] / interval), round(gap["seconds"] / interval)) for gap in manifest.get("gaps", [])]
+    slots = np.empty(len(offsets), np.int64)
+    cut_slots = 0
+    for i, offset in enumerate(offsets):
+        slot = int(round(float(offset) / interval)) - cut_slots
+        # The frame that ended a cut stall lands right after the cut
+        if gaps and slot >= gaps[0][0] + gaps[0][1]:
+            cut_slots += gaps[0][1]
+            slot -= gaps[0][1]
+            gaps.pop(0)
+        slots[i] = slot
+    return offsets[np.searchsorted(slots, np.arange(slots[-1] + 1), side="right") - 1]
+
+
+def plan_chunks(manifest_path: str) -> Tuple[Dict, List[Dict]]:
+    """Split a recording into chunks of about chunk_seconds, in playback order"""
+    manifest = read_manifest(manifest_path)
+    base_dir = os.path.dirname(manifest_path)
+    output_dir = output_dir_for(manifest_path)
+    fps = manifest["fps"]
+    chunk_frames = max(1, int(POSTPROCESS_CONFIG["chunk_seconds"] * fps))
+
+    tasks = []
+    offset = 0
+    for segment in manifest["segments"]:
+        path = os.path.join(base_dir, segment)
+        reader = cv2.VideoCapture(path)
+        count = int(reader.get(cv2.CAP_PROP_FRAME_COUNT)) if reader.isOpened() else 0
+        reader.release()
+        for start in range(0, count, chunk_frames):
+            index = len(tasks)
+            tasks.append({
+                "id": index,
+                "segment": path,
+                "start": start,
+                "end": min(start + chunk_frames, count),
+                "offset": offset,
+                "fps": fps,
+                "times": None,
+                "output_dir": output_dir,
+                "part_path": os.path.join(output_dir, f"part_{index:04d}.json"),
+            })
+        offset += count
+
+    # Without timestamps matching the file, a frame's time is its position / fps
+    times = frame_capture_times(manifest_path, manifest)
+    if times is not None and len(times) == offset:
+        for task in tasks:
+            first = task["offset"] + task["start"]
+            task["times"] = times[first:task["offset"] + task["end"]].tolist()
+    return manifest, tasks
+
+
+def process_chunk(task: Dict) -> Dict:
+    """Decode one chunk and write its part results; runs in a worker process"""
+    from video_recorder import FaceDetector
+
+    started = time.perf_counter()
+    fps = task["fps"]
+    analysis_every = max(1, round(fps / POSTPROCESS_CONFIG["analysis_fps"]))
+    archive_every = max(1, round(fps / POSTPROCESS_CONFIG["archive_fps"]))
+    thumbnail_every = max(1, round(fps * POSTPROCESS_CONFIG["thumbnail_seconds"]))
+
+    detector = FaceDetector()
+    if detector.face_cascade is None:
+        detector = None
+
+    first = task["offset"] + task["start"]
+    times = task.get("times")
+
+    reader = cv2.VideoCapture(task["segment"])
+    reader.set(cv2.CAP_PROP_POS_FRAMES, task["start"])
+    writer = None
+    archive_part = None
+    frame_size = None
+    samples, thumbnails = [], []
+    frames = 0
+    try:
+        for index in range(first, task["offset"] + task["end"]):
+            ret, frame = reader.read()
+            if not ret:
+                break
+            frames += 1
+            t = times[index - first] if times else index / fps
+            height, width = frame.shape[:2]
+            frame_size = (width, height)
+
+            if detector is not None and index % analysis_every == 0:
+                analysis = detector.analyze(frame)
+                samples.append({"t": t, "faces_detected": analysis["faces_detected"],
+                                "face_positions": analysis["face_positions"]})
+
+            if index % thumbnail_every == 0:
+                thumb_width = POSTPROCESS_CONFIG["thumbnail_width"]
+                thumbnail = cv2.resize(frame, (thumb_width, round(height * thumb_width / width)),
+                                       interpolation=cv2.INTER_AREA)
+                name = f"thumb_{index:07d}.jpg"
+                cv2.imwrite(os.path.join(task["output_dir"], name), thumbnail)
+                thumbnails.append({"t": t, "file": name})
+
+            if index % archive_every == 0:
+                scale = POSTPROCESS_CONFIG["archive_scale"]
+                size = (round(width * scale) // 2 * 2, round(height * scale) // 2 * 2)
+                if writer is None:
+                    archive_part = f"archive_{task['id']:04d}.mp4"
+                    fourcc = cv2.VideoWriter_fourcc(*RECORDING_CONFIG["codec"])
+                    writer = cv2.VideoWriter(os.path.join(task["output_dir"], archive_part),
+                                             fourcc, fps / archive_every, size)
+                writer.write(cv2.resize(frame, size, interpolation=cv2.INTER_AREA))
+    finally:
+        reader.release()
+        if writer is not None:
+            writer.release()
+
+    part = {
+        "id": task["id"],
+        "frames": frames,
+        "frame_size": frame_size,
+        "samples": samples,
+        "thumbnails": thumbnails,
+        "archive_part": archive_part,
+        "archive_fps": fps / archive_every,
+        "elapsed_s": time.perf_counter() - started,
+    }
+    _write_json(task["part_path"], part)
+    return part
+
+
+def join_archive(output_dir: str, parts: List[Dict]) -> Optional[str]:
+    """Concatenate the chunks' archive parts into archive.mp4"""
+    names = [part["archive_part"] for part in parts if part["archive_part"]]
+    if not names:
+        return None
+
+    path = os.path.join(output_dir, "archive.mp4")
+    tmp_path = os.path.join(output_dir, f"archive.{os.getpid()}.tmp.mp4")
+    out = None
+    for name in names:
+        reader = cv2.VideoCapture(os.path.join(output_dir, name))
+        while True:
+            ret, frame = reader.read()
+            if not ret:
+                break
+            if out is None:
+                height, width = frame.shape[:2]
+                fourcc = cv2.VideoWriter_fourcc(*RECORDING_CONFIG["codec"])
+                out = cv2.VideoWriter(tmp_path, fourcc, parts[0]["archive_fps"], (width, height))
+            out.write(frame)
+        reader.release()
+    if out is None:
+        return None
+    out.release()
+    os.replace(tmp_path, path)
+    return os.path.basename(path)
+
+
+class PostProcessor:
+    """Job queue of finished recordings, worked off chunk by chunk by a process pool"""
+
+    def __init__(self, directory: Optional[str] = None, workers: Optional[int] = None):
+        self.directory = directory or RECORDING_CONFIG["directory"]
+        self.workers = workers or POSTPROCESS_CONFIG["workers"] or os.cpu_count()
+        self.failures = {}  # manifest path -> (failed attempts, time of the next attempt)
+
+    def pending(self) -> List[str]:
+        """Manifests of finished recordings that have no results yet and are due, oldest first"""
+        manifests = sorted(glob.glob(os.path.join(self.directory, "*.json")), key=os.path.getmtime)
+        now = time.time()
+        return [path for path in manifests
+                if not os.path.exists(os.path.join(output_dir_for(path), "results.json"))
+                and self.failures.get(path, (0, 0))[1] <= now]
+
+    def _record_failure(self, manifest_path: str):
+        """Back off before the next attempt at a failed recording, and give up after max_attempts"""
+        attempts = self.failures.get(manifest_path, (0, 0))[0] + 1
+        name = os.path.basename(manifest_path)
+        if attempts >= POSTPROCESS_CONFIG["max_attempts"]:
+            print(f"⛔ Giving up on {name} after {attempts} failed attempts")
+            self.failures[manifest_path] = (attempts, float("inf"))
+            return
+        delay = POSTPROCESS_CONFIG["retry_seconds"] * 2 ** (attempts - 1)
+        print(f"🔁 Retrying {name} in {delay:.0f}s (attempt {attempts} failed)")
+        self.failures[manifest_path] = (attempts, time.time() + delay)
+
+    def _quarantine(self, manifest_path: str, error: Exception):
+        """Rename an unusable manifest to <base>.json.invalid so it is not picked up again"""
+        print(f"⚠️ Skipping {os.path.basename(manifest_path)}: {error}")
+        try:
+            os.replace(manifest_path, f"{manifest_path}.invalid")
+        except OSError as e:
+            print(f"Could not set {manifest_path} aside: {e}")
+            self.failures[manifest_path] = (POSTPROCESS_CONFIG["max_attempts"], float("inf"))
+
+    def process(self, manifest_path: str, executor: ProcessPoolExecutor) -> Optional[Dict]:
+        """Run the missing chunks of one recording and merge them; None if some chunk failed"""
+        manifest, tasks = plan_chunks(manifest_path)
+        output_dir = output_dir_for(manifest_path)
+        os.makedirs(output_dir, exist_ok=True)
+
+        parts = {}
+        todo = []
+        for task in tasks:
+            part = _read_json(task["part_path"]) if os.path.exists(task["part_path"]) else None
+            # A chunk is done once its part file is written and its archive part still exists
+            if part and (not part["archive_part"]
+                         or os.path.exists(os.path.join(output_dir, part["archive_part"]))):
+                parts[task["id"]] = part
+            else:
+                todo.append(task)
+        if parts:
+            print(f"↩️ Resuming {os.path.basename(manifest_path)}: {len(parts)}/{len(tasks)} chunks already done")
+
+        started = time.perf_counter()
+        frames_this_run = 0
+        failed = False
+        futures = {executor.submit(process_chunk, task): task for task in todo}
+        for future in as_completed(futures):
+            task = futures[future]
+            try:
+                part = future.result()
+            except Exception as e:
+                print(f"❌ Chunk {task['id']} of {os.path.basename(manifest_path)} failed: {e}")
+                failed = True
+                continue
+            parts[task["id"]] = part
+            frames_this_run += part["frames"]
+        wall_s = time.perf_counter() - started
+        if failed:
+            return None
+
+        return self._merge(manifest_path, manifest, [parts[task["id"]] for task in tasks],
+                           frames_this_run, wall_s)
+
+    def _merge(self, manifest_path: str, manifest: Dict, parts: List[Dict],
+               frames_this_run: int, wall_s: float) -> Dict:
+        """Combine the chunk parts into results.json and archive.mp4"""
+        from face_timeline import FaceTimeline
+
+        output_dir = output_dir_for(manifest_path)
+        timeline = FaceTimeline()
+        for part in parts:
+            for sample in part["samples"]:
+                timeline.append(sample["t"], sample, (part["frame_size"][1], part["frame_size"][0]))
+
+        frames = sum(part["frames"] for part in parts)
+        busy_s = sum(part["elapsed_s"] for part in parts)
+        results = {
+            "recording": os.path.basename(manifest_path),
+            "frames": frames,
+            "duration_s": round(frames / manifest["fps"], 1),
+            "face_presence": timeline.summary() if timeline.size else None,
+            "presence_intervals": timeline.intervals(),
+            "multi_face_events": timeline.multi_face_events(),
+            "thumbnails": [thumbnail for part in parts for thumbnail in part["thumbnails"]],
+            "archive": join_archive(output_dir, parts),
+            "throughput": {
+                "workers": self.workers,
+                "frames_this_run": frames_this_run,
+                "wall_s": round(wall_s, 2),
+                "fps": round(frames_this_run / wall_s, 1) if wall_s else None,
+                "per_worker_fps": round(frames / busy_s, 1) if busy_s else None,
+            },
+            "finished_at": time.time(),
+        }
+        _write_json(os.path.join(output_dir, "results.json"), results)
+
+        for part in parts:
+            if part["archive_part"]:
+                os.remove(os.path.join(output_dir, part["archive_part"]))
+        return results
+
+    def run(self, watch: bool = False, poll_seconds: Optional[float] = None):
+        """Process pending recordings; with watch=True keep polling for new ones"""
+        poll_seconds = poll_seconds or POSTPROCESS_CONFIG["poll_seconds"]
+        with ProcessPoolExecutor(max_workers=self.workers) as executor:
+            while True:
+                for manifest_path in self.pending():
+                    try:
+                        read_manifest(manifest_path)
+                    except ValueError as e:
+                        self._quarantine(manifest_path, e)
+                        continue
+                    except OSError as e:
+                        print(f"❌ Could not read {os.path.basename(manifest_path)}: {e}")
+                        self._record_failure(manifest_path)
+                        continue
+
+                    print(f"🎞️ Processing {os.path.basename(manifest_path)} on {self.workers} workers...")
+                    try:
+                        results = self.process(manifest_path, executor)
+                    except Exception as e:
+                        print(f"❌ {os.path.basename(manifest_path)} failed: {e}")
+                        results = None
+                    if results is None:
+                        self._record_failure(manifest_path)
+                        continue
+                    self.failures.pop(manifest_path, None)
+                    throughput = results["throughput"]
+                    print(f"✅ {results['frames']} frames; {throughput['fps']} fps "
+                          f"({throughput['per_worker_fps']} fps per worker)")
+                if not watch:
+                    return
+                time.sleep(poll_seconds)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Post-process finished interview recordings")
+    parser.add_argument('--directory', default=RECORDING_CONFIG["directory"])
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--watch', action='store_true', help="keep picking up new recordings")
+    args = parser.parse_args()
+
+    PostProcessor(args.directory, args.workers).run(watch=args.watch)
+
+
+if __name__ == "__main__":
+    main()
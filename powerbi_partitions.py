@@ -0,0 +1,154 @@
+"""
+Power BI Partitioned Outputs
+============================
+
+Writes the main dashboard dataset as one file per HireYear/Department
+partition in a Hive-style folder layout:
+
+    HR_Dashboard_Partitions/
+        _partitions.json
+        HireYear=2021/Department=Sales/part.csv
+        HireYear=2021/Department=Engineering/part.csv
+        ...
+
+Each partition's content digest is stored in _partitions.json. On later runs
+only partitions whose digest changed are rewritten, and partitions that no
+longer exist are removed, so Power BI incremental refresh (or any consumer
+reading the manifest) only reloads what actually changed.
+
+CSV is the default format. Parquet is available when pyarrow is installed.
+"""
+
+import hashlib
+import json
+import os
+from datetime import datetime
+from urllib.parse import quote
+
+import pandas as pd
+
+PARTITION_ROOT = 'HR_Dashboard_Partitions'
+PARTITION_COLUMNS = ('HireYear', 'Department')
+PARTITION_MANIFEST = '_partitions.json'
+
+
+def _partition_dir(keys):
+    """Relative directory for a tuple of (column, value) pairs"""
+    return os.path.join(*[f"{col}={quote(str(value), safe=' -_.')}" for col, value in keys])
+
+
+def partition_digest(frame):
+    """Content digest of a partition, independent of the output format and column order"""
+    frame = frame[sorted(frame.columns, key=str)]
+    digest = hashlib.sha256()
+    digest.update('\x1f'.join(f"{col}:{dtype}" for col, dtype in frame.dtypes.items()).encode())
+    digest.update(pd.util.hash_pandas_object(frame, index=False).to_numpy().tobytes())
+    return digest.hexdigest()
+
+
+def _write_file(frame, path, fmt):
+    """Write one partition file atomically"""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = path + '.tmp'
+    if fmt == 'parquet':
+        frame.to_parquet(tmp_path, index=False)
+    else:
+        frame.to_csv(tmp_path, index=False)
+    os.replace(tmp_path, path)
+
+
+def _load_partition_manifest(manifest_path):
+    try:
+        with open(manifest_path, 'r') as f:
+            manifest = json.load(f)
+        if isinstance(manifest.get('partitions'), dict):
+            return manifest
+    except (OSError, ValueError, AttributeError):
+        pass
+    return {'partitions': {}}
+
+
+def write_partitions(df, root=PARTITION_ROOT, partition_columns=PARTITION_COLUMNS, fmt='csv'):
+    """Write df as partition files under root, rewriting only changed partitions.
+
+    Returns a dict with lists of written, unchanged and removed partition
+    directories (relative to root).
+    """
+    if fmt == 'parquet':
+        try:
+            import pyarrow  # noqa: F401
+        except ImportError:
+            print("pyarrow not installed, writing CSV partitions instead. Run: pip install pyarrow")
+            fmt = 'csv'
+    elif fmt != 'csv':
+        raise ValueError(f"Unsupported partition format: {fmt}")
+
+    manifest_path = os.path.join(root, PARTITION_MANIFEST)
+    previous = _load_partition_manifest(manifest_path)
+    same_layout = (previous.get('format') == fmt and
+                   previous.get('partition_columns') == list(partition_columns))
+    old_partitions = previous['partitions'] if same_layout else {}
+
+    filename = f"part.{fmt}"
+    partitions = {}
+    result = {'written': [], 'unchanged': [], 'removed': []}
+
+    for values, frame in df.groupby(list(partition_columns), sort=True, observed=True, dropna=False):
+        if not isinstance(values, tuple):
+            values = (values,)
+        relative_dir = _partition_dir(zip(partition_columns, values))
+        path = os.path.join(root, relative_dir, filename)
+        frame = frame.reset_index(drop=True)
+        digest = partition_digest(frame)
+
+        old = old_partitions.get(relative_dir)
+        if old is not None and old['sha256'] == digest and os.path.exists(path):
+            partitions[relative_dir] = old
+            result['unchanged'].append(relative_dir)
+            continue
+
+        _write_file(frame, path, fmt)
+        partitions[relative_dir] = {
+            'file': os.path.join(relative_dir, filename),
+            'values': {col: str(value) for col, value in zip(partition_columns, values)},
+            'rows': len(frame),
+            'sha256': digest,
+            'updated_at': datetime.now().isoformat(timespec='seconds'),
+        }
+        result['written'].append(relative_dir)
+
+    # Drop partitions that disappeared, and everything from an old layout
+    stale = set(previous['partitions']) - (set(partitions) if same_layout else set())
+    for relative_dir in sorted(stale):
+        stale_path = os.path.join(root, previous['partitions'][relative_dir]['file'])
+        if os.path.exists(stale_path):
+            os.remove(stale_path)
+        _remove_empty_dirs(os.path.dirname(stale_path), root)
+        if relative_dir not in partitions:
+            result['removed'].append(relative_dir)
+
+    manifest = {
+        'format': fmt,
+        'partition_columns': list(partition_columns),
+        'total_rows': int(len(df)),
+        'updated_at': datetime.now().isoformat(timespec='seconds'),
+        'partitions': partitions,
+    }
+    os.makedirs(root, exist_ok=True)
+    tmp_path = manifest_path + '.tmp'
+    with open(tmp_path, 'w') as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+    os.replace(tmp_path, manifest_path)
+
+    return result
+
+
+def _remove_empty_dirs(directory, root):
+    """Remove empty directories from directory up to (not including) root"""
+    root = os.path.abspath(root)
+    directory = os.path.abspath(directory)
+    while directory != root and directory.startswith(root) and os.path.isdir(directory):
+        if os.listdir(directory):
+            break
+        os.rmdir(directory)
+        directory = os.path.dirname(directory)
@@ -0,0 +1,178 @@
+import asyncio
+import copy
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Optional
+
+from config import RESPONSE_CACHE_CONFIG
+
+
+def normalize_answer(text: str) -> str:
+    """Normalize an answer for cache keys: case, whitespace and trailing punctuation"""
+    text = re.sub(r"\s+", " ", text or "").strip().casefold()
+    return text.rstrip(".!?,; ")
+
+
+class ResponseCache:
+    """Content-addressed cache for model responses
+
+    Lookups go to an in-memory LRU first and then to a SQLite table on
+    disk. Disk entries expire after ttl_seconds, and the oldest entries are
+    evicted once the table holds more than max_entries. Hits and misses are
+    counted per tier for stats().
+
+    Values are copied in and out, so callers may change what they get.
+    Coroutines on the shared client loop use get_async()/put_async(), which
+    run the SQLite work on the cache's own thread instead of the loop.
+    """
+
+    def __init__(self, config: Optional[dict] = None):
+        self.config = dict(RESPONSE_CACHE_CONFIG, **(config or {}))
+        self.memory: "OrderedDict[str, Any]" = OrderedDict()
+        self.counts = {"memory_hits": 0, "disk_hits": 0, "misses": 0, "stores": 0, "evictions": 0}
+        self._lock = threading.Lock()
+        self._db = None
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="response-cache")
+
+        path = self.config["path"]
+        if path:
+            try:
+                directory = os.path.dirname(path)
+                if directory:
+                    os.makedirs(directory, exist_ok=True)
+                self._db = sqlite3.connect(path, check_same_thread=False, timeout=5)
+                self._db.execute("PRAGMA journal_mode=WAL")
+                self._db.execute(
+                    "CREATE TABLE IF NOT EXISTS responses ("
+                    " key TEXT PRIMARY KEY, kind TEXT, value TEXT,"
+                    " created_at REAL, accessed_at REAL)"
+                )
+                self._db.execute("CREATE INDEX IF NOT EXISTS responses_accessed ON responses (accessed_at)")
+                self._db.commit()
+            except sqlite3.Error as e:
+                print(f"Warning: response cache disabled on disk: {e}")
+                self._db = None
+
+    @staticmethod
+    def make_key(kind: str, model: str, template_version: int, role: str, question: str, answer: str) -> str:
+        """Key a response by everything that determines the prompt"""
+        payload = json.dumps([kind, model, template_version, role, question.strip(), normalize_answer(answer)])
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def _remember(self, key: str, value: Any):
+        self.memory[key] = value
+        self.memory.move_to_end(key)
+        while len(self.memory) > self.config["memory_entries"]:
+            self.memory.popitem(last=False)
+
+    def get(self, key: str) -> Optional[Any]:
+        """Return the cached value for key, or None on a miss"""
+        with self._lock:
+            if key in self.memory:
+                self.memory.move_to_end(key)
+                self.counts["memory_hits"] += 1
+                return copy.deepcopy(self.memory[key])
+
+            if self._db is not None:
+                now = time.time()
+                try:
+                    row = self._db.execute(
+                        "SELECT value FROM responses WHERE key = ? AND created_at >= ?",
+                        (key, now - self.config["ttl_seconds"])
+                    ).fetchone()
+                    if row is not None:
+                        self._db.execute("UPDATE responses SET accessed_at = ? WHERE key = ?", (now, key))
+                        self._db.commit()
+                        value = json.loads(row[0])
+                        self._remember(key, value)
+                        self.counts["disk_hits"] += 1
+                        return copy.deepcopy(value)
+                except (sqlite3.Error, ValueError) as e:
+                    print(f"Warning: response cache read failed: {e}")
+
+            self.counts["misses"] += 1
+            return None
+
+    def put(self, key: str, value: Any, kind: str = ""):
+        """Store a JSON-serializable value in both tiers"""
+        with self._lock:
+            self._remember(key, copy.deepcopy(value))
+            self.counts["stores"] += 1
+            if self._db is None:
+                return
+
+            now = time.time()
+            try:
+                self._db.execute(
+                    "INSERT OR REPLACE INTO responses (key, kind, value, created_at, accessed_at)"
+                    " VALUES (?, ?, ?, ?, ?)",
+                    (key, kind, json.dumps(value), now, now)
+                )
+                self._evict(now)
+                self._db.commit()
+            except sqlite3.Error as e:
+                print(f"Warning: response cache write failed: {e}")
+
+    async def get_async(self, key: str) -> Optional[Any]:
+        """get() without blocking the event loop on the disk tier"""
+        return await asyncio.get_running_loop().run_in_executor(self._executor, self.get, key)
+
+    async def put_async(self, key: str, value: Any, kind: str = ""):
+        """put() without blocking the event loop on the disk write"""
+        await asyncio.get_running_loop().run_in_executor(self._executor, self.put, key, value, kind)
+
+    def _evict(self, now: float):
+        """Drop expired rows, then the least recently used rows above max_entries"""
+        expired = self._db.execute(
+            "DELETE FROM responses WHERE created_at < ?", (now - self.config["ttl_seconds"],)
+        ).rowcount
+        overflow = self._db.execute("SELECT COUNT(*) FROM responses").fetchone()[0] - self.config["max_entries"]
+        if overflow > 0:
+            self._db.execute(
+                "DELETE FROM responses WHERE key IN "
+                "(SELECT key FROM responses ORDER BY accessed_at LIMIT ?)", (overflow,)
+            )
+        self.counts["evictions"] += expired + max(overflow, 0)
+
+    def stats(self) -> Dict:
+        """Hit and miss counts per tier plus the overall hit rate"""
+        with self._lock:
+            stats = dict(self.counts)
+            stats["memory_entries"] = len(self.memory)
+            if self._db is not None:
+                try:
+                    stats["disk_entries"] = self._db.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+                except sqlite3.Error:
+                    stats["disk_entries"] = None
+        lookups = stats["memory_hits"] + stats["disk_hits"] + stats["misses"]
+        stats["hit_rate"] = (stats["memory_hits"] + stats["disk_hits"]) / lookups if lookups else 0.0
+        return stats
+
+    def clear(self):
+        """Remove every cached response from both tiers"""
+        with self._lock:
+            self.memory.clear()
+            if self._db is not None:
+                self._db.execute("DELETE FROM responses")
+                self._db.commit()
+
+
+_shared_cache = None
+_shared_cache_lock = threading.Lock()
+
+
+def get_response_cache() -> ResponseCache:
+    """Return the process-wide response cache, creating it on first use"""
+    global _shared_cache
+    if _shared_cache is None:
+        with _shared_cache_lock:
+            if _shared_cache is None:
+                _shared_cache = ResponseCache()
+    return _shared_cache
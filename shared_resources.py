@@ -0,0 +1,184 @@
+#!/usr/bin/env python3
+"""
+Process-wide shared resources for interview sessions.
+
+Streamlit runs every candidate's session in the same server process, so
+anything that does not hold per-candidate state is created once here and
+reused by all sessions:
+
+- the OpenAI client and response cache (openai_client / response_cache)
+- the Haar cascade face classifier (loaded once, one instance per thread)
+- the TTS question-audio cache and its speech worker
+- the microphone ambient-noise calibration profile
+- the final-report cache
+
+Per-session objects (conversation history, scores, camera recording) stay
+in st.session_state and borrow these. Measure what each extra session
+costs with:
+    python shared_resources.py --sessions 5
+"""
+
+import argparse
+import gc
+import threading
+import time
+import tracemalloc
+from typing import Any, Callable, Dict
+
+from config import NOISE_PROFILE_CONFIG
+
+_resources: Dict[str, Any] = {}
+_resources_lock = threading.Lock()
+
+
+def get_shared(name: str, factory: Callable[[], Any]) -> Any:
+    """Return the process-wide resource called name, creating it with factory on first use"""
+    if name not in _resources:
+        with _resources_lock:
+            if name not in _resources:
+                _resources[name] = factory()
+    return _resources[name]
+
+
+class ThreadLocalCascade:
+    """Haar cascade with one classifier per calling thread
+
+    A classifier instance must not run detectMultiScale on several threads
+    at once. Rather than serializing every session, WebRTC callback and
+    analysis worker on one lock, each thread loads its own copy of the
+    cascade on first use.
+    """
+
+    def __init__(self, path: str, cascade):
+        self.path = path
+        self._local = threading.local()
+        self._local.cascade = cascade
+
+    def _classifier(self):
+        cascade = getattr(self._local, 'cascade', None)
+        if cascade is None:
+            import cv2
+
+            cascade = self._local.cascade = cv2.CascadeClassifier(self.path)
+        return cascade
+
+    def detectMultiScale(self, image, *args, **kwargs):
+        return self._classifier().detectMultiScale(image, *args, **kwargs)
+
+
+def _load_face_cascade():
+    import cv2
+
+    try:
+        path = cv2.data.haarcascades + 'haarcascade_frontalface_default.xml'
+        cascade = cv2.CascadeClassifier(path)
+        if cascade.empty():
+            return None
+    except Exception:
+        return None
+    return ThreadLocalCascade(path, cascade)
+
+
+def get_face_cascade():
+    """Shared Haar face cascade, or None when it cannot be loaded"""
+    return get_shared('face_cascade', _load_face_cascade)
+
+
+def get_tts_cache():
+    """Shared pre-synthesized question audio cache on the shared speech worker"""
+    from tts_cache import TTSCache
+
+    return get_shared('tts_cache', TTSCache)
+
+
+def get_report_cache():
+    """Shared final-report cache"""
+    from ai_services import ReportCache
+
+    return get_shared('report_cache', ReportCache)
+
+
+class NoiseProfile:
+    """Ambient-noise calibration shared by every SpeechProcessor
+
+    The first processor calibrates the microphone; later ones reuse the
+    measured energy threshold until it is older than max_age_s.
+    """
+
+    def __init__(self, max_age_s: float):
+        self.max_age_s = max_age_s
+        self.energy_threshold = None
+        self.calibrated_at = None
+        self._lock = threading.Lock()
+
+    def apply(self, recognizer, microphone):
+        """Set recognizer.energy_threshold, calibrating on microphone only when needed"""
+        with self._lock:
+            stale = self.calibrated_at is None or time.time() - self.calibrated_at > self.max_age_s
+            if stale:
+                with microphone as source:
+                    recognizer.adjust_for_ambient_noise(source, duration=NOISE_PROFILE_CONFIG["duration_s"])
+                self.energy_threshold = recognizer.energy_threshold
+                self.calibrated_at = time.time()
+            else:
+                recognizer.energy_threshold = self.energy_threshold
+
+
+def get_noise_profile() -> NoiseProfile:
+    return get_shared('noise_profile', lambda: NoiseProfile(NOISE_PROFILE_CONFIG["max_age_s"]))
+
+
+def measure_session_memory(create_session: Callable[[], Any], sessions: int = 5) -> Dict:
+    """Measure the Python heap cost of the first session and of each extra session
+
+    The first session pays for the shared resources; the average over the
+    following sessions is what one more concurrent candidate costs.
+    """
+    tracemalloc.start()
+    try:
+        kept = []
+        gc.collect()
+        baseline = tracemalloc.get_traced_memory()[0]
+        kept.append(create_session())
+        gc.collect()
+        first = tracemalloc.get_traced_memory()[0]
+        for _ in range(sessions - 1):
+            kept.append(create_session())
+        gc.collect()
+        total = tracemalloc.get_traced_memory()[0]
+    finally:
+        tracemalloc.stop()
+
+    return {
+        "sessions": sessions,
+        "first_session_bytes": first - baseline,
+        "per_extra_session_bytes": (total - first) / max(sessions - 1, 1),
+    }
+
+
+def _default_session():
+    """The services interview_page creates for a session, minus camera and microphone"""
+    from ai_services import AIInterviewer, AnswerScorer, ScoringQueue
+    from video_recorder import FaceDetector
+
+    scorer = AnswerScorer()
+    return {
+        'ai_interviewer': AIInterviewer(),
+        'answer_scorer': scorer,
+        'scoring_queue': ScoringQueue(scorer),
+        'face_detector': FaceDetector(),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure memory per interview session")
+    parser.add_argument('--sessions', type=int, default=5)
+    args = parser.parse_args()
+
+    result = measure_session_memory(_default_session, max(args.sessions, 2))
+    print(f"📏 First session (incl. shared resources): {result['first_session_bytes'] / 1024:,.1f} KiB")
+    print(f"📏 Each extra session: {result['per_extra_session_bytes'] / 1024:,.1f} KiB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,538 @@
+#!/usr/bin/env python3
+"""
+Streaming speech capture with voice-activity segmentation.
+
+Three threads cooperate so the candidate's words show up while they are
+still talking:
+
+    capture     audio source -> FrameRingBuffer
+    segmenter   ring buffer  -> voice-activity detector -> utterance segments
+    recognizer  segments     -> transcript pieces (partials)
+
+Audio comes from the microphone, from the browser over WebRTC
+(PushAudioSource) or, for testing, from a WAV file. The recognizer
+backend is pluggable: the online Google recognizer, or offline
+Sphinx/Whisper through the speech_recognition package.
+
+Try it on a recording:
+    python speech_stream.py answer.wav --recognizer sphinx
+"""
+
+import argparse
+import queue
+import threading
+import time
+import wave
+from collections import deque
+from typing import Callable, Dict, Iterator, List, Optional
+
+import numpy as np
+import speech_recognition as sr
+
+from config import SPEECH_STREAM_CONFIG
+
+try:
+    import webrtcvad
+except ImportError:
+    webrtcvad = None
+
+
+# ---------------------------------------------------------------------------
+# Audio sources: 16-bit mono PCM frames of a fixed number of samples
+# ---------------------------------------------------------------------------
+
+class MicrophoneSource:
+    """Live frames from a speech_recognition Microphone"""
+
+    sample_width = 2
+    live = True
+
+    def __init__(self, microphone: Optional[sr.Microphone] = None):
+        self.microphone = microphone or sr.Microphone(sample_rate=SPEECH_STREAM_CONFIG["sample_rate"])
+        self.sample_rate = self.microphone.SAMPLE_RATE
+
+    def frames(self, frame_samples: int) -> Iterator[bytes]:
+        with self.microphone as source:
+            while True:
+                yield source.stream.read(frame_samples)
+
+
+class WavFileSource:
+    """Frames read from a WAV file, optionally paced like a live microphone
+
+    Unless realtime is set the file is read as fast as it is consumed, so
+    it is not live: the transcriber waits for it instead of dropping frames.
+    """
+
+    sample_width = 2
+
+    def __init__(self, path: str, realtime: bool = False):
+        self.path = path
+        self.realtime = realtime
+        self.live = realtime
+        with wave.open(path, 'rb') as wav:
+            self.sample_rate = wav.getframerate()
+
+    def frames(self, frame_samples: int) -> Iterator[bytes]:
+        frame_seconds = frame_samples / self.sample_rate
+        next_time = time.perf_counter()
+        with wave.open(self.path, 'rb') as wav:
+            channels, width = wav.getnchannels(), wav.getsampwidth()
+            while True:
+                raw = wav.readframes(frame_samples)
+                if not raw:
+                    return
+                frame = _to_mono_int16(raw, channels, width)
+                if len(frame) < frame_samples * 2:
+                    frame += b'\x00' * (frame_samples * 2 - len(frame))
+                if self.realtime:
+                    next_time += frame_seconds
+                    time.sleep(max(0.0, next_time - time.perf_counter()))
+                yield frame
+
+
+class PushAudioSource:
+    """Frames from audio pushed in by another thread, such as the WebRTC audio callback
+
+    push() takes mono samples at any rate and resamples them to
+    sample_rate. Only audio pushed after a reader starts is delivered, and
+    at most max_seconds of it is buffered. When the sender stalls the reader
+    gets silence, so the start and end-of-answer timeouts still run.
+    """
+
+    sample_width = 2
+    live = True
+
+    def __init__(self, sample_rate: Optional[int] = None, max_seconds: Optional[float] = None):
+        self.sample_rate = sample_rate or SPEECH_STREAM_CONFIG["sample_rate"]
+        self.max_bytes = int((max_seconds or SPEECH_STREAM_CONFIG["ring_seconds"]) * self.sample_rate) * 2
+        self._buffer = bytearray()
+        self._condition = threading.Condition()
+
+    def push(self, samples: np.ndarray, sample_rate: int):
+        if sample_rate != self.sample_rate:
+            samples = _resample(samples, sample_rate, self.sample_rate)
+        data = np.clip(samples, -32768, 32767).astype(np.int16).tobytes()
+        with self._condition:
+            self._buffer += data
+            if len(self._buffer) > self.max_bytes:
+                del self._buffer[:len(self._buffer) - self.max_bytes]
+            self._condition.notify_all()
+
+    def frames(self, frame_samples: int) -> Iterator[bytes]:
+        frame_bytes = frame_samples * 2
+        stall_frames = 4
+        with self._condition:
+            self._buffer.clear()
+        while True:
+            with self._condition:
+                self._condition.wait_for(lambda: len(self._buffer) >= frame_bytes,
+                                         timeout=stall_frames * frame_samples / self.sample_rate)
+                if len(self._buffer) >= frame_bytes:
+                    frames = [bytes(self._buffer[:frame_bytes])]
+                    del self._buffer[:frame_bytes]
+                else:
+                    frames = [b'\x00' * frame_bytes] * stall_frames
+            yield from frames
+
+
+def _resample(samples: np.ndarray, from_rate: int, to_rate: int) -> np.ndarray:
+    """Resample mono audio; whole-number downsampling averages groups of samples"""
+    if from_rate % to_rate == 0:
+        factor = from_rate // to_rate
+        usable = len(samples) - len(samples) % factor
+        return samples[:usable].reshape(-1, factor).mean(axis=1)
+    count = int(round(len(samples) * to_rate / from_rate))
+    positions = np.arange(count) * (from_rate / to_rate)
+    return np.interp(positions, np.arange(len(samples)), samples.astype(np.float32))
+
+
+def _to_mono_int16(raw: bytes, channels: int, width: int) -> bytes:
+    """Convert PCM of any common sample width and channel count to 16-bit mono"""
+    if width == 2 and channels == 1:
+        return raw
+    if width == 1:
+        samples = (np.frombuffer(raw, dtype=np.uint8).astype(np.int32) - 128) << 8
+    elif width == 2:
+        samples = np.frombuffer(raw, dtype=np.int16).astype(np.int32)
+    elif width == 4:
+        samples = np.frombuffer(raw, dtype=np.int32) >> 16
+    else:
+        raise ValueError(f"Unsupported WAV sample width: {width} bytes")
+    if channels > 1:
+        samples = samples.reshape(-1, channels).mean(axis=1)
+    return samples.astype(np.int16).tobytes()
+
+
+# ---------------------------------------------------------------------------
+# Ring buffer, voice-activity detection and segmentation
+# ---------------------------------------------------------------------------
+
+class FrameRingBuffer:
+    """Bounded frame buffer between the capture and segmenter threads
+
+    When the consumer falls behind, the oldest frames are overwritten and
+    counted in dropped, so live capture never blocks. With lossless=True
+    (for sources that are not live, such as files) put() waits for room
+    instead; it returns without storing the frame once the buffer is closed.
+    """
+
+    def __init__(self, capacity: int, lossless: bool = False):
+        self._frames = deque(maxlen=capacity)
+        self._condition = threading.Condition()
+        self.lossless = lossless
+        self.closed = False
+        self.dropped = 0
+
+    def put(self, frame: bytes):
+        with self._condition:
+            if self.lossless:
+                self._condition.wait_for(lambda: len(self._frames) < self._frames.maxlen or self.closed)
+                if self.closed:
+                    return
+            elif len(self._frames) == self._frames.maxlen:
+                self.dropped += 1
+            self._frames.append(frame)
+            self._condition.notify_all()
+
+    def get(self, timeout: Optional[float] = None) -> Optional[bytes]:
+        """Next frame, or None once the buffer is closed and drained (or on timeout)"""
+        with self._condition:
+            if not self._frames and not self.closed:
+                self._condition.wait(timeout)
+            if not self._frames:
+                return None
+            frame = self._frames.popleft()
+            self._condition.notify_all()
+            return frame
+
+    def close(self):
+        with self._condition:
+            self.closed = True
+            self._condition.notify_all()
+
+
+class EnergyVAD:
+    """RMS energy threshold, in the same units as Recognizer.energy_threshold
+
+    With threshold=None the threshold is calibrated from the stream itself:
+    the first calibration_s of audio are taken as ambient noise, never as
+    speech, and the threshold is set to energy_ratio times their mean RMS,
+    as Recognizer.adjust_for_ambient_noise does for a local microphone.
+    """
+
+    def __init__(self, threshold: Optional[float] = 300, calibration_s: Optional[float] = None,
+                 energy_ratio: float = 1.5):
+        self.threshold = threshold
+        self.calibration_s = SPEECH_STREAM_CONFIG["vad_calibration_s"] if calibration_s is None else calibration_s
+        self.energy_ratio = energy_ratio
+        self._noise: List[float] = []
+        self._noise_s = 0.0
+
+    def is_speech(self, frame: bytes, sample_rate: int) -> bool:
+        samples = np.frombuffer(frame, dtype=np.int16).astype(np.float64)
+        if not samples.size:
+            return False
+        rms = float(np.sqrt(np.mean(samples * samples)))
+        if self.threshold is None:
+            # All-zero frames are filler for a stalled sender, not the room's noise
+            if rms > 0:
+                self._noise.append(rms)
+                self._noise_s += samples.size / sample_rate
+                if self._noise_s >= self.calibration_s:
+                    self.threshold = float(np.mean(self._noise)) * self.energy_ratio
+            return False
+        return rms > self.threshold
+
+
+class WebRTCVAD:
+    """webrtcvad detector; needs 8/16/32/48 kHz audio and 10/20/30 ms frames"""
+
+    SAMPLE_RATES = (8000, 16000, 32000, 48000)
+
+    def __init__(self, aggressiveness: int = 2):
+        self.vad = webrtcvad.Vad(aggressiveness)
+
+    def is_speech(self, frame: bytes, sample_rate: int) -> bool:
+        return self.vad.is_speech(frame, sample_rate)
+
+
+def make_vad(name: str, sample_rate: int, energy_threshold: Optional[float] = 300):
+    """Build the configured VAD, falling back to the energy detector when webrtcvad can't be used
+
+    energy_threshold=None calibrates the energy detector from the start of the audio.
+    """
+    if name == 'webrtc':
+        if webrtcvad is None:
+            print("webrtcvad not installed, using the energy VAD. Run: pip install webrtcvad")
+        elif sample_rate not in WebRTCVAD.SAMPLE_RATES:
+            print(f"webrtcvad does not support {sample_rate} Hz, using the energy VAD")
+        else:
+            return WebRTCVAD(SPEECH_STREAM_CONFIG["vad_aggressiveness"])
+    return EnergyVAD(energy_threshold)
+
+
+class UtteranceSegmenter:
+    """Cuts a frame stream into utterances using a VAD
+
+    An utterance starts after min_speech_ms of consecutive speech (keeping
+    preroll_ms of audio before it) and ends after hangover_ms of silence or
+    at max_segment_ms.
+    """
+
+    def __init__(self, vad, sample_rate: int, frame_ms: int, preroll_ms: int = 300,
+                 hangover_ms: int = 600, min_speech_ms: int = 150, max_segment_ms: int = 15000):
+        self.vad = vad
+        self.sample_rate = sample_rate
+        frames = lambda ms: max(1, int(ms / frame_ms))
+        self.min_speech_frames = frames(min_speech_ms)
+        self.hangover_frames = frames(hangover_ms)
+        self.max_segment_frames = frames(max_segment_ms)
+        self._preroll = deque(maxlen=max(frames(preroll_ms), self.min_speech_frames))
+        self._segment: List[bytes] = []
+        self._voiced_run = 0
+        self._silence_run = 0
+        self.in_speech = False
+
+    def process(self, frame: bytes) -> Optional[bytes]:
+        """Feed one frame; returns a finished utterance's PCM when one ends"""
+        voiced = self.vad.is_speech(frame, self.sample_rate)
+
+        if not self.in_speech:
+            self._preroll.append(frame)
+            self._voiced_run = self._voiced_run + 1 if voiced else 0
+            if self._voiced_run >= self.min_speech_frames:
+                self.in_speech = True
+                self._segment = list(self._preroll)
+                self._preroll.clear()
+                self._silence_run = 0
+            return None
+
+        self._segment.append(frame)
+        self._silence_run = 0 if voiced else self._silence_run + 1
+        if self._silence_run >= self.hangover_frames or len(self._segment) >= self.max_segment_frames:
+            return self.flush()
+        return None
+
+    def flush(self) -> Optional[bytes]:
+        """End the current utterance, if any, and return its PCM"""
+        segment = b''.join(self._segment) if self.in_speech else None
+        self.in_speech = False
+        self._segment = []
+        self._voiced_run = 0
+        self._silence_run = 0
+        return segment
+
+
+# ---------------------------------------------------------------------------
+# Recognizer backends
+# ---------------------------------------------------------------------------
+
+class SpeechRecognitionBackend:
+    """Transcribes PCM segments with one of the speech_recognition recognizers"""
+
+    def __init__(self, method: str, recognizer: Optional[sr.Recognizer] = None, **options):
+        self.method = method
+        self.recognizer = recognizer or sr.Recognizer()
+        self.options = options
+
+    def transcribe(self, pcm: bytes, sample_rate: int, sample_width: int = 2) -> Optional[str]:
+        audio = sr.AudioData(pcm, sample_rate, sample_width)
+        try:
+            text = getattr(self.recognizer, self.method)(audio, **self.options)
+        except sr.UnknownValueError:
+            return None
+        except sr.RequestError as e:
+            print(f"Speech recognition error: {e}")
+            return None
+        return text.strip() or None
+
+
+# Online and offline backends; add entries here to plug in another recognizer
+RECOGNIZER_BACKENDS: Dict[str, Callable[..., SpeechRecognitionBackend]] = {
+    'google': lambda recognizer=None: SpeechRecognitionBackend('recognize_google', recognizer),
+    'sphinx': lambda recognizer=None: SpeechRecognitionBackend('recognize_sphinx', recognizer),
+    'whisper': lambda recognizer=None: SpeechRecognitionBackend('recognize_whisper', recognizer,
+                                                                 model='base', language='english'),
+}
+
+
+def get_recognizer_backend(name: str, recognizer: Optional[sr.Recognizer] = None):
+    """Build a recognizer backend by name"""
+    if name not in RECOGNIZER_BACKENDS:
+        raise ValueError(f"Unknown recognizer backend: {name} (choose from {', '.join(RECOGNIZER_BACKENDS)})")
+    return RECOGNIZER_BACKENDS[name](recognizer)
+
+
+# ---------------------------------------------------------------------------
+# Pipeline
+# ---------------------------------------------------------------------------
+
+class StreamingTranscriber:
+    """Capture, segment and transcribe speech concurrently
+
+    Stops on its own once speech has been followed by end_silence_s of
+    silence, when nothing is said within start_timeout_s, after
+    max_duration_s, or when the source runs out (WAV files).
+    """
+
+    def __init__(self, source, backend, vad=None, config: Optional[dict] = None):
+        self.config = dict(SPEECH_STREAM_CONFIG, **(config or {}))
+        self.source = source
+        self.backend = backend
+        self.sample_rate = source.sample_rate
+        self.frame_samples = int(self.sample_rate * self.config["frame_ms"] / 1000)
+        self.vad = vad or make_vad(self.config["vad"], self.sample_rate)
+
+        self.ring = FrameRingBuffer(int(self.config["ring_seconds"] * 1000 / self.config["frame_ms"]),
+                                    lossless=not getattr(source, "live", True))
+        self.segmenter = UtteranceSegmenter(
+            self.vad, self.sample_rate, self.config["frame_ms"],
+            preroll_ms=self.config["preroll_ms"],
+            hangover_ms=self.config["hangover_ms"],
+            min_speech_ms=self.config["min_speech_ms"],
+            max_segment_ms=self.config["max_segment_s"] * 1000
+        )
+        self._segments = queue.Queue()
+        self._stop = threading.Event()
+        self._finished = threading.Event()
+        self._lock = threading.Lock()
+        self._threads: List[threading.Thread] = []
+
+        self.partials: List[str] = []
+        self.segment_latencies: List[float] = []
+        self.heard_speech = False
+        self.stop_reason = None
+        self._version = 0
+
+    def start(self) -> "StreamingTranscriber":
+        for target, name in ((self._capture, "speech-capture"),
+                             (self._segment, "speech-segmenter"),
+                             (self._recognize, "speech-recognizer")):
+            thread = threading.Thread(target=target, name=name)
+            thread.daemon = True
+            thread.start()
+            self._threads.append(thread)
+        return self
+
+    def stop(self, reason: str = "stopped"):
+        if self.stop_reason is None:
+            self.stop_reason = reason
+        self._stop.set()
+
+    def _capture(self):
+        try:
+            for frame in self.source.frames(self.frame_samples):
+                if self._stop.is_set():
+                    break
+                self.ring.put(frame)
+            else:
+                # Let the segmenter drain what was captured; closing the ring ends it
+                if self.stop_reason is None:
+                    self.stop_reason = "end of audio"
+        except Exception as e:
+            print(f"Audio capture error: {e}")
+            self.stop("capture error")
+        finally:
+            self.ring.close()
+
+    def _segment(self):
+        frame_ms = self.config["frame_ms"]
+        elapsed_ms = 0
+        silence_ms = 0
+
+        while True:
+            frame = self.ring.get(timeout=0.1)
+            if frame is None:
+                if self.ring.closed:
+                    break
+                continue
+
+            elapsed_ms += frame_ms
+            segment = self.segmenter.process(frame)
+            if segment:
+                self._segments.put((segment, time.perf_counter()))
+
+            if self.segmenter.in_speech:
+                self.heard_speech = True
+                silence_ms = 0
+            else:
+                silence_ms += frame_ms
+
+            if self.heard_speech and silence_ms >= self.config["end_silence_s"] * 1000:
+                self.stop("end of speech")
+            elif not self.heard_speech and elapsed_ms >= self.config["start_timeout_s"] * 1000:
+                self.stop("no speech")
+            elif elapsed_ms >= self.config["max_duration_s"] * 1000:
+                self.stop("max duration")
+            if self._stop.is_set():
+                break
+
+        # Release a capture thread waiting for room in a lossless ring
+        self.ring.close()
+        segment = self.segmenter.flush()
+        if segment:
+            self._segments.put((segment, time.perf_counter()))
+        self._segments.put(None)
+
+    def _recognize(self):
+        while True:
+            item = self._segments.get()
+            if item is None:
+                break
+            segment, ended_at = item
+            text = self.backend.transcribe(segment, self.sample_rate, self.source.sample_width)
+            with self._lock:
+                self.segment_latencies.append(time.perf_counter() - ended_at)
+                if text:
+                    self.partials.append(text)
+                    self._version += 1
+        self._finished.set()
+
+    @property
+    def finished(self) -> bool:
+        return self._finished.is_set()
+
+    def transcript(self) -> str:
+        with self._lock:
+            return " ".join(self.partials)
+
+    def iter_transcript(self, poll_interval: float = 0.1) -> Iterator[str]:
+        """Yield the running transcript whenever a new piece arrives, until capture ends"""
+        seen = 0
+        while True:
+            finished = self._finished.wait(poll_interval)
+            with self._lock:
+                version = self._version
+            if version != seen:
+                seen = version
+                yield self.transcript()
+            if finished:
+                return
+
+    def wait(self, timeout: Optional[float] = None) -> str:
+        """Block until capture and recognition are done and return the transcript"""
+        self._finished.wait(timeout)
+        return self.transcript()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Stream a WAV file through the speech capture pipeline")
+    parser.add_argument('wav', help="WAV file to transcribe")
+    parser.add_argument('--recognizer', default=SPEECH_STREAM_CONFIG["recognizer"],
+                        choices=sorted(RECOGNIZER_BACKENDS))
+    parser.add_argument('--realtime', action='store_true', help="Feed the file at real-time speed")
+    args = parser.parse_args()
+
+    transcriber = StreamingTranscriber(WavFileSource(args.wav, realtime=args.realtime),
+                                       get_recognizer_backend(args.recognizer)).start()
+    start = time.perf_counter()
+    for text in transcriber.iter_transcript():
+        print(f"[{time.perf_counter() - start:5.1f}s] {text}")
+
+    print(f"Stopped: {transcriber.stop_reason}; {len(transcriber.partials)} segments, "
+          f"{transcriber.ring.dropped} frames dropped")
+
+
+if __name__ == "__main__":
+    main()
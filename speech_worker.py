@@ -0,0 +1,193 @@
+import itertools
+import queue
+import threading
+import time
+from collections import deque
+from typing import Dict, List, Optional
+
+import pyttsx3
+
+from config import TTS_CONFIG
+
+# Lower numbers are spoken first; equal priorities keep their submission order
+PRIORITY_HIGH = 0
+PRIORITY_NORMAL = 5
+PRIORITY_LOW = 10
+
+
+def default_settings() -> Dict:
+    """The configured rate and volume with the engine's default voice"""
+    return {"voice": "default", "rate": TTS_CONFIG["rate"], "volume": TTS_CONFIG["volume"]}
+
+
+def configure_engine(engine) -> Dict:
+    """Apply the configured voice, rate and volume to an engine and return them"""
+    settings = default_settings()
+    voices = engine.getProperty('voices')
+    if voices:
+        for voice in voices:
+            if any(hint in voice.name.lower() for hint in TTS_CONFIG["voice_hints"]):
+                settings["voice"] = voice.id
+                engine.setProperty('voice', voice.id)
+                break
+
+    engine.setProperty('rate', settings["rate"])
+    engine.setProperty('volume', settings["volume"])
+    return settings
+
+
+class Utterance:
+    """One queued speech job: spoken aloud, or rendered to a file when path is set"""
+
+    def __init__(self, text: str, priority: int, path: Optional[str] = None):
+        self.text = text
+        self.priority = priority
+        self.path = path
+        self.status = "queued"
+        self.error = None
+        self.created_at = time.perf_counter()
+        self.started_at = None
+        self.finished_at = None
+        self._done = threading.Event()
+
+    @property
+    def cancelled(self) -> bool:
+        return self.status == "cancelled"
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """Block until the utterance finished, failed or was cancelled"""
+        return self._done.wait(timeout)
+
+    def done(self) -> bool:
+        return self._done.is_set()
+
+    def latency(self) -> Dict:
+        """Seconds spent queued, speaking, and in total"""
+        queued_until = self.started_at or self.finished_at
+        return {
+            "queued": None if queued_until is None else queued_until - self.created_at,
+            "speaking": None if self.started_at is None or self.finished_at is None
+                        else self.finished_at - self.started_at,
+            "total": None if self.finished_at is None else self.finished_at - self.created_at,
+        }
+
+    def _finish(self, status: str, error: Optional[Exception] = None):
+        if self.status not in ("queued", "speaking"):
+            return
+        self.status = status
+        self.error = error
+        self.finished_at = time.perf_counter()
+        self._done.set()
+
+
+class SpeechWorker:
+    """Process-wide text-to-speech worker
+
+    A single thread creates and owns the pyttsx3 engine, which is not thread
+    safe, and works through a priority queue of utterances. Queued
+    utterances can be cancelled, and the one being spoken can be interrupted.
+    Latency of every finished utterance is kept in latency_log.
+    """
+
+    def __init__(self, log_size: int = 200):
+        # Kept when no engine can be created, so settings always has every key
+        self.settings: Dict = default_settings()
+        self.engine = None
+        self.latency_log = deque(maxlen=log_size)
+        self.current: Optional[Utterance] = None
+        self._queue = queue.PriorityQueue()
+        self._counter = itertools.count()
+        self._lock = threading.Lock()
+        self._ready = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="speech-worker")
+        self._thread.daemon = True
+        self._thread.start()
+        self._ready.wait()
+
+    def _run(self):
+        try:
+            self.engine = pyttsx3.init()
+            self.settings = configure_engine(self.engine)
+            self.engine.connect('started-word', self._on_word)
+        except Exception as e:
+            print(f"Text-to-speech unavailable: {e}")
+            self.engine = None
+        self._ready.set()
+
+        while True:
+            _, _, utterance = self._queue.get()
+            with self._lock:
+                if utterance.status != "queued":
+                    continue
+                utterance.status = "speaking"
+                utterance.started_at = time.perf_counter()
+                self.current = utterance
+
+            try:
+                if self.engine is None:
+                    raise RuntimeError("no text-to-speech engine")
+                if utterance.path:
+                    self.engine.save_to_file(utterance.text, utterance.path)
+                else:
+                    self.engine.say(utterance.text)
+                self.engine.runAndWait()
+                utterance._finish("done")
+            except Exception as e:
+                utterance._finish("failed", e)
+            finally:
+                with self._lock:
+                    self.current = None
+
+            self.latency_log.append(dict(utterance.latency(), text=utterance.text[:60], status=utterance.status))
+
+    def _on_word(self, name, location, length):
+        # Runs on the worker thread inside runAndWait, the only safe place to stop the engine
+        current = self.current
+        if current is not None and current.cancelled:
+            self.engine.stop()
+
+    def _submit(self, utterance: Utterance) -> Utterance:
+        self._queue.put((utterance.priority, next(self._counter), utterance))
+        return utterance
+
+    def speak(self, text: str, priority: int = PRIORITY_NORMAL, interrupt: bool = False) -> Utterance:
+        """Queue text to be spoken; interrupt=True first cancels everything else"""
+        if interrupt:
+            self.cancel_all()
+        return self._submit(Utterance(text, priority))
+
+    def render_to_file(self, text: str, path: str, priority: int = PRIORITY_LOW) -> Utterance:
+        """Queue text to be synthesized into an audio file"""
+        return self._submit(Utterance(text, priority, path=path))
+
+    def cancel(self, utterance: Utterance):
+        """Cancel a queued utterance, or interrupt it if it is being spoken"""
+        with self._lock:
+            utterance._finish("cancelled")
+
+    def cancel_all(self, include_files: bool = False):
+        """Interrupt the current utterance and drop everything queued"""
+        with self._lock:
+            pending: List[Utterance] = [item[2] for item in list(self._queue.queue)]
+            if self.current is not None:
+                pending.append(self.current)
+            for utterance in pending:
+                if include_files or not utterance.path:
+                    utterance._finish("cancelled")
+
+    def is_busy(self) -> bool:
+        return self.current is not None or not self._queue.empty()
+
+
+_shared_worker = None
+_shared_worker_lock = threading.Lock()
+
+
+def get_speech_worker() -> SpeechWorker:
+    """Return the process-wide speech worker, starting it on first use"""
+    global _shared_worker
+    if _shared_worker is None:
+        with _shared_worker_lock:
+            if _shared_worker is None:
+                _shared_worker = SpeechWorker()
+    return _shared_worker
@@ -0,0 +1,52 @@
+#!/usr/bin/env python3
+"""
+Tests for splitting a streamed interviewer response into speakable sentences, and report cache keys
+"""
+
+import ai_services
+from ai_services import ReportCache, SentenceAccumulator
+
+
+def _feed_words(accumulator, text):
+    """Feed text a word at a time, the way tokens stream in"""
+    sentences = []
+    for word in text.split(" "):
+        sentences += accumulator.feed(word + " ")
+    return sentences
+
+
+def test_sentences_are_released_as_they_complete():
+    accumulator = SentenceAccumulator()
+    assert accumulator.feed("That is a great example") == []
+    assert accumulator.feed(". How did") == ["That is a great example."]
+    assert accumulator.feed(" the team react?\n") == ["How did the team react?"]
+
+
+def test_abbreviations_and_initials_do_not_end_a_sentence():
+    sentences = _feed_words(SentenceAccumulator(),
+                            "You worked with Dr. Smith on e.g. billing with J. R. Doe. Why that team? ")
+    assert sentences == ["You worked with Dr. Smith on e.g. billing with J. R. Doe.", "Why that team?"]
+
+
+def test_short_fragments_stay_with_the_next_sentence():
+    assert _feed_words(SentenceAccumulator(), "Great. Tell me more about that project. ") == [
+        "Great. Tell me more about that project."]
+
+
+def test_flush_returns_the_trailing_fragment_once():
+    accumulator = SentenceAccumulator()
+    assert _feed_words(accumulator, "Thanks for sharing that. What would you") == ["Thanks for sharing that."]
+    assert accumulator.flush() == "What would you"
+    assert accumulator.flush() is None
+
+
+def test_report_key_changes_with_model_and_prompt_version(monkeypatch):
+    scores = [{"scores": {"clarity": 7}, "overall_score": 7}]
+    key = ReportCache.key(scores, "Ada", "Engineer")
+    assert key == ReportCache.key([dict(scores[0])], "Ada", "Engineer")
+
+    monkeypatch.setattr(ai_services, "OPENAI_MODEL", "other-model")
+    assert ReportCache.key(scores, "Ada", "Engineer") != key
+    monkeypatch.undo()
+    monkeypatch.setattr(ai_services, "REPORT_PROMPT_VERSION", ai_services.REPORT_PROMPT_VERSION + 1)
+    assert ReportCache.key(scores, "Ada", "Engineer") != key
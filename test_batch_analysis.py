@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+"""
+Tests for the batch runner's consolidated summary and per-unit state
+"""
+
+import os
+
+import pandas as pd
+import pytest
+
+from batch_analysis import build_batch_summary, unit_output_dir
+from dataset_io import MANIFEST_NAME, verify_csv_files
+
+
+def _result(unit, employees, attrition, tenure, satisfaction, status='ok'):
+    return {'Unit': unit, 'Status': status, 'Error': '', 'OutputDir': unit, 'Seconds': 1.0,
+            'Total Employees': employees, 'Attrition Count': attrition,
+            'Average Tenure (Years)': tenure, 'Average Job Satisfaction': satisfaction}
+
+
+def test_all_units_row_is_weighted_by_headcount():
+    summary = build_batch_summary([
+        _result('Sales', 300, 60, 2.0, 2.0),
+        _result('Finance', 100, 5, 6.0, 4.0),
+        _result('Broken', 1000, 900, 30.0, 1.0, status='failed'),
+    ])
+
+    assert list(summary['Unit']) == ['Broken', 'Finance', 'Sales', 'ALL UNITS']
+    overall = summary.iloc[-1]
+    assert overall['Status'] == '2/3 ok'
+    assert overall['Total Employees'] == 400
+    assert overall['Attrition Count'] == 65
+    assert overall['Attrition Rate (%)'] == pytest.approx(16.2)
+    # 3:1 headcount weights, not the plain mean of the two units
+    assert overall['Average Tenure (Years)'] == pytest.approx(3.0)
+    assert overall['Average Job Satisfaction'] == pytest.approx(2.5)
+    assert overall['Seconds'] == 3.0
+
+
+def test_summary_without_completed_units_has_no_total_row():
+    summary = build_batch_summary([_result('Sales', 300, 60, 2.0, 2.0, status='failed')])
+    assert list(summary['Unit']) == ['Sales']
+
+
+def test_units_sharing_a_data_folder_keep_separate_manifests(tmp_path):
+    data = tmp_path / 'data'
+    data.mkdir()
+    pd.DataFrame({'EmployeeID': [1, 2], 'Attrition': ['Yes', 'No']}).to_csv(data / 'train.csv', index=False)
+
+    for unit in ('Sales EMEA', 'Finance'):
+        manifest_path = os.path.join(unit_output_dir(str(tmp_path / 'out'), unit), MANIFEST_NAME)
+        os.makedirs(os.path.dirname(manifest_path))
+        verify_csv_files([str(data / 'train.csv')], manifest_path=manifest_path)
+        assert os.path.exists(manifest_path)
+
+    assert not (data / MANIFEST_NAME).exists()
+    assert verify_csv_files([str(data / 'train.csv')],
+                            manifest_path=manifest_path)[str(data / 'train.csv')][1]
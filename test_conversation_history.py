@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+"""
+Tests for the token-budgeted conversation history and its background summary folds
+"""
+
+import asyncio
+import threading
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from conversation_history import ConversationHistory, count_message_tokens
+
+
+class FakeClient:
+    """Runs submitted coroutines on a background loop; each completion returns or raises the next reply"""
+
+    def __init__(self, replies):
+        self.replies = list(replies)
+        self.prompts = []
+        self.loop = asyncio.new_event_loop()
+        self.thread = threading.Thread(target=self.loop.run_forever, daemon=True)
+        self.thread.start()
+
+    def submit(self, coro):
+        return asyncio.run_coroutine_threadsafe(coro, self.loop)
+
+    async def chat_completion(self, **kwargs):
+        self.prompts.append(kwargs["messages"][0]["content"])
+        reply = self.replies.pop(0)
+        if isinstance(reply, Exception):
+            raise reply
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=reply))])
+
+    def close(self):
+        """Cancel retries still waiting on the loop, then stop it"""
+        async def cancel_pending():
+            for task in asyncio.all_tasks():
+                if task is not asyncio.current_task():
+                    task.cancel()
+
+        self.submit(cancel_pending()).result()
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self.thread.join()
+        self.loop.close()
+
+
+@pytest.fixture
+def client_factory():
+    clients = []
+
+    def make(*replies):
+        clients.append(FakeClient(replies))
+        return clients[-1]
+
+    yield make
+    for client in clients:
+        client.close()
+
+
+def _wait_for(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "timed out"
+        time.sleep(0.005)
+
+
+def _turn(i):
+    return f"answer {i} " + "detail " * 20, f"reply {i} " + "follow-up " * 20
+
+
+def test_older_turns_are_folded_into_the_summary(client_factory):
+    client = client_factory("Candidate covered turn 0.", "Candidate covered turns 0 and 1.")
+    history = ConversationHistory(client, config={"recent_turns": 2})
+    for i in range(4):
+        history.add_turn(*_turn(i))
+
+    _wait_for(lambda: len(history.turns) == 2)
+    messages = history.messages()
+    assert messages[0] == {"role": "system",
+                           "content": "Summary of the interview so far: Candidate covered turns 0 and 1."}
+    assert [m["content"] for m in messages[1::2]] == [_turn(2)[0], _turn(3)[0]]
+    # Each fold merges only turns beyond recent_turns into the summary so far
+    assert "answer 0" in client.prompts[0] and "answer 1" not in client.prompts[0]
+    assert "Candidate covered turn 0." in client.prompts[1] and "answer 1" in client.prompts[1]
+
+
+def test_messages_fit_the_budget_while_no_summary_exists(client_factory):
+    client = client_factory(*[RuntimeError("rate limited")] * 10)
+    budget = 200
+    history = ConversationHistory(client, config={"recent_turns": 1, "token_budget": budget,
+                                                  "summary_retry_seconds": 60})
+    for i in range(5):
+        history.add_turn(*_turn(i))
+
+    messages = history.messages()
+    assert count_message_tokens(messages) <= budget
+    # The newest turns are the ones kept
+    assert messages[-2]["content"] == _turn(4)[0]
+    assert all(m["role"] != "system" for m in messages)
+
+
+def test_failed_fold_is_retried_without_a_new_turn(client_factory):
+    client = client_factory(RuntimeError("timeout"), "Summary after retry.")
+    history = ConversationHistory(client, config={"recent_turns": 1, "summary_retry_seconds": 0.01})
+    history.add_turn(*_turn(0))
+    history.add_turn(*_turn(1))
+
+    _wait_for(lambda: history.summary == "Summary after retry.")
+    assert len(client.prompts) == 2
+    assert history.turns == [_turn(1)]
+
+
+def test_clear_discards_a_fold_in_progress(client_factory):
+    client = client_factory("stale summary")
+    history = ConversationHistory(client, config={"recent_turns": 1, "summary_retry_seconds": 0.01})
+    client.loop.call_soon_threadsafe(time.sleep, 0.1)  # hold the loop so the fold is still running
+    history.add_turn(*_turn(0))
+    history.add_turn(*_turn(1))
+    history.clear()
+
+    _wait_for(lambda: not client.replies)
+    time.sleep(0.02)
+    assert (history.summary, history.turns) == ("", [])
@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+Tests for chunk validation: rows failing the schema are quarantined with their reasons
+"""
+
+import io
+
+import pandas as pd
+import pytest
+
+from data_quality import DataQualityValidator
+
+SCHEMA = {
+    'EmployeeID': {'kind': 'text', 'required': True},
+    'Age': {'kind': 'numeric', 'min': 16, 'max': 100, 'required': True},
+    'YearsAtCompany': {'kind': 'numeric', 'min': 0, 'max': 60},
+    'OverTime': {'kind': 'category', 'allowed': ['Yes', 'No'], 'required': True},
+}
+
+CSV = """EmployeeID,Age,YearsAtCompany,OverTime
+E1,34,5,Yes
+E2,12,1,No
+E3,45,3,Maybe
+E4,abc,2,No
+E5,29,20,
+E6,30,35,Yes
+E7,51,7,No
+"""
+
+
+@pytest.fixture
+def validator(tmp_path):
+    cross_checks = [('YearsAtCompany <= Age', ('YearsAtCompany', 'Age'),
+                     lambda df: df['YearsAtCompany'] > df['Age'])]
+    return DataQualityValidator(SCHEMA, cross_checks, quarantine_path=str(tmp_path / 'quarantine.csv'))
+
+
+@pytest.mark.parametrize('categorical', [False, True], ids=['object', 'categorical'])
+def test_failing_rows_are_quarantined_with_reasons(validator, categorical):
+    dtypes = validator.parse_dtypes() if categorical else None
+    clean = validator.validate_chunk(pd.read_csv(io.StringIO(CSV), dtype=dtypes), source='Train')
+
+    assert list(clean['EmployeeID']) == ['E1', 'E7']
+    # Category columns are handed back as plain values whichever way they were parsed
+    assert list(clean['OverTime']) == ['Yes', 'No']
+    assert not isinstance(clean['OverTime'].dtype, pd.CategoricalDtype)
+
+    quarantined = pd.read_csv(validator.quarantine_path)
+    assert dict(zip(quarantined['EmployeeID'], quarantined['QuarantineReason'])) == {
+        'E2': 'Age >= 16',
+        'E3': 'OverTime in allowed values',
+        'E4': 'Age numeric',
+        'E5': 'OverTime not null',
+        'E6': 'YearsAtCompany <= Age',
+    }
+    assert set(quarantined['QuarantineSource']) == {'Train'}
+    assert (validator.rows_checked, validator.rows_quarantined) == (7, 5)
+
+
+def test_quarantine_file_is_replaced_per_run_and_appended_per_chunk(validator):
+    with open(validator.quarantine_path, 'w') as f:
+        f.write('stale,rows\n1,2\n')
+
+    for chunk in pd.read_csv(io.StringIO(CSV), chunksize=3):
+        validator.validate_chunk(chunk, source='Test')
+
+    quarantined = pd.read_csv(validator.quarantine_path)
+    assert list(quarantined['EmployeeID']) == ['E2', 'E3', 'E4', 'E5', 'E6']
+    assert 'stale' not in quarantined.columns
+
+
+def test_summary_counts_violations_and_skipped_columns(tmp_path):
+    validator = DataQualityValidator(dict(SCHEMA, Gender={'kind': 'category', 'max_null_rate': 0.05}),
+                                     cross_checks=[], quarantine_path=str(tmp_path / 'quarantine.csv'))
+    validator.validate_chunk(pd.read_csv(io.StringIO(CSV)))
+    summary = validator.summary().set_index('Check')
+
+    assert summary.loc['Age >= 16', 'Violations'] == 1
+    assert summary.loc['Age <= 100', 'Status'] == 'PASS'
+    assert summary.loc['OverTime in allowed values', 'Rate (%)'] == pytest.approx(100 / 7, abs=1e-3)
+    assert summary.loc['Gender present', 'Status'] == 'SKIPPED'
@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""
+Tests for reading the datasets straight out of zip and tar archives
+"""
+
+import tarfile
+import zipfile
+
+import pandas as pd
+import pytest
+
+from dataset_io import iter_csv_chunks, list_archive_members, verify_archive
+from hr_attrition_analysis import HRAttritionAnalyzer
+
+TRAIN = pd.DataFrame({'EmployeeID': range(7), 'Age': range(30, 37), 'Attrition': ['Yes', 'No'] * 3 + ['No']})
+TEST = pd.DataFrame({'EmployeeID': range(7, 10), 'Age': range(40, 43), 'Attrition': ['No', 'Yes', 'No']})
+
+
+@pytest.fixture(params=['zip', 'tar.gz'])
+def archive(request, tmp_path):
+    """An archive with train.csv at the top level and test.csv in a subfolder"""
+    (tmp_path / 'train.csv').write_text(TRAIN.to_csv(index=False))
+    (tmp_path / 'test.csv').write_text(TEST.to_csv(index=False))
+    path = tmp_path / f"dataset.{request.param}"
+    if request.param == 'zip':
+        with zipfile.ZipFile(path, 'w', zipfile.ZIP_DEFLATED) as zf:
+            zf.write(tmp_path / 'train.csv', 'train.csv')
+            zf.write(tmp_path / 'test.csv', 'extract/test.csv')
+    else:
+        with tarfile.open(path, 'w:gz') as tf:
+            tf.add(tmp_path / 'train.csv', 'train.csv')
+            tf.add(tmp_path / 'test.csv', 'extract/test.csv')
+    return str(path)
+
+
+def test_members_are_listed_with_their_sizes(archive, tmp_path):
+    members = list_archive_members(archive)
+    assert members == {'train.csv': (tmp_path / 'train.csv').stat().st_size,
+                       'extract/test.csv': (tmp_path / 'test.csv').stat().st_size}
+
+
+def test_members_stream_in_chunks_and_match_by_base_name(archive):
+    chunks = list(iter_csv_chunks('test.csv', archive_path=archive, chunksize=2))
+    assert [len(chunk) for chunk in chunks] == [2, 1]
+    pd.testing.assert_frame_equal(pd.concat(chunks, ignore_index=True), TEST)
+
+    with pytest.raises(KeyError):
+        list(iter_csv_chunks('missing.csv', archive_path=archive))
+
+
+def test_archive_verification_is_cached_until_it_changes(archive):
+    entry, cached = verify_archive(archive)
+    assert not cached and set(entry['members']) == {'train.csv', 'extract/test.csv'}
+    assert verify_archive(archive) == (entry, True)
+
+
+def test_analyzer_loads_both_files_from_the_archive(archive, tmp_path):
+    analyzer = HRAttritionAnalyzer(output_dir=str(tmp_path / 'out'))
+    assert analyzer.load_datasets(archive_path=archive, validate=False)
+    assert (analyzer.train_data.shape, analyzer.test_data.shape) == ((7, 4), (3, 4))
+    assert list(analyzer.dataset_manifest) == [archive]
+
+
+def test_unreadable_archive_is_reported_not_raised(tmp_path):
+    path = tmp_path / 'dataset.zip'
+    path.write_text('not an archive')
+    analyzer = HRAttritionAnalyzer(output_dir=str(tmp_path / 'out'))
+    assert not analyzer.load_datasets(archive_path=str(path), validate=False)
+    assert analyzer.dataset_manifest == {}
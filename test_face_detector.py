@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+"""
+Test that face tracking advances once per captured frame
+"""
+
+import numpy as np
+import pytest
+
+import shared_resources
+from config import FACE_TRACKING_CONFIG
+
+
+class BrightRegionCascade:
+    """Stand-in classifier that 'detects' the bounding box of bright pixels"""
+
+    def detectMultiScale(self, gray, *args, **kwargs):
+        ys, xs = np.nonzero(gray > 200)
+        if len(xs) == 0:
+            return ()
+        return np.array([[xs.min(), ys.min(), xs.max() - xs.min() + 1, ys.max() - ys.min() + 1]])
+
+
+@pytest.fixture
+def detector(monkeypatch):
+    """Tracking FaceDetector on the stand-in cascade; the shared entry is restored afterwards"""
+    monkeypatch.setitem(shared_resources._resources, 'face_cascade', BrightRegionCascade())
+    from video_recorder import FaceDetector
+
+    return FaceDetector(tracking=True)
+
+
+def test_track_expires_in_reused_buffer(detector):
+    """A face that left is dropped even when every frame arrives in the same pooled array"""
+    frame = np.full((480, 640, 3), 40, np.uint8)
+    frame[150:300, 100:220] = 255
+    seq = 0
+    for _ in range(3):
+        seq += 1
+        assert detector.analyze(frame, seq)["faces_detected"] == 1
+
+    # The face leaves; the pool refills the same array with identical empty frames
+    frame[:] = 0
+    counts = []
+    for _ in range(FACE_TRACKING_CONFIG["max_misses"] + 2):
+        seq += 1
+        counts.append(detector.analyze(frame, seq)["faces_detected"])
+    assert counts[-1] == 0, counts
+
+
+def test_same_capture_is_analyzed_once(detector):
+    """Drawing and analyzing one capture does not advance the tracker twice"""
+    frame = np.full((480, 640, 3), 40, np.uint8)
+    frame[150:300, 100:220] = 255
+    first = detector.analyze(frame, seq=1)
+    assert detector.analyze(frame, seq=1) is first
+    assert detector.stats["cache_hits"] == 1
+
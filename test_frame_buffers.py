@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+"""
+Tests for the reference-counted frame buffer pool
+"""
+
+import numpy as np
+
+from frame_buffers import FrameBufferPool
+
+SHAPE = (4, 6, 3)
+
+
+def test_released_buffers_are_reused_oldest_first():
+    pool = FrameBufferPool(SHAPE)
+    first, second = pool.acquire(), pool.acquire()
+    first.release()
+    second.release()
+
+    assert pool.acquire().array is first.array
+    assert pool.acquire().array is second.array
+    assert pool.stats() == {"buffers": 2, "free": 0, "allocations": 2, "reuses": 2, "overflows": 0}
+
+
+def test_buffer_returns_to_the_pool_after_its_last_holder_releases():
+    pool = FrameBufferPool(SHAPE)
+    buffer = pool.acquire()
+    buffer.array.flags.writeable = False  # a display holder froze it
+    buffer.retain()
+
+    buffer.release()
+    assert pool.stats()["free"] == 0
+    buffer.release()
+    assert pool.stats()["free"] == 1
+    assert pool.acquire().array.flags.writeable
+
+
+def test_acquire_past_max_buffers_hands_out_unpooled_arrays():
+    pool = FrameBufferPool(SHAPE, max_buffers=2)
+    buffers = [pool.acquire() for _ in range(3)]
+    assert [buffer.pool is pool for buffer in buffers] == [True, True, False]
+
+    for buffer in buffers:
+        buffer.release()
+    assert pool.stats() == {"buffers": 2, "free": 2, "allocations": 3, "reuses": 0, "overflows": 1}
+
+    adopted = pool.adopt(np.zeros(SHAPE, np.uint8))
+    assert adopted.pool is None
+    assert pool.stats()["overflows"] == 2
+
+
+def test_new_shape_drops_buffers_of_the_old_one():
+    pool = FrameBufferPool(SHAPE)
+    free, held = pool.acquire(), pool.acquire()
+    free.release()
+
+    resized = pool.acquire((8, 12, 3))
+    assert resized.array.shape == (8, 12, 3)
+    assert pool.stats()["buffers"] == 2  # the held old-shape buffer and the new one
+
+    held.release()
+    assert held.pool is None
+    assert pool.stats() == {"buffers": 1, "free": 0, "allocations": 3, "reuses": 0, "overflows": 0}
+    resized.release()
+    assert pool.acquire((8, 12, 3)).array is resized.array
@@ -0,0 +1,55 @@
+#!/usr/bin/env python3
+"""
+Tests for the compressed replay store: clearing between recordings
+"""
+
+import threading
+
+import frame_store
+from frame_buffers import FrameBufferPool
+from frame_store import CompressedFrameStore
+
+
+def _frame(pool, value, captured_at):
+    buffer = pool.acquire()
+    buffer.array[:] = value
+    buffer.captured_at = captured_at
+    return buffer
+
+
+def test_frames_queued_before_clear_are_not_stored(monkeypatch):
+    encoding = threading.Event()
+    resume = threading.Event()
+    imencode = frame_store.cv2.imencode
+
+    def slow_imencode(*args):
+        encoding.set()
+        resume.wait(2)
+        return imencode(*args)
+
+    monkeypatch.setattr(frame_store.cv2, "imencode", slow_imencode)
+    pool = FrameBufferPool((16, 16, 3))
+    store = CompressedFrameStore(budget_bytes=1 << 20, fps=10, image_format=".png")
+
+    # One frame of the old recording is being encoded while two more wait in the queue
+    for i, value in enumerate([10, 20, 30]):
+        buffer = _frame(pool, value, 100.0 + i)
+        store.add(buffer)
+        buffer.release()
+        if i == 0:
+            assert encoding.wait(2)
+
+    store.clear()
+    assert pool.stats()["free"] == 2  # the queued frames went straight back to the pool
+
+    buffer = _frame(pool, 200, 500.0)
+    store.add(buffer)
+    buffer.release()
+    resume.set()
+    store.close()
+
+    assert store.frame_count == 1
+    assert store.time_range() == (0.0, 0.0)
+    assert int(store.frame_at(0.0)[0, 0, 0]) == 200
+    assert pool.stats()["free"] == pool.stats()["buffers"]
+
@@ -12,14 +12,62 @@ def test_imports():
         from config import INTERVIEW_ROLES, AI_PERSONALITIES, SCORING_CRITERIA
         print(f"✅ Config loaded: {len(INTERVIEW_ROLES)} roles, {len(AI_PERSONALITIES)} personalities")
         
+        # Test shared OpenAI client layer
+        from openai_client import SharedOpenAIClient, get_openai_client
+        print("✅ Shared OpenAI client imported successfully")
+        
+        # Test response cache
+        from response_cache import ResponseCache, get_response_cache
+        print("✅ Response cache imported successfully")
+        
+        # Test conversation history
+        from conversation_history import ConversationHistory, count_tokens
+        print("✅ Conversation history imported successfully")
+        
+        # Test shared resources
+        from shared_resources import get_shared, get_face_cascade, get_noise_profile
+        print("✅ Shared resources imported successfully")
+        
+        # Test speech worker
+        from speech_worker import SpeechWorker, get_speech_worker
+        print("✅ Speech worker imported successfully")
+        
+        # Test TTS cache
+        from tts_cache import TTSCache, prebuild_in_background
+        print("✅ TTS cache imported successfully")
+        
+        # Test streaming speech capture
+        from speech_stream import StreamingTranscriber, WavFileSource, get_recognizer_backend
+        print("✅ Streaming speech capture imported successfully")
+        
         # Test AI services (without actual API calls)
         from ai_services import AIInterviewer, SpeechProcessor, AnswerScorer
         print("✅ AI services imported successfully")
         
+        # Test frame buffer pool
+        from frame_buffers import FrameBuffer, FrameBufferPool
+        print("✅ Frame buffer pool imported successfully")
+        
+        # Test compressed replay store
+        from frame_store import CompressedFrameStore
+        print("✅ Replay frame store imported successfully")
+        
         # Test video recorder
         from video_recorder import VideoRecorder, FaceDetector
         print("✅ Video recording components imported successfully")
         
+        # Test WebRTC media pipeline (streamlit-webrtc itself is optional)
+        from media_pipeline import MediaPipeline, WEBRTC_AVAILABLE
+        print(f"✅ Media pipeline imported successfully (WebRTC {'available' if WEBRTC_AVAILABLE else 'not installed'})")
+        
+        # Test face timeline
+        from face_timeline import FaceTimeline, FaceAnalysisWorker
+        print("✅ Face timeline imported successfully")
+        
+        # Test recording post-processing
+        from postprocess import PostProcessor
+        print("✅ Recording post-processing imported successfully")
+        
         return True
     except ImportError as e:
         print(f"❌ Import error: {e}")
@@ -0,0 +1,50 @@
+#!/usr/bin/env python3
+"""
+Test that partition digests are stable from one process to the next
+"""
+
+import json
+import os
+import subprocess
+import sys
+import tempfile
+
+# Runs in a fresh interpreter: combine a train/test pair and write its partitions
+WRITE_SCRIPT = """
+import json, sys
+import pandas as pd
+from hr_attrition_analysis import HRAttritionAnalyzer
+from powerbi_partitions import write_partitions
+
+analyzer = HRAttritionAnalyzer(output_dir=sys.argv[1])
+columns = ['EmployeeID', 'Department', 'HireYear', 'Age', 'Salary', 'Attrition', 'OnlyInTrain']
+rows = [[i, ['Sales', 'Engineering', 'HR'][i % 3], 2018 + i % 4, 25 + i % 30,
+         40000 + 1000 * i, ['Yes', 'No'][i % 2], i] for i in range(60)]
+analyzer.train_data = pd.DataFrame(rows[:40], columns=columns)
+analyzer.test_data = pd.DataFrame(rows[40:], columns=columns).drop(columns='OnlyInTrain')
+analyzer.combine_datasets()
+result = write_partitions(analyzer.combined_data, root=sys.argv[1])
+print(json.dumps({key: len(value) for key, value in result.items()}))
+"""
+
+
+def _write_partitions(root, hash_seed):
+    env = dict(os.environ, PYTHONHASHSEED=str(hash_seed))
+    output = subprocess.run([sys.executable, '-c', WRITE_SCRIPT, root], env=env, check=True,
+                            capture_output=True, text=True,
+                            cwd=os.path.dirname(os.path.abspath(__file__))).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def test_partitions_unchanged_across_processes():
+    """A second run over the same data in a new process rewrites nothing"""
+    with tempfile.TemporaryDirectory() as root:
+        first = _write_partitions(root, hash_seed=1)
+        second = _write_partitions(root, hash_seed=2)
+    assert first['written'] > 0
+    assert second == {'written': 0, 'unchanged': first['written'], 'removed': 0}
+
+
+if __name__ == "__main__":
+    test_partitions_unchanged_across_processes()
+    print("✅ Partition digests are stable across processes")
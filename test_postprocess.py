@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""
+Tests for recording post-processing: chunk planning, frame timing, resume and failure handling
+"""
+
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import cv2
+import numpy as np
+import pytest
+
+import postprocess
+import video_recorder
+from frame_buffers import FrameBuffer
+from postprocess import PostProcessor, frame_capture_times, plan_chunks
+from video_recorder import VideoRecorder
+
+FPS = 10
+
+
+def _write_segment(path, frames):
+    writer = cv2.VideoWriter(str(path), cv2.VideoWriter_fourcc(*"mp4v"), FPS, (32, 24))
+    for value in range(frames):
+        writer.write(np.full((24, 32, 3), value, np.uint8))
+    writer.release()
+
+
+@pytest.fixture
+def recording(tmp_path, monkeypatch):
+    """A 3.5 s recording in two segments of 25 and 10 frames, planned in 1 s chunks"""
+    monkeypatch.setitem(postprocess.POSTPROCESS_CONFIG, "chunk_seconds", 1)
+    _write_segment(tmp_path / "interview_000.mp4", 25)
+    _write_segment(tmp_path / "interview_001.mp4", 10)
+    manifest_path = tmp_path / "interview.json"
+    manifest_path.write_text(json.dumps({"fps": FPS, "segments": ["interview_000.mp4", "interview_001.mp4"]}))
+    return str(manifest_path)
+
+
+def test_chunks_follow_segments_in_playback_order(recording):
+    _, tasks = plan_chunks(recording)
+    assert [(os.path.basename(task["segment"]), task["start"], task["end"], task["offset"]) for task in tasks] == [
+        ("interview_000.mp4", 0, 10, 0), ("interview_000.mp4", 10, 20, 0), ("interview_000.mp4", 20, 25, 0),
+        ("interview_001.mp4", 0, 10, 25),
+    ]
+    assert [os.path.basename(task["part_path"]) for task in tasks] == [f"part_000{i}.json" for i in range(4)]
+    assert all(task["times"] is None for task in tasks)
+
+
+def test_frame_times_follow_the_recorders_slot_placement(tmp_path, monkeypatch):
+    monkeypatch.setitem(video_recorder.VIDEO_CONFIG, "fps", FPS)
+    monkeypatch.setitem(video_recorder.RECORDING_CONFIG, "max_fill_seconds", 1.0)
+    recorder = VideoRecorder(source="webrtc")
+    written = []
+    monkeypatch.setattr(recorder, "_write_frame", lambda frame, frames_per_segment: written.append(int(frame[0, 0, 0])))
+    # A repeat, a skipped frame and two stalls long enough to be cut
+    captures = [0.0, 0.1, 0.3, 0.34, 0.4, 5.4, 5.5, 9.0, 9.1]
+    for value, captured_at in enumerate(captures):
+        buffer = FrameBuffer(np.full((2, 2, 3), value, np.uint8), None)
+        buffer.captured_at = 100.0 + captured_at
+        recorder.encode_queue.put(buffer)
+    recorder.encode_queue.put(None)
+    recorder._encode_frames()
+    if recorder.replay is not None:
+        recorder.replay.close()
+    assert len(recorder.gaps) == 2
+
+    np.save(tmp_path / "interview_timestamps.npy", np.asarray(recorder.frame_times))
+    manifest = {"fps": FPS, "gaps": recorder.gaps, "timestamps": "interview_timestamps.npy"}
+    times = frame_capture_times(str(tmp_path / "interview.json"), manifest)
+    assert times.tolist() == pytest.approx([captures[value] for value in written])
+
+
+def test_missing_timestamps_fall_back_to_frame_position(tmp_path):
+    assert frame_capture_times(str(tmp_path / "interview.json"), {"fps": FPS}) is None
+    assert frame_capture_times(str(tmp_path / "interview.json"), {"fps": FPS, "timestamps": "missing.npy"}) is None
+
+
+def _fake_chunk(task, ran):
+    ran.append(task["id"])
+    part = {"id": task["id"], "frames": task["end"] - task["start"], "frame_size": (32, 24),
+            "samples": [], "thumbnails": [], "archive_part": None, "archive_fps": FPS, "elapsed_s": 0.01}
+    postprocess._write_json(task["part_path"], part)
+    return part
+
+
+def test_resume_runs_only_the_missing_chunks(recording, tmp_path, monkeypatch):
+    ran = []
+    monkeypatch.setattr(postprocess, "process_chunk", lambda task: _fake_chunk(task, ran))
+    _, tasks = plan_chunks(recording)
+    os.makedirs(tasks[0]["output_dir"])
+    _fake_chunk(tasks[1], [])
+
+    with ThreadPoolExecutor(2) as executor:
+        results = PostProcessor(str(tmp_path), workers=2).process(recording, executor)
+
+    assert sorted(ran) == [0, 2, 3]
+    assert results["frames"] == 35
+    assert results["throughput"]["frames_this_run"] == 25
+    assert os.path.exists(os.path.join(tasks[0]["output_dir"], "results.json"))
+
+
+def test_invalid_manifests_are_set_aside(tmp_path):
+    (tmp_path / "broken.json").write_text("{not json")
+    (tmp_path / "settings.json").write_text(json.dumps({"theme": "dark"}))
+    PostProcessor(str(tmp_path), workers=1).run()
+    assert sorted(os.listdir(tmp_path)) == ["broken.json.invalid", "settings.json.invalid"]
+
+
+def test_failed_recordings_back_off_and_are_given_up(recording, tmp_path, monkeypatch):
+    monkeypatch.setitem(postprocess.POSTPROCESS_CONFIG, "max_attempts", 2)
+    attempts = []
+
+    def fail(manifest_path, executor):
+        attempts.append(manifest_path)
+        raise RuntimeError("decoder crashed")
+
+    processor = PostProcessor(str(tmp_path), workers=1)
+    monkeypatch.setattr(processor, "process", fail)
+    processor.run()
+    processor.run()
+    assert len(attempts) == 1  # the retry is not due yet
+
+    processor.failures[recording] = (1, 0)
+    processor.run()
+    processor.run()
+    assert len(attempts) == 2
+    assert processor.failures[recording] == (2, float("inf"))
+    assert processor.pending() == []
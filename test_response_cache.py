@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Tests for the two-tier response cache
+"""
+
+import asyncio
+import threading
+
+import pytest
+
+import response_cache
+from response_cache import ResponseCache
+
+
+@pytest.fixture
+def cache_path(tmp_path):
+    return str(tmp_path / "responses.sqlite3")
+
+
+def _cache(path, **config):
+    return ResponseCache(dict({"path": path, "memory_entries": 8, "max_entries": 100, "ttl_seconds": 60}, **config))
+
+
+def test_key_ignores_case_whitespace_and_trailing_punctuation():
+    key = ResponseCache.make_key("score", "model", 1, "Engineer", "Why?", "I like  Python.")
+    assert key == ResponseCache.make_key("score", "model", 1, "Engineer", " Why? ", "i like python")
+    assert key != ResponseCache.make_key("score", "model", 2, "Engineer", "Why?", "I like Python")
+    assert key != ResponseCache.make_key("score", "other", 1, "Engineer", "Why?", "I like Python")
+
+
+def test_disk_entries_expire_after_ttl(cache_path, monkeypatch):
+    _cache(cache_path).put("key", {"score": 7})
+    assert _cache(cache_path).get("key") == {"score": 7}
+
+    now = response_cache.time.time()
+    monkeypatch.setattr(response_cache.time, "time", lambda: now + 61)
+    assert _cache(cache_path).get("key") is None
+
+
+def test_memory_tier_evicts_least_recently_used():
+    cache = ResponseCache({"path": None, "memory_entries": 2})
+    cache.put("a", 1)
+    cache.put("b", 2)
+    cache.get("a")
+    cache.put("c", 3)
+    assert list(cache.memory) == ["a", "c"]
+    assert cache.get("b") is None
+
+
+def test_disk_tier_evicts_oldest_accessed_above_max_entries(cache_path):
+    cache = _cache(cache_path, max_entries=2)
+    for key in "abc":
+        cache.put(key, key)
+    reopened = _cache(cache_path)
+    assert [reopened.get(key) for key in "abc"] == [None, "b", "c"]
+    assert cache.stats()["evictions"] == 1
+
+
+def test_stats_count_hits_per_tier(cache_path):
+    _cache(cache_path).put("key", "value")
+    cache = _cache(cache_path)
+    cache.get("key")
+    cache.get("key")
+    cache.get("missing")
+    stats = cache.stats()
+    assert (stats["disk_hits"], stats["memory_hits"], stats["misses"]) == (1, 1, 1)
+    assert stats["hit_rate"] == pytest.approx(2 / 3)
+    assert stats["disk_entries"] == 1
+
+
+def test_returned_values_are_copies():
+    cache = ResponseCache({"path": None})
+    score = {"scores": {"depth": 5}}
+    cache.put("key", score)
+    score["scores"]["depth"] = 1
+    cache.get("key")["scores"]["depth"] = 9
+    assert cache.get("key") == {"scores": {"depth": 5}}
+
+
+def test_async_access_runs_off_the_event_loop_thread(cache_path, monkeypatch):
+    cache = _cache(cache_path)
+    threads = []
+    get = cache.get
+    monkeypatch.setattr(cache, "get", lambda key: threads.append(threading.current_thread()) or get(key))
+
+    async def round_trip():
+        await cache.put_async("key", {"score": 3}, kind="score")
+        return await cache.get_async("key")
+
+    assert asyncio.run(round_trip()) == {"score": 3}
+    assert threads and threads[0] is not threading.current_thread()
@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+Tests for streaming speech capture: conversion, VAD, segmentation and WAV input
+"""
+
+import wave
+
+import numpy as np
+
+from speech_stream import (EnergyVAD, FrameRingBuffer, StreamingTranscriber, UtteranceSegmenter,
+                           WavFileSource, _resample, _to_mono_int16)
+
+SAMPLE_RATE = 16000
+FRAME_MS = 30
+FRAME_SAMPLES = SAMPLE_RATE * FRAME_MS // 1000
+
+
+class FakeBackend:
+    """Recognizer backend that names segments in order and keeps their lengths"""
+
+    def __init__(self):
+        self.durations = []
+
+    def transcribe(self, pcm, sample_rate, sample_width=2):
+        self.durations.append(len(pcm) / sample_width / sample_rate)
+        return f"segment{len(self.durations)}"
+
+
+def _tone(seconds, amplitude=3000, frequency=220):
+    t = np.arange(int(seconds * SAMPLE_RATE)) / SAMPLE_RATE
+    return amplitude * np.sin(2 * np.pi * frequency * t)
+
+
+def _frame(amplitude):
+    return np.full(FRAME_SAMPLES, amplitude, np.int16).tobytes()
+
+
+def _write_wav(path, utterances, speech_s=1.0, pause_s=1.5):
+    samples = np.concatenate([np.zeros(int(0.5 * SAMPLE_RATE))] +
+                             [part for _ in range(utterances)
+                              for part in (_tone(speech_s), np.zeros(int(pause_s * SAMPLE_RATE)))])
+    with wave.open(str(path), 'wb') as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(SAMPLE_RATE)
+        wav.writeframes(samples.astype(np.int16).tobytes())
+
+
+def test_to_mono_int16_converts_width_and_channels():
+    stereo = np.array([[1000, 3000], [-2000, -4000]], np.int16)
+    assert np.frombuffer(_to_mono_int16(stereo.tobytes(), 2, 2), np.int16).tolist() == [2000, -3000]
+
+    unsigned = np.array([128, 255, 0], np.uint8)
+    assert np.frombuffer(_to_mono_int16(unsigned.tobytes(), 1, 1), np.int16).tolist() == [0, 127 << 8, -32768]
+
+    wide = np.array([1 << 24, -(1 << 24)], np.int32)
+    assert np.frombuffer(_to_mono_int16(wide.tobytes(), 1, 4), np.int16).tolist() == [256, -256]
+
+
+def test_resample_averages_whole_factors_and_interpolates_others():
+    assert _resample(np.arange(6, dtype=np.float32), 48000, 16000).tolist() == [1.0, 4.0]
+    assert len(_resample(np.zeros(441), 44100, 16000)) == 160
+
+
+def test_energy_vad_threshold_and_calibration():
+    vad = EnergyVAD(threshold=500)
+    assert not vad.is_speech(_frame(400), SAMPLE_RATE)
+    assert vad.is_speech(_frame(600), SAMPLE_RATE)
+
+    calibrating = EnergyVAD(threshold=None, calibration_s=0.09)
+    for _ in range(3):
+        assert not calibrating.is_speech(_frame(200), SAMPLE_RATE)
+    assert calibrating.threshold == 300
+    assert calibrating.is_speech(_frame(400), SAMPLE_RATE)
+
+
+def test_segmenter_keeps_preroll_and_ends_after_hangover():
+    segmenter = UtteranceSegmenter(EnergyVAD(500), SAMPLE_RATE, FRAME_MS, preroll_ms=90,
+                                   hangover_ms=150, min_speech_ms=60)
+    frames = [_frame(0)] * 5 + [_frame(1000)] * 10 + [_frame(0)] * 10
+    segments = [segment for segment in map(segmenter.process, frames) if segment]
+    assert len(segments) == 1
+    # Three frames of preroll (two of them voiced), the rest of the speech, five frames of hangover
+    assert len(segments[0]) == (1 + 10 + 5) * FRAME_SAMPLES * 2
+    assert segmenter.flush() is None
+
+
+def test_ring_buffer_lossless_mode_blocks_instead_of_dropping():
+    ring = FrameRingBuffer(2, lossless=True)
+    ring.put(b'a')
+    ring.put(b'b')
+    ring.close()
+    ring.put(b'c')  # a closed ring no longer blocks the producer
+    assert (ring.get(), ring.get(), ring.get(), ring.dropped) == (b'a', b'b', None, 0)
+
+
+def test_wav_file_is_transcribed_without_dropping_frames(tmp_path):
+    path = tmp_path / "answer.wav"
+    _write_wav(path, utterances=15)
+    backend = FakeBackend()
+
+    transcriber = StreamingTranscriber(WavFileSource(str(path)), backend, EnergyVAD(500)).start()
+    transcriber.wait(timeout=30)
+
+    assert transcriber.ring.dropped == 0
+    assert transcriber.stop_reason == "end of audio"
+    assert len(transcriber.partials) == 15
+    assert all(duration >= 1.0 for duration in backend.durations)
@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+"""
+Tests for the speech worker's priority queue, cancellation and interruption
+"""
+
+import threading
+import time
+
+import pytest
+
+import speech_worker
+from speech_worker import PRIORITY_HIGH, PRIORITY_LOW, PRIORITY_NORMAL, SpeechWorker
+
+
+class FakeEngine:
+    """pyttsx3 stand-in that 'speaks' a word every few milliseconds until stopped"""
+
+    def __init__(self, words=5):
+        self.words = words
+        self.spoken = []
+        self.saved = []
+        self.gate = threading.Event()
+        self.gate.set()
+        self.speaking = threading.Event()
+        self._on_word = None
+        self._stopped = False
+        self._text = None
+
+    def getProperty(self, name):
+        return []
+
+    def setProperty(self, name, value):
+        pass
+
+    def connect(self, topic, callback):
+        self._on_word = callback
+
+    def say(self, text):
+        self._text = text
+
+    def save_to_file(self, text, path):
+        self.saved.append(path)
+        self._text = None
+
+    def stop(self):
+        self._stopped = True
+
+    def runAndWait(self):
+        if self._text is None:
+            return
+        self.spoken.append(self._text)
+        self.speaking.set()
+        self.gate.wait()
+        for location in range(self.words):
+            self._on_word(None, location, 1)
+            if self._stopped:
+                break
+            time.sleep(0.005)
+        self._stopped = False
+        self._text = None
+
+
+@pytest.fixture
+def engine(monkeypatch):
+    engine = FakeEngine()
+    monkeypatch.setattr(speech_worker.pyttsx3, "init", lambda: engine)
+    return engine
+
+
+def _hold_first_utterance(worker, engine):
+    """Keep the worker busy speaking one utterance until the gate opens"""
+    engine.gate.clear()
+    blocker = worker.speak("blocker")
+    assert engine.speaking.wait(2)
+    return blocker
+
+
+def test_utterances_are_spoken_by_priority_then_submission_order(engine):
+    worker = SpeechWorker()
+    _hold_first_utterance(worker, engine)
+    utterances = [worker.speak("low", PRIORITY_LOW), worker.speak("normal 1", PRIORITY_NORMAL),
+                  worker.speak("high", PRIORITY_HIGH), worker.speak("normal 2", PRIORITY_NORMAL)]
+    engine.gate.set()
+
+    assert all(utterance.wait(2) for utterance in utterances)
+    assert engine.spoken == ["blocker", "high", "normal 1", "normal 2", "low"]
+    assert [entry["status"] for entry in worker.latency_log] == ["done"] * 5
+
+
+def test_cancelled_queued_utterance_is_never_spoken(engine):
+    worker = SpeechWorker()
+    _hold_first_utterance(worker, engine)
+    dropped = worker.speak("dropped")
+    kept = worker.speak("kept")
+    worker.cancel(dropped)
+
+    assert dropped.wait(0) and dropped.cancelled
+    engine.gate.set()
+    assert kept.wait(2)
+    assert engine.spoken == ["blocker", "kept"]
+
+
+def test_cancel_interrupts_the_utterance_being_spoken(engine):
+    engine.words = 1000
+    worker = SpeechWorker()
+    long = worker.speak("a very long answer")
+    assert engine.speaking.wait(2)
+    worker.cancel(long)
+
+    assert long.wait(2) and long.cancelled
+    # Left running, the long utterance would hold the worker for five seconds
+    engine.words = 3
+    after = worker.speak("next")
+    assert after.wait(2) and after.status == "done"
+
+
+def test_interrupt_drops_queued_speech_but_not_file_renders(engine, tmp_path):
+    worker = SpeechWorker()
+    blocker = _hold_first_utterance(worker, engine)
+    queued = worker.speak("queued")
+    render = worker.render_to_file("cached question", str(tmp_path / "question.wav"))
+    urgent = worker.speak("urgent", interrupt=True)
+    engine.gate.set()
+
+    assert urgent.wait(2) and render.wait(2)
+    assert blocker.cancelled and queued.cancelled and render.status == "done"
+    assert engine.saved == [str(tmp_path / "question.wav")]
+
+
+def test_without_an_engine_utterances_fail_instead_of_hanging(monkeypatch):
+    def unavailable():
+        raise OSError("no audio device")
+
+    monkeypatch.setattr(speech_worker.pyttsx3, "init", unavailable)
+    worker = SpeechWorker()
+    utterance = worker.speak("hello")
+
+    assert utterance.wait(2) and utterance.status == "failed"
+    assert set(worker.settings) == {"voice", "rate", "volume"}
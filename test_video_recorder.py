@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+Tests for the recorder's constant-frame-rate encoder: slot placement, repeats, skips and gaps
+"""
+
+import numpy as np
+import pytest
+
+import video_recorder
+from frame_buffers import FrameBuffer
+from video_recorder import VideoRecorder
+
+
+@pytest.fixture
+def recorder(monkeypatch):
+    """A recorder at 10 fps whose writer just collects the value of each written frame"""
+    monkeypatch.setitem(video_recorder.VIDEO_CONFIG, "fps", 10)
+    monkeypatch.setitem(video_recorder.RECORDING_CONFIG, "max_fill_seconds", 1.0)
+    recorder = VideoRecorder(source="webrtc")
+    recorder.written = []
+    monkeypatch.setattr(recorder, "_write_frame",
+                        lambda frame, frames_per_segment: recorder.written.append(int(frame[0, 0, 0])))
+    yield recorder
+    if recorder.replay is not None:
+        recorder.replay.close()
+
+
+def _encode(recorder, capture_times):
+    """Run the encoder over frames captured at the given times; frame i has pixel value i"""
+    for value, captured_at in enumerate(capture_times):
+        buffer = FrameBuffer(np.full((2, 2, 3), value, np.uint8), None)
+        buffer.captured_at = 100.0 + captured_at
+        recorder.encode_queue.put(buffer)
+    recorder.encode_queue.put(None)
+    recorder._encode_frames()
+
+
+def test_frames_are_placed_in_the_nearest_slot(recorder):
+    _encode(recorder, [0.0, 0.1, 0.3, 0.34, 0.4])
+    # Slot 2 repeats frame 1; frame 3 lands in slot 3, which frame 2 already filled
+    assert recorder.written == [0, 1, 1, 2, 4]
+    assert (recorder.frames_duplicated, recorder.frames_skipped) == (1, 1)
+    assert list(recorder.frame_times) == pytest.approx([0.0, 0.1, 0.3, 0.4])
+    assert recorder.gaps == []
+
+
+def test_long_stall_is_filled_for_at_most_max_fill_seconds(recorder):
+    _encode(recorder, [0.0, 0.1, 5.1, 5.2])
+    assert recorder.written == [0] + [1] * 11 + [2, 3]
+    assert recorder.frames_duplicated == 10
+    assert recorder.gaps == [{"t": 1.2, "seconds": 3.9}]
+
+
+def test_measured_fps_counts_skipped_frames(recorder):
+    _encode(recorder, [i * 0.05 for i in range(41)])
+    assert recorder.frames_skipped == 20
+    assert recorder.measured_fps() == 20
+
+
+def test_measured_fps_excludes_gaps(recorder):
+    _encode(recorder, [0.0, 0.1, 0.2, 10.2, 10.3])
+    # Of the 10 s between frames, one interval and one second of repeats stay in the file
+    assert recorder.gaps == [{"t": 1.3, "seconds": 8.9}]
+    assert recorder.measured_fps() == round(4 / 1.4, 2)
+
+
+def test_encoder_errors_are_counted_separately_from_capture_drops(recorder, monkeypatch):
+    def fail(frame, frames_per_segment):
+        raise RuntimeError("disk full")
+
+    monkeypatch.setattr(recorder, "_write_frame", fail)
+    _encode(recorder, [0.0, 0.1])
+    assert (recorder.frames_failed, recorder.frames_dropped) == (2, 0)
+    assert recorder.recording_stats()["failed"] == 2
+
+
+def test_start_recording_twice_keeps_one_encoder(recorder, tmp_path):
+    assert recorder.start_recording(str(tmp_path / "first.mp4"))
+    encoder = recorder.encoder_thread
+    assert recorder.start_recording(str(tmp_path / "second.mp4"))
+    assert recorder.encoder_thread is encoder
+    assert recorder.output_base == str(tmp_path / "first")
+    recorder.stop_recording()
+    assert not encoder.is_alive()
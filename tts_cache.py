@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+Pre-synthesized TTS audio cache.
+
+Every configured interview question is rendered once per voice/rate to a
+WAV file named by a hash of the text and voice settings, so asking a
+question plays the cached file immediately instead of synthesizing it on
+each click. Text that is not in the cache (dynamic follow-ups) is
+synthesized on demand and then kept for next time.
+
+Build the cache ahead of time with:
+    python tts_cache.py
+"""
+
+import hashlib
+import os
+import threading
+from typing import Iterable, Optional
+
+from config import INTERVIEW_ROLES, TTS_CONFIG
+from speech_worker import PRIORITY_HIGH, PRIORITY_LOW, SpeechWorker, get_speech_worker
+
+class TTSCache:
+    """Directory of synthesized utterances keyed by text and voice settings"""
+
+    def __init__(self, worker: Optional[SpeechWorker] = None, cache_dir: str = None):
+        self.cache_dir = cache_dir or TTS_CONFIG["cache_dir"]
+        self.worker = worker or get_speech_worker()
+        self.settings = self.worker.settings
+        self.hits = 0
+        self.misses = 0
+
+    def key(self, text: str) -> str:
+        payload = "\x1f".join([text.strip(), self.settings["voice"],
+                               str(self.settings["rate"]), str(self.settings["volume"])])
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def path_for(self, text: str) -> str:
+        return os.path.join(self.cache_dir, f"{self.key(text)}.wav")
+
+    def get(self, text: str) -> Optional[str]:
+        """Return the cached audio file for text, or None"""
+        path = self.path_for(text)
+        if os.path.exists(path) and os.path.getsize(path) > 0:
+            self.hits += 1
+            return path
+        self.misses += 1
+        return None
+
+    def synthesize(self, text: str, priority: int = PRIORITY_HIGH) -> Optional[str]:
+        """Render text to the cache on the speech worker and return the audio file path"""
+        if self.worker.engine is None:
+            return None
+        path = self.path_for(text)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp.wav"
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            utterance = self.worker.render_to_file(text, tmp_path, priority=priority)
+            utterance.wait()
+            if utterance.error:
+                raise utterance.error
+            if not os.path.exists(tmp_path) or os.path.getsize(tmp_path) == 0:
+                raise RuntimeError("engine produced no audio")
+            os.replace(tmp_path, path)
+            return path
+        except Exception as e:
+            print(f"TTS synthesis failed: {e}")
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            return None
+
+    def get_or_synthesize(self, text: str) -> Optional[str]:
+        """Cached audio for text, synthesizing and caching it on a miss"""
+        return self.get(text) or self.synthesize(text)
+
+    def prebuild(self, texts: Iterable[str]) -> int:
+        """Synthesize every text that is not cached yet; returns how many were rendered"""
+        rendered = 0
+        for text in dict.fromkeys(texts):
+            if not os.path.exists(self.path_for(text)) and self.synthesize(text, priority=PRIORITY_LOW):
+                rendered += 1
+        return rendered
+
+
+def question_bank() -> list:
+    """Every question configured in INTERVIEW_ROLES"""
+    return [question for role in INTERVIEW_ROLES.values() for question in role["questions"]]
+
+
+def prebuild_in_background(cache: TTSCache) -> threading.Thread:
+    """Render the question bank on a daemon thread"""
+    thread = threading.Thread(target=cache.prebuild, args=(question_bank(),), name="tts-prebuild")
+    thread.daemon = True
+    thread.start()
+    return thread
+
+
+def main():
+    cache = TTSCache()
+    questions = question_bank()
+    print(f"🔊 Rendering {len(questions)} questions to {cache.cache_dir} (voice: {cache.settings['voice']})...")
+    rendered = cache.prebuild(questions)
+    print(f"✅ {rendered} rendered, {len(questions) - rendered} already cached")
+
+
+if __name__ == "__main__":
+    main()
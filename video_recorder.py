@@ -1,19 +1,67 @@
 import cv2
+import json
 import streamlit as st
 import numpy as np
+import os
+import shutil
 import time
 import threading
-from typing import Optional
+from typing import List, Optional, Tuple
 import queue
-from config import VIDEO_CONFIG
+from array import array
+from collections import deque
+from contextlib import contextmanager
+from config import VIDEO_CONFIG, RECORDING_CONFIG, FACE_TRACKING_CONFIG, REPLAY_CONFIG
+from frame_buffers import FrameBuffer, FrameBufferPool
+from frame_store import CompressedFrameStore
+from shared_resources import get_face_cascade
 
 class VideoRecorder:
-    def __init__(self):
+    def __init__(self, source: str = "camera"):
+        # "camera" reads the server's camera in a capture loop; "webrtc" gets
+        # the browser's frames through push_frame()
+        self.source = source
         self.cap = None
         self.is_recording = False
-        self.frames = []
-        self.recording_thread = None
-        self.frame_queue = queue.Queue(maxsize=10)
+        self.is_capturing = False
+        self.capture_thread = None
+        self.encoder_thread = None
+        
+        # Preallocated frames reused by the capture loop; enough for full encode
+        # and replay queues, the latest-frame slot and a few readers
+        self.frame_pool = FrameBufferPool(
+            (VIDEO_CONFIG["height"], VIDEO_CONFIG["width"], 3),
+            max_buffers=RECORDING_CONFIG["queue_frames"] + REPLAY_CONFIG["queue_frames"] + 4
+        )
+        
+        # Compressed copy of the recording kept in memory for instant replay
+        self.replay = CompressedFrameStore() if REPLAY_CONFIG["enabled"] else None
+        
+        # Latest captured frame, shared read-only by display, recording and face detection
+        self._frame_condition = threading.Condition()
+        self._latest: Optional[FrameBuffer] = None
+        self._latest_seq = 0
+        
+        # Capture times of the last two seconds of frames, for the live fps and jitter
+        self._capture_times = deque(maxlen=int(VIDEO_CONFIG["fps"] * 2))
+        self.deadlines_missed = 0
+        
+        # Frames on their way to the encoder; bounded so memory stays constant
+        self.encode_queue = queue.Queue(maxsize=RECORDING_CONFIG["queue_frames"])
+        self._record_lock = threading.Lock()
+        self.writer = None
+        self.segments = []
+        self.frames_captured = 0
+        self.frames_written = 0
+        self.frames_dropped = 0
+        self.frames_failed = 0
+        self.frames_duplicated = 0
+        self.frames_skipped = 0
+        self.frame_times = array('d')
+        self.gaps = []
+        self.recorded_seconds = 0.0
+        self.encode_latency_total = 0.0
+        self.encode_latency_max = 0.0
         
     def initialize_camera(self) -> bool:
         """Initialize the camera"""
@@ -32,87 +80,378 @@ class VideoRecorder:
             st.error(f"Failed to initialize camera: {e}")
             return False
     
-    def start_recording(self):
-        """Start recording video"""
+    def start_capture(self) -> bool:
+        """Start the capture loop, the only reader of the camera"""
+        if self.is_capturing or self.source != "camera":
+            return True
         if not self.cap or not self.cap.isOpened():
             if not self.initialize_camera():
-                st.error("Cannot start recording: Camera not available")
                 return False
         
-        self.is_recording = True
-        self.frames = []
+        self.is_capturing = True
+        self.capture_thread = threading.Thread(target=self._capture_frames)
+        self.capture_thread.daemon = True
+        self.capture_thread.start()
+        return True
+    
+    def start_recording(self, output_path: Optional[str] = None):
+        """Start recording video
+        
+        Frames are encoded to disk while recording; output_path is the base
+        name of the segment files (a timestamped file in the recording
+        directory by default). Calling it again while recording changes nothing.
+        """
+        if self.is_recording or (self.encoder_thread is not None and self.encoder_thread.is_alive()):
+            return True
+        if not self.start_capture():
+            st.error("Cannot start recording: Camera not available")
+            return False
+        
+        if output_path is None:
+            output_path = os.path.join(RECORDING_CONFIG["directory"],
+                                       f"interview_{time.strftime('%Y%m%d_%H%M%S')}.mp4")
+        self.output_base, self.output_ext = os.path.splitext(output_path)
+        self.segments = []
+        self.frames_captured = 0
+        self.frames_written = 0
+        self.frames_dropped = 0
+        self.frames_failed = 0
+        self.frames_duplicated = 0
+        self.frames_skipped = 0
+        self.frame_times = array('d')
+        self.gaps = []
+        self.recorded_seconds = 0.0
+        self.encode_latency_total = 0.0
+        self.encode_latency_max = 0.0
+        if self.replay is not None:
+            self.replay.clear()
         
-        # Start recording in a separate thread
-        self.recording_thread = threading.Thread(target=self._record_frames)
-        self.recording_thread.daemon = True
-        self.recording_thread.start()
+        self.encoder_thread = threading.Thread(target=self._encode_frames)
+        self.encoder_thread.daemon = True
+        self.encoder_thread.start()
+        
+        with self._record_lock:
+            self.is_recording = True
         
         return True
     
     def stop_recording(self):
-        """Stop recording video"""
-        self.is_recording = False
-        if self.recording_thread:
-            self.recording_thread.join(timeout=2)
+        """Stop recording video and finish writing the segment files"""
+        with self._record_lock:
+            self.is_recording = False
+        if self.encoder_thread:
+            self.encode_queue.put(None)
+            self.encoder_thread.join()
+            self.encoder_thread = None
+            self._write_manifest()
         
-        return len(self.frames)
+        return self.frames_written
+    
+    def _write_manifest(self):
+        """Describe the finished recording in <base>.json, which queues it for postprocess.py"""
+        if not self.segments:
+            return
+        path = f"{self.output_base}.json"
+        timestamps_path = f"{self.output_base}_timestamps.npy"
+        directory = os.path.dirname(path) or "."
+        manifest = {
+            "segments": [os.path.relpath(segment, directory) for segment in self.segments],
+            "fps": VIDEO_CONFIG["fps"],
+            "frames": self.frames_written,
+            "dropped": self.frames_dropped,
+            "failed": self.frames_failed,
+            "duplicated": self.frames_duplicated,
+            "skipped": self.frames_skipped,
+            "measured_fps": self.measured_fps(),
+            "gaps": self.gaps,
+            "timestamps": os.path.relpath(timestamps_path, directory),
+            "finished_at": time.time()
+        }
+        try:
+            np.save(timestamps_path, np.asarray(self.frame_times))
+            tmp_path = f"{path}.{os.getpid()}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(manifest, f)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            print(f"Failed to write recording manifest: {e}")
     
-    def _record_frames(self):
-        """Internal method to record frames"""
-        while self.is_recording and self.cap and self.cap.isOpened():
-            ret, frame = self.cap.read()
+    def _capture_frames(self):
+        """Read the camera and publish every frame, paced by deadlines
+        
+        Deadlines are one frame interval apart, so the time spent reading
+        and publishing does not lower the rate. After an overrun of more
+        than a frame, the missed deadlines are skipped rather than caught up
+        in a burst.
+        """
+        interval = 1.0 / VIDEO_CONFIG["fps"]
+        next_deadline = time.perf_counter()
+        while self.is_capturing and self.cap and self.cap.isOpened():
+            buffer = self.frame_pool.acquire()
+            ret, frame = self.cap.read(image=buffer.array)
             if ret:
-                # Add timestamp to frame
-                timestamp = time.strftime("%Y-%m-%d %H:%M:%S")
-                cv2.putText(frame, timestamp, (10, 30), 
-                           cv2.FONT_HERSHEY_SIMPLEX, 0.7, (255, 255, 255), 2)
-                
-                self.frames.append(frame)
-                
-                # Add frame to queue for live display
-                if not self.frame_queue.full():
-                    try:
-                        self.frame_queue.put_nowait(frame)
-                    except queue.Full:
-                        pass
+                if frame is not buffer.array:
+                    # The camera delivered a different size; resize the pool to match
+                    buffer.release()
+                    buffer = self.frame_pool.adopt(frame)
+                buffer.captured_at = time.perf_counter()
+                self._publish(buffer)
             
-            time.sleep(1/VIDEO_CONFIG["fps"])
+            buffer.release()
+            next_deadline += interval
+            delay = next_deadline - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            elif -delay > interval:
+                self.deadlines_missed += int(-delay / interval)
+                next_deadline = time.perf_counter()
     
-    def get_current_frame(self) -> Optional[np.ndarray]:
-        """Get the current frame for live display"""
-        if not self.cap or not self.cap.isOpened():
-            return None
+    def push_frame(self, image: np.ndarray):
+        """Publish a frame from an external source, such as the WebRTC video callback
         
+        The image is copied into a pooled buffer, so the caller keeps its
+        array; this never waits for the encoder.
+        """
+        buffer = self.frame_pool.acquire(image.shape)
         try:
-            ret, frame = self.cap.read()
-            if ret:
-                return frame
-            return None
-        except:
+            np.copyto(buffer.array, image)
+            buffer.captured_at = time.perf_counter()
+            self._publish(buffer)
+        finally:
+            buffer.release()
+    
+    def _publish(self, buffer: FrameBuffer):
+        """Timestamp a new frame and hand it to the latest-frame slot and the recording"""
+        frame = buffer.array
+        
+        # Add timestamp to frame
+        timestamp = time.strftime("%Y-%m-%d %H:%M:%S")
+        cv2.putText(frame, timestamp, (10, 30), 
+                   cv2.FONT_HERSHEY_SIMPLEX, 0.7, (255, 255, 255), 2)
+        
+        # Consumers share this array without copying, so it must not change from here on
+        frame.flags.writeable = False
+        with self._frame_condition:
+            previous = self._latest
+            self._latest = buffer.retain()
+            self._latest_seq += 1
+            self._capture_times.append(buffer.captured_at)
+            self._frame_condition.notify_all()
+        if previous is not None:
+            previous.release()
+        
+        # Hand the frame to the encoder; drop it if the encoder is behind
+        with self._record_lock:
+            if self.is_recording:
+                self.frames_captured += 1
+                try:
+                    self.encode_queue.put_nowait(buffer.retain())
+                except queue.Full:
+                    buffer.release()
+                    self.frames_dropped += 1
+                if self.replay is not None:
+                    self.replay.add(buffer)
+    
+    def _open_segment(self, frame: np.ndarray):
+        """Start a new segment file sized to the incoming frames"""
+        if self.writer is not None:
+            self.writer.release()
+        
+        path = f"{self.output_base}_{len(self.segments) + 1:03d}{self.output_ext}"
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        height, width = frame.shape[:2]
+        fourcc = cv2.VideoWriter_fourcc(*RECORDING_CONFIG["codec"])
+        self.writer = cv2.VideoWriter(path, fourcc, VIDEO_CONFIG["fps"], (width, height))
+        self.segments.append(path)
+        self.segment_frames = 0
+    
+    def _write_frame(self, frame: np.ndarray, frames_per_segment: int):
+        if self.writer is None or (frames_per_segment and self.segment_frames >= frames_per_segment):
+            self._open_segment(frame)
+        self.writer.write(frame)
+        self.segment_frames += 1
+        self.frames_written += 1
+    
+    def _encode_frames(self):
+        """Write queued frames to the segment files at a constant frame rate
+        
+        Each frame goes to the output slot nearest to its capture time, so
+        the file plays back in real time whatever rate the source achieved.
+        Slots without a frame repeat the previous one, and a second frame for
+        a slot already filled is skipped. A stall longer than max_fill_seconds
+        (a paused camera, a background tab) is not filled: the slots past that
+        are cut from the file and recorded in gaps as {"t": position in the
+        file, "seconds": time cut}. Capture times are kept in frame_times.
+        
+        Runs on the encoder thread, which alone updates frames_failed,
+        frames_duplicated and frames_skipped.
+        """
+        frame_interval = 1.0 / VIDEO_CONFIG["fps"]
+        frames_per_segment = int(RECORDING_CONFIG["segment_seconds"] * VIDEO_CONFIG["fps"])
+        max_fill = int(RECORDING_CONFIG["max_fill_seconds"] * VIDEO_CONFIG["fps"])
+        started_at = None
+        cut_slots = 0
+        next_slot = 0
+        previous = None
+        while True:
+            buffer = self.encode_queue.get()
+            if buffer is None:
+                break
+            try:
+                if started_at is None:
+                    started_at = buffer.captured_at
+                offset = buffer.captured_at - started_at
+                slot = int(round(offset / frame_interval)) - cut_slots
+                if slot - next_slot > max_fill:
+                    gap = slot - next_slot - max_fill
+                    cut_slots += gap
+                    slot -= gap
+                    self.gaps.append({"t": round(slot * frame_interval, 3),
+                                      "seconds": round(gap * frame_interval, 3)})
+                self.recorded_seconds = offset - cut_slots * frame_interval
+                if slot < next_slot:
+                    self.frames_skipped += 1
+                    continue
+                
+                self.frame_times.append(offset)
+                if previous is not None:
+                    for _ in range(slot - next_slot):
+                        self._write_frame(previous.array, frames_per_segment)
+                        self.frames_duplicated += 1
+                    previous.release()
+                    previous = None
+                self._write_frame(buffer.array, frames_per_segment)
+                next_slot = slot + 1
+                previous = buffer.retain()
+            except Exception as e:
+                # Keep draining the queue so capture and stop_recording never block on it
+                self.frames_failed += 1
+                print(f"Video encoding error: {e}")
+            finally:
+                latency = time.perf_counter() - buffer.captured_at
+                buffer.release()
+                self.encode_latency_total += latency
+                self.encode_latency_max = max(self.encode_latency_max, latency)
+        
+        if previous is not None:
+            previous.release()
+        if self.writer is not None:
+            self.writer.release()
+            self.writer = None
+    
+    def measured_fps(self) -> Optional[float]:
+        """Frame rate the source actually delivered over the recording, stalls cut as gaps excluded"""
+        if len(self.frame_times) < 2 or self.recorded_seconds <= 0:
             return None
+        # Skipped frames were delivered too, just not written
+        return round((len(self.frame_times) + self.frames_skipped - 1) / self.recorded_seconds, 2)
     
-    def get_live_frame(self) -> Optional[np.ndarray]:
-        """Get frame from the queue for live display"""
+    def capture_stats(self) -> dict:
+        """Achieved frame rate and interval jitter over the last two seconds"""
+        with self._frame_condition:
+            times = np.array(self._capture_times)
+        if len(times) < 2 or times[-1] <= times[0]:
+            return {"fps": None, "jitter_ms": None, "late": self.deadlines_missed}
+        intervals = np.diff(times)
+        return {
+            "fps": round(float((len(times) - 1) / (times[-1] - times[0])), 1),
+            "jitter_ms": round(float(intervals.std()) * 1000, 1),
+            "late": self.deadlines_missed
+        }
+    
+    def recording_stats(self) -> dict:
+        """Frame counts for the current or last recording"""
+        return {
+            "captured": self.frames_captured,
+            "written": self.frames_written,
+            "dropped": self.frames_dropped,
+            "failed": self.frames_failed,
+            "duplicated": self.frames_duplicated,
+            "skipped": self.frames_skipped,
+            "gap_seconds": round(sum(gap["seconds"] for gap in self.gaps), 3),
+            "measured_fps": self.measured_fps(),
+            "queued": self.encode_queue.qsize(),
+            "segments": list(self.segments),
+            "avg_encode_latency_ms": round(self.encode_latency_total
+                                           / max(len(self.frame_times) + self.frames_skipped, 1) * 1000, 2),
+            "max_encode_latency_ms": round(self.encode_latency_max * 1000, 2),
+            "capture": self.capture_stats(),
+            "frame_pool": self.frame_pool.stats(),
+            "replay": self.replay.stats() if self.replay is not None else None
+        }
+    
+    def get_current_frame(self) -> Optional[np.ndarray]:
+        """Get the latest captured frame for live display (read-only, not copied)
+        
+        The array goes back to the frame pool a few frames later; hold it
+        with current_frame() if it is used for longer than a quick read.
+        """
+        with self._frame_condition:
+            return None if self._latest is None else self._latest.array
+    
+    @contextmanager
+    def current_frame(self):
+        """Pin the latest frame so it is not recycled while in use"""
+        with self._frame_condition:
+            buffer = None if self._latest is None else self._latest.retain()
         try:
-            if not self.frame_queue.empty():
-                return self.frame_queue.get_nowait()
-            return None
-        except queue.Empty:
-            return None
+            yield None if buffer is None else buffer.array
+        finally:
+            if buffer is not None:
+                buffer.release()
+    
+    def get_live_frame(self) -> Optional[np.ndarray]:
+        """Get the latest captured frame for live display"""
+        return self.get_current_frame()
+    
+    def wait_for_frame(self, last_seq: int = 0, timeout: float = 1.0) -> Tuple[int, Optional[FrameBuffer]]:
+        """Wait for a frame newer than last_seq and return (seq, buffer)
+        
+        For consumers that want every frame, such as face tracking. The
+        buffer is retained for the caller, who must release() it. Returns
+        the current slot on timeout.
+        """
+        with self._frame_condition:
+            self._frame_condition.wait_for(lambda: self._latest_seq > last_seq, timeout)
+            buffer = None if self._latest is None else self._latest.retain()
+            return self._latest_seq, buffer
     
     def save_recording(self, filename: str) -> bool:
-        """Save recorded frames to video file"""
-        if not self.frames:
+        """Save the recorded segments as one video file
+        
+        A single segment is moved into place; several segments are joined
+        frame by frame, so memory use does not depend on the length.
+        """
+        if self.is_recording:
+            self.stop_recording()
+        if not self.segments:
             return False
         
         try:
-            fourcc = cv2.VideoWriter_fourcc(*'mp4v')
-            out = cv2.VideoWriter(filename, fourcc, VIDEO_CONFIG["fps"], 
-                                (VIDEO_CONFIG["width"], VIDEO_CONFIG["height"]))
+            if len(self.segments) == 1:
+                shutil.move(self.segments[0], filename)
+                self.segments = [filename]
+                self._write_manifest()
+                return True
             
-            for frame in self.frames:
-                out.write(frame)
+            out = None
+            for segment in self.segments:
+                reader = cv2.VideoCapture(segment)
+                while True:
+                    ret, frame = reader.read()
+                    if not ret:
+                        break
+                    if out is None:
+                        height, width = frame.shape[:2]
+                        fourcc = cv2.VideoWriter_fourcc(*RECORDING_CONFIG["codec"])
+                        out = cv2.VideoWriter(filename, fourcc, VIDEO_CONFIG["fps"], (width, height))
+                    out.write(frame)
+                reader.release()
             
+            if out is None:
+                return False
             out.release()
             return True
         except Exception as e:
@@ -121,69 +460,217 @@ class VideoRecorder:
     
     def release_camera(self):
         """Release camera resources"""
-        self.is_recording = False
+        if self.is_recording:
+            self.stop_recording()
+        self.is_capturing = False
+        if self.capture_thread:
+            self.capture_thread.join(timeout=2)
+            self.capture_thread = None
+        with self._frame_condition:
+            latest, self._latest = self._latest, None
+        if latest is not None:
+            latest.release()
         if self.cap:
             self.cap.release()
             self.cap = None
 
 class FaceDetector:
-    def __init__(self):
-        # Load the face cascade classifier
+    """Face detection for live frames
+    
+    In tracking mode (the default) the full cascade runs on a downscaled
+    frame only every detect_every frames. In between, each face is
+    re-detected in a small region around its motion-predicted position, or
+    carried forward along its last motion when that misses. Tracks advance
+    once per captured frame: the analysis is cached by the capture sequence
+    number, so presence, analysis and drawing on the same capture cost one
+    computation, and every new capture moves the tracker on.
+    """
+    
+    def __init__(self, tracking: Optional[bool] = None):
+        # The face cascade is loaded once per process; each thread detects with its own copy
+        self.face_cascade = get_face_cascade()
+        self.config = FACE_TRACKING_CONFIG
+        self.tracking = self.config["enabled"] if tracking is None else tracking
+        
+        height, width = VIDEO_CONFIG["height"], VIDEO_CONFIG["width"]
+        small = self._small_shape((height, width))
+        self.gray_pool = FrameBufferPool((height, width), max_buffers=4)
+        self.small_pool = FrameBufferPool(small + (3,), max_buffers=4)
+        self.small_gray_pool = FrameBufferPool(small, max_buffers=4)
+        
+        self._lock = threading.Lock()
+        self._tracks = []
+        self._frames_since_detection = None
+        self._cache_seq = None
+        self._cache = None
+        self.stats = {"full_detections": 0, "roi_detections": 0, "propagated": 0, "cache_hits": 0}
+    
+    def _small_shape(self, shape) -> Tuple[int, int]:
+        scale = self.config["detect_scale"]
+        return max(1, int(round(shape[0] * scale))), max(1, int(round(shape[1] * scale)))
+    
+    def _detect_faces(self, frame: np.ndarray):
+        """Run the face cascade on a frame, converting into a pooled grayscale buffer"""
+        gray = self.gray_pool.acquire(frame.shape[:2])
         try:
-            self.face_cascade = cv2.CascadeClassifier(cv2.data.haarcascades + 'haarcascade_frontalface_default.xml')
-        except:
-            self.face_cascade = None
+            cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY, dst=gray.array)
+            return self.face_cascade.detectMultiScale(gray.array, 1.1, 4)
+        finally:
+            gray.release()
+    
+    def _cascade(self, gray: np.ndarray) -> np.ndarray:
+        """Detect on a downscaled grayscale image; boxes in full-resolution coordinates"""
+        scale = self.config["detect_scale"]
+        min_size = max(8, int(self.config["min_face_size"] * scale))
+        if gray.shape[0] < min_size or gray.shape[1] < min_size:
+            return np.empty((0, 4))
+        faces = self.face_cascade.detectMultiScale(gray, 1.1, 4, minSize=(min_size, min_size))
+        return np.asarray(faces, dtype=np.float64).reshape(-1, 4) / scale
     
-    def detect_face_presence(self, frame: np.ndarray) -> bool:
+    def _track(self, frame: np.ndarray) -> List[Tuple[int, int, int, int]]:
+        """Detect or track faces in the next frame"""
+        small_shape = self._small_shape(frame.shape[:2])
+        small = self.small_pool.acquire(small_shape + (3,))
+        small_gray = self.small_gray_pool.acquire(small_shape)
+        try:
+            cv2.resize(frame, (small_shape[1], small_shape[0]), dst=small.array, interpolation=cv2.INTER_AREA)
+            cv2.cvtColor(small.array, cv2.COLOR_BGR2GRAY, dst=small_gray.array)
+            
+            if (not self._tracks or self._frames_since_detection is None
+                    or self._frames_since_detection + 1 >= self.config["detect_every"]):
+                self._detect_all(small_gray.array)
+            else:
+                self._follow_tracks(small_gray.array, frame.shape[:2])
+        finally:
+            small.release()
+            small_gray.release()
+        
+        return [tuple(int(round(v)) for v in track["box"]) for track in self._tracks]
+    
+    def _detect_all(self, small_gray: np.ndarray):
+        """Full (downscaled) detection; carries velocities over from matching tracks"""
+        self.stats["full_detections"] += 1
+        elapsed = (self._frames_since_detection or 0) + 1
+        tracks = []
+        for box in self._cascade(small_gray):
+            velocity = np.zeros(2)
+            center = box[:2] + box[2:] / 2
+            for track in self._tracks:
+                old_center = track["box"][:2] + track["box"][2:] / 2
+                if np.abs(center - old_center).max() < box[2]:
+                    velocity = (center - old_center) / elapsed
+                    break
+            tracks.append({"box": box, "velocity": velocity, "misses": 0})
+        self._tracks = tracks
+        self._frames_since_detection = 0
+    
+    def _follow_tracks(self, small_gray: np.ndarray, frame_shape):
+        """Re-detect each face near its predicted position, or propagate it"""
+        self._frames_since_detection += 1
+        scale = self.config["detect_scale"]
+        margin = self.config["roi_margin"]
+        height, width = frame_shape
+        
+        kept = []
+        for track in self._tracks:
+            predicted = track["box"].copy()
+            predicted[:2] += track["velocity"]
+            
+            # Search region around the prediction, in downscaled coordinates
+            x0 = int(max(0, (predicted[0] - margin * predicted[2]) * scale))
+            y0 = int(max(0, (predicted[1] - margin * predicted[3]) * scale))
+            x1 = int(min(width, predicted[0] + (1 + margin) * predicted[2]) * scale)
+            y1 = int(min(height, predicted[1] + (1 + margin) * predicted[3]) * scale)
+            
+            found = self._cascade(small_gray[y0:y1, x0:x1]) if x1 > x0 and y1 > y0 else np.empty((0, 4))
+            self.stats["roi_detections"] += 1
+            if len(found):
+                box = found[np.argmax(found[:, 2] * found[:, 3])]
+                box[:2] += (x0 / scale, y0 / scale)
+                track["velocity"] = (box[:2] + box[2:] / 2) - (track["box"][:2] + track["box"][2:] / 2)
+                track["box"] = box
+                track["misses"] = 0
+            else:
+                self.stats["propagated"] += 1
+                track["box"] = predicted
+                track["misses"] += 1
+            
+            if track["misses"] <= self.config["max_misses"]:
+                kept.append(track)
+        self._tracks = kept
+    
+    def analyze(self, frame: np.ndarray, seq: Optional[int] = None) -> dict:
+        """Face analysis of a frame, computed once per capture
+        
+        seq is the capture sequence number of the frame (from
+        VideoRecorder.wait_for_frame). Analyzing the same seq again returns
+        the cached result; a new seq always advances the tracker, even when
+        the frame arrives in the same pooled array with the same pixels.
+        Without seq every call is taken to be a new frame.
+        """
+        with self._lock:
+            if seq is not None and seq == self._cache_seq:
+                self.stats["cache_hits"] += 1
+                return self._cache
+            
+            if self.tracking:
+                faces = self._track(frame)
+            else:
+                faces = [tuple(int(v) for v in face) for face in self._detect_faces(frame)]
+            
+            analysis = {
+                "faces_detected": len(faces),
+                "confidence": len(faces) > 0,
+                "face_positions": [{"x": x, "y": y, "width": w, "height": h} for (x, y, w, h) in faces]
+            }
+            self._cache_seq, self._cache = seq, analysis
+            return analysis
+    
+    def reset_tracking(self):
+        """Forget tracked faces, e.g. when the video source changes"""
+        with self._lock:
+            self._tracks = []
+            self._frames_since_detection = None
+            self._cache_seq = self._cache = None
+    
+    def detect_face_presence(self, frame: np.ndarray, seq: Optional[int] = None) -> bool:
         """Detect if a face is present in the frame"""
         if self.face_cascade is None:
             return True  # Assume face is present if detector is not available
         
         try:
-            gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
-            faces = self.face_cascade.detectMultiScale(gray, 1.1, 4)
-            return len(faces) > 0
+            return self.analyze(frame, seq)["faces_detected"] > 0
         except:
             return True
     
-    def get_face_analysis(self, frame: np.ndarray) -> dict:
+    def get_face_analysis(self, frame: np.ndarray, seq: Optional[int] = None) -> dict:
         """Analyze face in the frame and return basic metrics"""
         if self.face_cascade is None:
             return {"faces_detected": 0, "confidence": 0}
         
         try:
-            gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
-            faces = self.face_cascade.detectMultiScale(gray, 1.1, 4)
-            
-            analysis = {
-                "faces_detected": len(faces),
-                "confidence": len(faces) > 0,
-                "face_positions": []
-            }
-            
-            for (x, y, w, h) in faces:
-                analysis["face_positions"].append({
-                    "x": int(x), "y": int(y), "width": int(w), "height": int(h)
-                })
-            
-            return analysis
+            return self.analyze(frame, seq)
         except:
             return {"faces_detected": 0, "confidence": 0}
     
-    def draw_face_rectangles(self, frame: np.ndarray) -> np.ndarray:
+    def draw_face_rectangles(self, frame: np.ndarray, seq: Optional[int] = None) -> np.ndarray:
         """Draw rectangles around detected faces"""
         if self.face_cascade is None:
             return frame
         
         try:
-            gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
-            faces = self.face_cascade.detectMultiScale(gray, 1.1, 4)
+            faces = self.analyze(frame, seq)["face_positions"]
             
-            for (x, y, w, h) in faces:
+            # Frames from the capture slot are shared read-only; draw on a copy
+            if faces and not frame.flags.writeable:
+                frame = frame.copy()
+            
+            for face in faces:
+                x, y, w, h = face["x"], face["y"], face["width"], face["height"]
                 cv2.rectangle(frame, (x, y), (x+w, y+h), (255, 0, 0), 2)
                 cv2.putText(frame, "Face Detected", (x, y-10), 
                            cv2.FONT_HERSHEY_SIMPLEX, 0.5, (255, 0, 0), 1)
             
             return frame
         except:
-            return frame
\ No newline at end of file
+            return frame